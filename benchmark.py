@@ -0,0 +1,642 @@
+"""离线吞吐量基准测试
+
+启动本地模拟 LLM 服务，用真实的翻译流程（Translator.translate_nodes 以及与批量翻译任务相同的逐插件流程）
+对比不同 tokens 目标和并发数下的吞吐量、请求数、tokens 和批次耗时，不产生任何 API 费用。
+
+用法:
+    python benchmark.py --plugins 5 --nodes 40 --token-target 1000,1500 --concurrency 1,4 --latency lognormal:1,0.5
+    python benchmark.py --folder D:/ComfyUI/custom_nodes/some-plugin --concurrency 1,2,4
+    python benchmark.py --record output/bench.jsonl          # 录制模型响应
+    python benchmark.py --replay output/bench.jsonl          # 不访问网络，回放相同的模型响应
+    python benchmark.py --latency lognormal:0.5,1.2 --concurrency 4 --hedge 90   # 对冲请求
+    python benchmark.py --token-target 600 --concurrency 1 --auto-tune             # 自动调优
+    python benchmark.py --no-pretranslate                                          # 不使用本地规则预翻译
+    python benchmark.py --full-prompt                                              # 每个请求附带完整术语表
+    python benchmark.py --explicit-cache                                           # 使用显式上下文缓存接口
+    python benchmark.py --wire-format json,lines --malformed-rate 0.2              # 对比 JSON 与逐行格式
+    python benchmark.py --response-format json_schema --malformed-rate 0.2         # 使用结构化输出
+    python benchmark.py --validate-fields 20000                                    # 校验引擎基准，不发送请求
+    python benchmark.py --plugins 6 --forks 3 --global-dedup                       # 跨插件全局去重
+    python benchmark.py --incremental 0.05                                         # 插件更新约 5% 后增量翻译
+    python benchmark.py --index-files 2000                                         # 翻译仓库索引的建立和查询耗时
+    python benchmark.py --memory --forks 2                                         # 插件之间共用模糊翻译记忆
+    python benchmark.py --memory-entries 50000                                     # 模糊翻译记忆的查询耗时
+    python benchmark.py --out D:/bench_logs                                        # 保留运行统计和调试文件
+"""
+
+import argparse
+import atexit
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+from src.cassette import Cassette
+from src.context_cache import ContextCache
+from src.file_utils import FileUtils
+from src.global_dedup import GlobalDedup
+from src.hedging import HedgePolicy
+from src.auto_tuner import AutoTuner
+from src.mock_server import MockLLMServer
+from src.node_parser import NodeParser
+from src.run_stats import RunStats
+from src.translator import Translator
+from src.translation_index import TranslationIndex
+from src.translation_memory import TranslationMemory
+from src.validation import ValidationEngine
+
+# 生成模拟插件使用的词汇
+_WORDS = [
+    "image", "mask", "latent", "model", "clip", "vae", "seed", "steps", "cfg", "sampler",
+    "scheduler", "denoise", "width", "height", "batch", "size", "strength", "scale", "upscale",
+    "method", "prompt", "negative", "positive", "conditioning", "control", "net", "lora", "weight",
+    "blend", "mode", "threshold", "radius", "sigma", "noise", "offset", "crop", "resize", "color",
+    "channel", "frame", "rate", "count", "index", "text", "font", "padding", "feather", "invert"
+]
+_TYPES = ["IMAGE", "MASK", "LATENT", "MODEL", "CLIP", "VAE", "CONDITIONING", "STRING", "INT", "FLOAT"]
+
+
+def generate_plugin(plugin_index: int, node_count: int, seed: int = 0) -> Dict:
+    """生成一个模拟插件的节点信息，格式与 NodeParser.optimize_node_info 的输出一致
+
+    Args:
+        plugin_index: 插件序号
+        node_count: 节点数量
+        seed: 随机种子
+
+    Returns:
+        Dict: 节点信息字典
+    """
+    rng = random.Random(seed * 1000 + plugin_index)
+    nodes = {}
+
+    def name(parts: int) -> str:
+        return "_".join(rng.sample(_WORDS, parts))
+
+    for i in range(node_count):
+        words = rng.sample(_WORDS, rng.randint(2, 4))
+        node_name = "".join(w.capitalize() for w in words) + f"P{plugin_index}N{i}"
+        nodes[node_name] = {
+            "title": " ".join(w.capitalize() for w in words),
+            "inputs": {n: n for n in (name(rng.randint(1, 2)) for _ in range(rng.randint(1, 4)))},
+            "widgets": {n: n for n in (name(rng.randint(1, 3)) for _ in range(rng.randint(0, 8)))},
+            "outputs": {f"output_{j}": rng.choice(_TYPES) for j in range(rng.randint(1, 3))}
+        }
+    return nodes
+
+
+def load_plugins(args) -> List[Tuple[str, Dict]]:
+    """加载基准测试使用的插件，优先解析指定的真实插件文件夹"""
+    if args.folder:
+        plugins = []
+        for folder in args.folder:
+            parser = NodeParser(folder)
+            nodes = parser.optimize_node_info(parser.parse_folder(folder))
+            if nodes:
+                plugins.append((os.path.basename(folder.rstrip("/\\")), nodes))
+            else:
+                print(f"[警告] 未检测到节点: {folder}")
+        return plugins
+
+    plugins = [
+        (f"bench_plugin_{p}", generate_plugin(p, args.nodes, args.seed))
+        for p in range(args.plugins)
+    ]
+    # 模拟分叉或重新打包的插件：节点与某个已有插件相同
+    rng = random.Random(args.seed)
+    for f in range(args.forks):
+        _, nodes = rng.choice(plugins[:args.plugins])
+        plugins.append((f"bench_fork_{f}", {name: json.loads(json.dumps(info)) for name, info in nodes.items()}))
+    return plugins
+
+
+def mock_previous(nodes: Dict) -> Dict:
+    """生成插件已有的翻译文件（模拟服务的译文），不发送请求"""
+    previous = {}
+    for node_name, node_info in nodes.items():
+        previous[node_name] = {"title": MockLLMServer.translate_text(node_info["title"])}
+        for section in ("inputs", "widgets", "outputs"):
+            previous[node_name][section] = {
+                key: MockLLMServer.translate_text(value if key.startswith("output_") else key)
+                for key, value in node_info[section].items()
+            }
+    return previous
+
+
+def update_plugin(nodes: Dict, rng: random.Random, change_rate: float) -> Dict:
+    """模拟插件更新：按比例修改标题、改名或新增字段，并新增节点"""
+    updated = json.loads(json.dumps(nodes))
+    for node_name, node_info in updated.items():
+        if rng.random() < change_rate:
+            node_info["title"] += " V2"
+        for section in ("inputs", "widgets"):
+            for key in list(node_info[section]):
+                if rng.random() < change_rate:
+                    renamed = f"{key}_{rng.choice(_WORDS)}"
+                    node_info[section] = {
+                        (renamed if k == key else k): (renamed if k == key else v)
+                        for k, v in node_info[section].items()
+                    }
+        if rng.random() < change_rate:
+            extra = f"{rng.choice(_WORDS)}_{rng.choice(_WORDS)}"
+            node_info["widgets"][extra] = extra
+    for i in range(max(1, int(len(nodes) * change_rate))):
+        template = nodes[rng.choice(list(nodes))]
+        updated[f"AddedNode{i}_{rng.randint(0, 9999)}"] = {
+            **json.loads(json.dumps(template)), "title": f"{template['title']} {rng.choice(_WORDS).capitalize()}"
+        }
+    return updated
+
+
+def run_single(base_url: str, model_id: str, plugin_name: str, nodes: Dict, work_dir: str,
+               token_target: int, concurrency: int, stream: bool, cassette: Cassette = None,
+               hedge: HedgePolicy = None, tuner: AutoTuner = None, pretranslate: bool = True,
+               trim_prompt: bool = True, context_cache: ContextCache = None,
+               wire_format: str = "json", response_format: str = "text",
+               previous: Tuple[Dict, Dict] = None, memory: TranslationMemory = None) -> Tuple[RunStats, Dict]:
+    """翻译单个插件，返回运行统计和翻译结果
+
+    previous 为 (已有翻译, 已有译文对应的原文) 时进行增量翻译
+    """
+    translator = Translator(api_key="mock-key", model_id=model_id, base_url=base_url, cassette=cassette)
+    temp_dir = os.path.join(work_dir, "temp", plugin_name)
+    os.makedirs(temp_dir, exist_ok=True)
+    translated = translator.translate_nodes(
+        nodes,
+        folder_path=plugin_name,
+        temp_dir=temp_dir,
+        token_target=token_target,
+        stream=stream,
+        concurrency=concurrency,
+        hedge=hedge,
+        tuner=tuner,
+        pretranslate=pretranslate,
+        trim_prompt=trim_prompt,
+        context_cache=context_cache,
+        wire_format=wire_format,
+        response_format=response_format,
+        previous=previous[0] if previous else None,
+        previous_source=previous[1] if previous else None,
+        memory=memory
+    )
+    FileUtils.save_json(translated, os.path.join(work_dir, f"{plugin_name}.json"))
+    return translator.stats, translated
+
+
+def run_batch_task(base_url: str, model_id: str, plugins: List[Tuple[str, Dict]],
+                   token_target: int, concurrency: int, stream: bool, cassette: Cassette = None,
+                   hedge_percentile: float = 0, auto_tune: bool = False, pretranslate: bool = True,
+                   trim_prompt: bool = True, explicit_cache: bool = False, wire_format: str = "json",
+                   response_format: str = "text", global_dedup: bool = False,
+                   incremental: Dict[str, Tuple[Dict, Dict]] = None, memory: bool = False) -> Dict:
+    """按批量翻译任务的流程依次翻译所有插件，单个插件失败不影响其他插件
+
+    global_dedup 为 True 时与批量翻译任务的全局去重相同：所有插件的唯一原文合并后只翻译一次，
+    再分发回各插件，节点数按分发后完整翻译的节点计算；incremental 为插件名到 (已有翻译, 原文) 的映射，
+    指定时各插件只翻译与已有翻译的差异；memory 为 True 时所有插件共用一个模糊翻译记忆
+
+    Returns:
+        Dict: 汇总的基准测试结果
+    """
+    work_dir = tempfile.mkdtemp(prefix="benchmark_")
+    latencies = []
+    totals = {
+        "requests": 0, "prompt_tokens": 0, "completion_tokens": 0, "truncations": 0, "repair_requests": 0,
+        "hedges": 0, "hedge_wins": 0, "hedge_extra_tokens": 0,
+        "pretranslate_fields": 0, "pretranslated_fields": 0, "pretranslate_saved_tokens": 0,
+        "system_prompt_tokens": 0, "cached_tokens": 0, "parse_errors": 0, "parse_failures": 0,
+        "schema_violations": 0, "repair_fields": 0, "memory_autofilled": 0, "memory_examples": 0
+    }
+    reused_fields = 0
+    # 对冲策略在所有插件之间共用，与批量翻译任务一致
+    hedge = HedgePolicy(percentile=hedge_percentile, min_delay=0.0) if hedge_percentile else None
+    tuner = AutoTuner(token_target=token_target, concurrency=concurrency) if auto_tune else None
+    # 上下文缓存在所有插件之间共用，整个任务只创建一次显式上下文
+    context_cache = ContextCache(explicit=explicit_cache)
+    translation_memory = TranslationMemory() if memory else None
+    failed = []
+    node_count = 0
+    dedup = GlobalDedup(plugins) if global_dedup and len(plugins) > 1 else None
+    units = [("global_dedup", dedup.nodes)] if dedup else plugins
+
+    started = time.time()
+    try:
+        for plugin_name, nodes in units:
+            try:
+                stats, translated = run_single(base_url, model_id, plugin_name, nodes, work_dir,
+                                               token_target, concurrency, stream, cassette, hedge, tuner, pretranslate,
+                                               trim_prompt, context_cache, wire_format, response_format,
+                                               (incremental or {}).get(plugin_name), translation_memory)
+            except Exception as e:
+                failed.append({"plugin": plugin_name, "error": str(e)[:200]})
+                continue
+            if dedup:
+                node_count += sum(len(result) for _, result, _ in dedup.fan_out(translated))
+            else:
+                node_count += len(nodes)
+            latencies.extend(stats.batch_latencies)
+            for name in totals:
+                totals[name] += getattr(stats, name)
+            reused_fields += stats.incremental.get("reused_fields", 0)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    wall_time = time.time() - started
+
+    merged = RunStats()
+    merged.batch_latencies = latencies
+    return {
+        "token_target": token_target,
+        "concurrency": concurrency,
+        "stream": stream,
+        "wire_format": wire_format,
+        "response_format": response_format,
+        "plugins": len(plugins),
+        "failed_plugins": failed,
+        "nodes": node_count,
+        "wall_time": round(wall_time, 3),
+        "nodes_per_sec": round(node_count / wall_time, 2) if wall_time else 0.0,
+        "batches": len(latencies),
+        "batch_latency_p50": round(merged.latency_percentile(50), 3),
+        "batch_latency_p95": round(merged.latency_percentile(95), 3),
+        **totals,
+        "auto_tune": tuner.settings() if tuner else None,
+        "reused_fields": reused_fields,
+        "global_dedup": {"occurrences": dedup.occurrences, "unique": dedup.unique} if dedup else None,
+        "total_tokens": totals["prompt_tokens"] + totals["completion_tokens"],
+        "tokens_per_node": round((totals["prompt_tokens"] + totals["completion_tokens"]) / node_count, 2)
+        if node_count else 0.0
+    }
+
+
+def make_translated(nodes: Dict, rng: random.Random, defect_rate: float = 0.05) -> Dict:
+    """生成模拟的翻译结果，按比例注入缺失字段、未翻译的值和被翻译成中文的键名"""
+    translated = {}
+    for node_name, node_info in nodes.items():
+        node = {"title": MockLLMServer.translate_text(node_info["title"])}
+        for section in ("inputs", "widgets", "outputs"):
+            node[section] = {}
+            for key, value in node_info[section].items():
+                roll = rng.random()
+                if roll < defect_rate:
+                    continue
+                if roll < defect_rate * 2:
+                    node[section][key] = key
+                elif roll < defect_rate * 3:
+                    node[section][MockLLMServer.translate_text(key)] = key
+                else:
+                    node[section][key] = MockLLMServer.translate_text(key)
+        translated[node_name] = node
+    return translated
+
+
+def _legacy_check(original_batch: Dict, translated_batch: Dict) -> int:
+    """逐字符检测中文、对每个批次多次遍历的旧校验方式（缺失检查、未翻译检查、调优统计各一次），仅用于对比"""
+    def has_cjk(text) -> bool:
+        return any('\u4e00' <= char <= '\u9fff' for char in str(text))
+
+    problems = 0
+    for _ in range(3):
+        for node_name, node_info in original_batch.items():
+            translated = translated_batch.get(node_name, {})
+            for section in ("inputs", "widgets", "outputs"):
+                trans_section = translated.get(section, {})
+                for key in trans_section:
+                    problems += has_cjk(key)
+                for key in node_info.get(section, {}):
+                    value = trans_section.get(key)
+                    problems += not isinstance(value, str) or not value.strip() or not has_cjk(value)
+    return problems
+
+
+def run_validation_benchmark(field_count: int, batch_nodes: int = 30, seed: int = 0) -> Dict:
+    """在约 field_count 个字段的模拟语料上比较校验引擎与旧校验方式的耗时
+
+    Returns:
+        Dict: 字段数、两种方式的耗时和引擎发现的问题数
+    """
+    rng = random.Random(seed)
+    corpus = {}
+    fields = plugin = 0
+    while fields < field_count:
+        nodes = generate_plugin(plugin, batch_nodes, seed)
+        corpus.update(nodes)
+        fields += sum(len(n[section]) for n in nodes.values() for section in ("inputs", "widgets", "outputs"))
+        plugin += 1
+    translated = make_translated(corpus, rng)
+    names = list(corpus)
+    batches = [
+        ({n: corpus[n] for n in names[i:i + batch_nodes]}, {n: translated[n] for n in names[i:i + batch_nodes]})
+        for i in range(0, len(names), batch_nodes)
+    ]
+
+    started = time.perf_counter()
+    for original, result in batches:
+        _legacy_check(original, result)
+    legacy_time = time.perf_counter() - started
+
+    engine = ValidationEngine()
+    timings = []
+    for _ in range(2):
+        issues = key_repairs = 0
+        started = time.perf_counter()
+        for original, result in batches:
+            check = engine.check_batch(original, result)
+            issues += len(check.issues)
+            key_repairs += check.key_repairs
+        timings.append(time.perf_counter() - started)
+
+    return {
+        "fields": fields,
+        "nodes": len(corpus),
+        "batches": len(batches),
+        "legacy_seconds": round(legacy_time, 4),
+        "engine_seconds": round(timings[0], 4),
+        "engine_warm_seconds": round(timings[1], 4),
+        "issues": issues,
+        "key_repairs": key_repairs
+    }
+
+
+def run_index_benchmark(file_count: int, nodes_per_file: int = 20, seed: int = 0) -> Dict:
+    """在模拟的翻译仓库上测试索引的首次建立、无变化时的更新、少量文件修改后的更新和查询耗时
+
+    Returns:
+        Dict: 文件数、节点数和各阶段耗时
+    """
+    work_dir = tempfile.mkdtemp(prefix="index_benchmark_")
+    try:
+        nodes_dir = os.path.join(work_dir, "zh-CN", "Nodes")
+        os.makedirs(nodes_dir)
+        node_names = []
+        for p in range(file_count):
+            nodes = generate_plugin(p, nodes_per_file, seed)
+            node_names.extend(nodes)
+            with open(os.path.join(nodes_dir, f"plugin_{p}.json"), "w", encoding="utf-8") as f:
+                json.dump(mock_previous(nodes), f, ensure_ascii=False)
+
+        index = TranslationIndex(os.path.join(work_dir, "index.sqlite"))
+        cold = index.update(TranslationIndex.nodes_dir(work_dir))
+        warm = index.update(TranslationIndex.nodes_dir(work_dir))
+
+        # 修改约 1% 的文件
+        later = time.time() + 10
+        for p in range(0, file_count, 100):
+            os.utime(os.path.join(nodes_dir, f"plugin_{p}.json"), (later, later))
+        touched = index.update(TranslationIndex.nodes_dir(work_dir))
+
+        rng = random.Random(seed)
+        sample = [rng.choice(node_names) for _ in range(2000)]
+        started = time.perf_counter()
+        found = sum(index.lookup_node(name) is not None for name in sample)
+        found += sum(index.lookup_node(name.lower()) is not None for name in sample)
+        node_lookup = (time.perf_counter() - started) / (len(sample) * 2)
+        started = time.perf_counter()
+        for word in _WORDS:
+            index.lookup_field("widgets", word)
+        field_lookup = (time.perf_counter() - started) / len(_WORDS)
+
+        summary = index.summary()
+        index.close()
+        return {
+            **summary,
+            "cold_seconds": cold["seconds"],
+            "warm_seconds": warm["seconds"],
+            "touched_files": touched["updated"],
+            "touched_seconds": touched["seconds"],
+            "node_lookup_ms": round(node_lookup * 1000, 4),
+            "field_lookup_ms": round(field_lookup * 1000, 4),
+            "lookup_hit_rate": round(found / (len(sample) * 2), 3),
+            "index_bytes": os.path.getsize(os.path.join(work_dir, "index.sqlite"))
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def run_memory_benchmark(entry_count: int, queries: int = 2000, seed: int = 0) -> Dict:
+    """在约 entry_count 条模拟译文的翻译记忆上测试建立和查询耗时
+
+    Returns:
+        Dict: 条目数、建立耗时、平均查询耗时和自动沿用率
+    """
+    rng = random.Random(seed)
+
+    def key(parts: int) -> str:
+        return "_".join(rng.sample(_WORDS, parts))
+
+    entries = {}
+    while len(entries) < entry_count:
+        source = key(rng.randint(1, 4))
+        entries[source] = MockLLMServer.translate_text(source)
+
+    memory = TranslationMemory()
+    started = time.perf_counter()
+    memory.add_many(entries.items())
+    build_time = time.perf_counter() - started
+
+    # 查询：一半为已有原文的变体（编号、复数、连写），一半为新组合
+    sources = list(entries)
+    variants = []
+    for _ in range(queries):
+        source = rng.choice(sources)
+        variants.append(rng.choice([f"{source}_{rng.randint(1, 9)}", f"{source}s", source.replace("_", ""), key(3)]))
+
+    started = time.perf_counter()
+    for text in variants:
+        memory.similar(text, k=5, min_score=0.5)
+    similar_time = (time.perf_counter() - started) / len(variants)
+    started = time.perf_counter()
+    filled = sum(memory.autofill(text) is not None for text in variants)
+    autofill_time = (time.perf_counter() - started) / len(variants)
+
+    return {
+        "entries": len(memory),
+        "build_seconds": round(build_time, 3),
+        "similar_ms": round(similar_time * 1000, 4),
+        "autofill_ms": round(autofill_time * 1000, 4),
+        "autofill_rate": round(filled / len(variants), 3)
+    }
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线翻译吞吐量基准测试")
+    parser.add_argument("--folder", action="append", help="真实插件文件夹，可多次指定；不指定时生成模拟插件")
+    parser.add_argument("--plugins", type=int, default=3, help="模拟插件数量")
+    parser.add_argument("--nodes", type=int, default=30, help="每个模拟插件的节点数")
+    parser.add_argument("--token-target", type=_int_list, default=[1500], help="每批 tokens 目标，逗号分隔")
+    parser.add_argument("--concurrency", type=_int_list, default=[1], help="并发数，逗号分隔")
+    parser.add_argument("--stream", action="store_true", help="使用流式输出")
+    parser.add_argument("--model", default="mock-model")
+    parser.add_argument("--latency", default="lognormal:0.5,0.5", help="模拟服务延迟分布")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--truncate-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--forks", type=int, default=0, help="额外生成的分叉插件数量，节点与某个模拟插件相同")
+    parser.add_argument("--global-dedup", action="store_true", help="跨插件全局去重，相同原文只翻译一次")
+    parser.add_argument("--incremental", type=float, default=0.0,
+                        help="按该比例模拟插件更新，以更新前的模拟译文为已有翻译进行增量翻译，0 表示完整翻译")
+    parser.add_argument("--auto-tune", action="store_true", help="以 tokens 目标和并发数为初始值自动调优")
+    parser.add_argument("--no-pretranslate", action="store_true", help="不使用本地规则预翻译，所有字段都发送给模型")
+    parser.add_argument("--full-prompt", action="store_true", help="每个请求附带完整术语表，不按批次裁剪系统提示词")
+    parser.add_argument("--wire-format", type=lambda v: [f for f in v.split(",") if f.strip()], default=["json"],
+                        help="批次请求和响应的格式（json、lines），逗号分隔")
+    parser.add_argument("--response-format", default="text", choices=["text", "json_object", "json_schema"],
+                        help="响应格式，json_object / json_schema 使用服务商的结构化输出")
+    parser.add_argument("--explicit-cache", action="store_true", help="使用服务商的显式上下文缓存接口")
+    parser.add_argument("--hedge", type=float, default=0, help="请求超过该百分位耗时仍未完成时发出对冲请求，0 表示不对冲")
+    parser.add_argument("--record", help="将模型响应录制到指定文件")
+    parser.add_argument("--replay", help="从指定录像文件回放模型响应，不启动模拟服务")
+    parser.add_argument("--replay-latency", type=float, default=0.0,
+                        help="回放时按录制耗时的倍数等待，0 表示立即返回")
+    parser.add_argument("--validate-fields", type=int, default=0,
+                        help="只在约该数量字段的模拟语料上测试校验引擎的耗时，不发送翻译请求")
+    parser.add_argument("--index-files", type=int, default=0,
+                        help="只在该数量文件的模拟翻译仓库上测试索引的建立和查询耗时，不发送翻译请求")
+    parser.add_argument("--memory", action="store_true", help="所有插件共用模糊翻译记忆")
+    parser.add_argument("--memory-entries", type=int, default=0,
+                        help="只在该数量条目的模拟翻译记忆上测试查询耗时，不发送翻译请求")
+    parser.add_argument("--output", help="将结果保存为 JSON 文件")
+    parser.add_argument("--out", help="运行统计、预算日志和调试文件的输出目录，默认为退出时删除的临时目录")
+    args = parser.parse_args()
+
+    # 翻译流程的运行统计和调试文件不写入程序目录下的 output
+    if args.out:
+        FileUtils.output_root = os.path.abspath(args.out)
+    else:
+        FileUtils.output_root = tempfile.mkdtemp(prefix="benchmark_output_")
+        atexit.register(shutil.rmtree, FileUtils.output_root, True)
+
+    if args.validate_fields:
+        result = run_validation_benchmark(args.validate_fields, seed=args.seed)
+        print(
+            f"[校验] {result['fields']} 个字段 ({result['nodes']} 节点, {result['batches']} 批): "
+            f"旧方式 {result['legacy_seconds']:.3f}s, 校验引擎 {result['engine_seconds']:.3f}s "
+            f"(缓存后 {result['engine_warm_seconds']:.3f}s), "
+            f"发现问题 {result['issues']} 个, 还原中文键名 {result['key_repairs']} 个"
+        )
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False, indent=2)
+        return
+
+    if args.index_files:
+        result = run_index_benchmark(args.index_files, seed=args.seed)
+        print(
+            f"[索引] {result['files']} 个文件 ({result['nodes']} 节点, {result['fields']} 字段, "
+            f"{result['index_bytes'] / 1024 / 1024:.1f} MB): 首次建立 {result['cold_seconds']:.2f}s, "
+            f"无变化更新 {result['warm_seconds']:.3f}s, 修改 {result['touched_files']} 个文件后更新 "
+            f"{result['touched_seconds']:.3f}s, 节点查询 {result['node_lookup_ms']:.3f}ms "
+            f"(命中率 {result['lookup_hit_rate']:.0%}), 字段查询 {result['field_lookup_ms']:.3f}ms"
+        )
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False, indent=2)
+        return
+
+    if args.memory_entries:
+        result = run_memory_benchmark(args.memory_entries, seed=args.seed)
+        print(
+            f"[记忆] {result['entries']} 条译文: 建立 {result['build_seconds']:.2f}s, "
+            f"相似查询 (top-5) {result['similar_ms']:.3f}ms, 自动沿用判断 {result['autofill_ms']:.4f}ms "
+            f"(可沿用 {result['autofill_rate']:.0%})"
+        )
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False, indent=2)
+        return
+
+    plugins = load_plugins(args)
+    if not plugins:
+        print("[错误] 没有可用于测试的插件")
+        return
+
+    incremental = None
+    if args.incremental:
+        rng = random.Random(args.seed)
+        incremental = {name: (mock_previous(nodes), nodes) for name, nodes in plugins}
+        plugins = [(name, update_plugin(nodes, rng, args.incremental)) for name, nodes in plugins]
+
+    cassette = None
+    if args.replay:
+        cassette = Cassette(args.replay, mode="replay", latency_scale=args.replay_latency)
+    elif args.record:
+        cassette = Cassette(args.record, mode="record")
+
+    results = []
+    for token_target in args.token_target:
+        for concurrency in args.concurrency:
+            for wire_format in args.wire_format:
+                if args.replay:
+                    # 回放时所有响应来自录像，服务地址不会被访问
+                    result = run_batch_task("http://127.0.0.1:9/v1", args.model, plugins,
+                                            token_target, concurrency, args.stream, cassette, args.hedge, args.auto_tune,
+                                            pretranslate=not args.no_pretranslate, trim_prompt=not args.full_prompt,
+                                            explicit_cache=args.explicit_cache, wire_format=wire_format,
+                                            response_format=args.response_format, global_dedup=args.global_dedup,
+                                            incremental=incremental, memory=args.memory)
+                    result["cassette"] = cassette.summary()
+                    results.append(result)
+                else:
+                    # 每组参数使用相同种子的新服务，保证注入的错误序列一致
+                    server = MockLLMServer(
+                        latency=args.latency, error_rate=args.error_rate,
+                        rate_limit_rate=args.rate_limit_rate, truncate_rate=args.truncate_rate,
+                        malformed_rate=args.malformed_rate, seed=args.seed
+                    )
+                    with server:
+                        result = run_batch_task(server.base_url, args.model, plugins,
+                                                token_target, concurrency, args.stream, cassette, args.hedge, args.auto_tune,
+                                                pretranslate=not args.no_pretranslate, trim_prompt=not args.full_prompt,
+                                                explicit_cache=args.explicit_cache, wire_format=wire_format,
+                                                response_format=args.response_format,
+                                                global_dedup=args.global_dedup, incremental=incremental,
+                                                memory=args.memory)
+                        result["server"] = dict(server.stats)
+                        # 不同的系统消息前缀数量，为 1 时所有请求共用同一个可缓存的前缀
+                        result["server"]["prefixes"] = len(server.prefixes)
+                    results.append(result)
+                print(
+                    f"[基准] tokens 目标 {token_target:>5} 并发 {concurrency:>2} 格式 {wire_format:<5}: "
+                    f"{result['nodes']} 节点 {result['wall_time']:.2f}s "
+                    f"({result['nodes_per_sec']:.2f} 节点/秒), "
+                    f"{result['requests']} 次请求, {result['total_tokens']} tokens ({result['tokens_per_node']:.1f}/节点) "
+                    f"(输入 {result['prompt_tokens']}, 其中提示词说明约 {result['system_prompt_tokens']}, "
+                    f"缓存命中 {result['cached_tokens']}), "
+                    f"批次耗时 p50 {result['batch_latency_p50']:.2f}s / p95 {result['batch_latency_p95']:.2f}s"
+                    + (f", 对冲 {result['hedges']} 次 (先完成 {result['hedge_wins']} 次, 额外 {result['hedge_extra_tokens']} tokens)"
+                       if result["hedges"] else "")
+                    + (f", 预翻译 {result['pretranslated_fields']}/{result['pretranslate_fields']} 个字段 "
+                       f"(节省约 {result['pretranslate_saved_tokens']} tokens)" if result["pretranslate_fields"] else "")
+                    + (f", 调优后 tokens 目标 {result['auto_tune']['token_target']} 并发 {result['auto_tune']['concurrency']}"
+                       if result["auto_tune"] else "")
+                    + (f", 全局去重 {result['global_dedup']['occurrences']} 处原文 → {result['global_dedup']['unique']} 个"
+                       if result["global_dedup"] else "")
+                    + (f", 翻译记忆沿用 {result['memory_autofilled']} 个 (参考译文 {result['memory_examples']} 条)"
+                       if args.memory else "")
+                    + (f", 增量翻译沿用 {result['reused_fields']} 个字段" if incremental else "")
+                    + (f", 解析失败 {result['parse_failures']}/{result['requests']} 次请求, 跳过格式错误词条 {result['parse_errors']} 个"
+                       if result["parse_failures"] or result["parse_errors"] else "")
+                    + (f", 补译 {result['repair_fields']} 个字段 ({result['repair_requests']} 次请求)"
+                       if result["repair_fields"] else "")
+                    + (f", 注入格式错误 {result['server']['malformed']} 次"
+                       if result.get("server", {}).get("malformed") else "")
+                    + (f", 系统消息前缀 {result['server']['prefixes']} 种" if "server" in result else "")
+                    + (f", 失败插件 {len(result['failed_plugins'])} 个" if result["failed_plugins"] else "")
+                )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"[保存] 结果已保存到: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,18 @@ import threading
 import os
 from src.node_parser import NodeParser
 from src.translator import Translator
+from src.api_client import ClientManager
+from src.cost_planner import CostPlanner, Calibration, PriceTable, format_duration
+from src.budget import Budget
+from src.provider_pool import ProviderPool
+from src.hedging import HedgePolicy
+from src.auto_tuner import AutoTuner
+from src.glossary import Glossary
+from src.context_cache import ContextCache
+from src.global_dedup import GlobalDedup
+from src.translation_index import TranslationIndex
+from src.translation_memory import TranslationMemory
+from src.prompts import PromptTemplate
 from src.file_utils import FileUtils
 import sys
 import json
@@ -58,6 +70,9 @@ class ComfyUITranslator:
         # 加载配置
         self.config = self._load_config()
         
+        # 按配置初始化共享连接池
+        ClientManager.configure(**self.config.get("client", {}))
+        
         # 创建标签页
         self.tab_control = ttk.Notebook(self.main_frame)
         self.tab_control.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=5)
@@ -91,6 +106,14 @@ class ComfyUITranslator:
         self.folder_path = tk.StringVar()  # 添加 folder_path 变量
         self.plugin_folders = []  # 存储选择的文件夹列表
         
+        # 已有翻译仓库的索引，启动时在后台按文件修改时间增量更新
+        self.translation_index = None
+        self.translation_memory = None
+        self.context_cache = None
+        self._index_lock = threading.Lock()
+        if self.config.get("translation_index", {}).get("enabled", False):
+            threading.Thread(target=self._update_translation_index, daemon=True).start()
+        
     def select_folder(self):
         folder = filedialog.askdirectory()
         if folder:
@@ -312,16 +335,17 @@ class ComfyUITranslator:
         
         threading.Thread(target=test_task, daemon=True).start()
 
-    def _save_api_key(self, api_key: str):
-        """保存 API 密钥和模型 ID"""
-        config = {
-            "api_keys": {
-                "volcengine": api_key
-            },
-            "model_ids": {
-                "volcengine": self.model_id.get()  # 同时保存当前的模型 ID
-            }
+    def _save_api_key(self, api_key: str = None):
+        """保存 API 密钥和模型 ID，保留配置文件中的其他设置"""
+        if api_key is None:
+            api_key = self.api_key.get().strip()
+        config = dict(self.config)
+        config["api_keys"] = {**config.get("api_keys", {}), "volcengine": api_key}
+        config["model_ids"] = {
+            **config.get("model_ids", {}),
+            "volcengine": self.model_id.get()  # 同时保存当前的模型 ID
         }
+        self.config = config
         try:
             with open('config.json', 'w', encoding='utf-8') as f:
                 json.dump(config, f, indent=4, ensure_ascii=False)
@@ -604,6 +628,9 @@ class ComfyUITranslator:
         self.detect_btn = ttk.Button(btn_frame, text="检测节点", width=button_width, command=self.detect_nodes)
         self.detect_btn.pack(side=tk.LEFT, padx=5)
         
+        self.estimate_btn = ttk.Button(btn_frame, text="预估费用", width=button_width, command=self.estimate_cost)
+        self.estimate_btn.pack(side=tk.LEFT, padx=5)
+        
         self.view_json_btn = ttk.Button(
             btn_frame, 
             text="查看待翻译JSON",
@@ -626,13 +653,34 @@ class ComfyUITranslator:
         batch_frame = ttk.LabelFrame(control_frame, text="翻译设置", padding=5)
         batch_frame.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 0))
         
-        ttk.Label(batch_frame, text="一次性翻译节点数:").pack(side=tk.LEFT, padx=5)
-        self.batch_size = tk.StringVar(value="6")
-        batch_entry = ttk.Entry(batch_frame, textvariable=self.batch_size, width=5)
-        batch_entry.pack(side=tk.LEFT, padx=5)
+        ttk.Label(batch_frame, text="每批 tokens 目标:").pack(side=tk.LEFT, padx=5)
+        self.token_target = tk.StringVar(value="1500")
+        token_entry = ttk.Entry(batch_frame, textvariable=self.token_target, width=6)
+        token_entry.pack(side=tk.LEFT, padx=5)
         ttk.Label(
             batch_frame, 
-            text="(建议: 5-8, 数值越大速度越快，但可能超过模型上下文限制)"
+            text="(建议: 1000-2000, 按节点大小自动分批，数值越大请求越少)"
+        ).pack(side=tk.LEFT, padx=5)
+        
+        # 流式输出：逐个节点提交结果，连接中断时只重新请求剩余部分
+        self.stream_output = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            batch_frame, 
+            text="流式输出", 
+            variable=self.stream_output
+        ).pack(side=tk.LEFT, padx=5)
+        
+        # 并发请求数：同时翻译的批次数
+        ttk.Label(batch_frame, text="并发数:").pack(side=tk.LEFT, padx=5)
+        self.concurrency = tk.StringVar(value="1")
+        ttk.Entry(batch_frame, textvariable=self.concurrency, width=4).pack(side=tk.LEFT, padx=5)
+        
+        # 自动调优：运行中按截断、校验失败和限流情况调整 tokens 目标和并发数
+        self.auto_tune = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            batch_frame, 
+            text="自动调优", 
+            variable=self.auto_tune
         ).pack(side=tk.LEFT, padx=5)
         
         # 创建日志框架（左右布局）
@@ -740,14 +788,10 @@ class ComfyUITranslator:
             tk.messagebox.showerror("错误", "请输入 API 密钥和模型 ID！")
             return
         
-        # 验证批次大小
-        try:
-            batch_size = int(self.batch_size.get())
-            if batch_size < 1:
-                raise ValueError("批次大小必须大于 0")
-        except ValueError as e:
-            tk.messagebox.showerror("错误", f"批次大小设置无效: {str(e)}")
+        settings = self._read_translation_settings()
+        if not settings:
             return
+        token_target, concurrency = settings
         
         # 禁用按钮
         self.start_btn.config(state=tk.DISABLED)
@@ -757,12 +801,132 @@ class ComfyUITranslator:
         # 在新线程中运行批量处理任务
         threading.Thread(
             target=self.batch_translation_task,
-            args=(api_key, batch_size, model_id),
+            args=(api_key, token_target, model_id, self.stream_output.get(), concurrency, self.auto_tune.get()),
             daemon=True
         ).start()
 
-    def batch_translation_task(self, api_key: str, batch_size: int, model_id: str):
+    def _read_translation_settings(self):
+        """读取并验证翻译设置
+        
+        Returns:
+            tuple: (每批 tokens 目标, 并发数)，设置无效时返回 None
+        """
+        # 验证每批 tokens 目标
+        try:
+            token_target = int(self.token_target.get())
+            if token_target < 200:
+                raise ValueError("每批 tokens 目标不能小于 200")
+        except ValueError as e:
+            tk.messagebox.showerror("错误", f"每批 tokens 目标设置无效: {str(e)}")
+            return None
+        
+        # 验证并发数
+        try:
+            concurrency = int(self.concurrency.get())
+            if concurrency < 1:
+                raise ValueError("并发数不能小于 1")
+        except ValueError as e:
+            tk.messagebox.showerror("错误", f"并发数设置无效: {str(e)}")
+            return None
+        
+        return token_target, concurrency
+
+    def estimate_cost(self):
+        """预估翻译费用和耗时（检测节点并规划批次，不调用 API）"""
+        folders = list(getattr(self, 'plugin_folders', []) or [])
+        if not folders and self.folder_path.get():
+            folders = [self.folder_path.get()]
+        if not folders:
+            tk.messagebox.showerror("错误", "请先选择插件文件夹！")
+            return
+        
+        settings = self._read_translation_settings()
+        if not settings:
+            return
+        token_target, concurrency = settings
+        
+        self.estimate_btn.config(state=tk.DISABLED)
+        threading.Thread(
+            target=self.cost_estimate_task,
+            args=(folders, token_target, concurrency, self.model_id.get().strip()),
+            daemon=True
+        ).start()
+
+    def cost_estimate_task(self, folders: List[str], token_target: int, concurrency: int, model_id: str):
+        """费用预估任务"""
+        try:
+            self.log(f"\n[预估] 正在检测 {len(folders)} 个插件的节点...")
+            plugins = []
+            for plugin_folder in folders:
+                node_parser = NodeParser(plugin_folder)
+                nodes = node_parser.optimize_node_info(node_parser.parse_folder(plugin_folder))
+                if nodes:
+                    plugins.append((os.path.basename(plugin_folder), nodes))
+            
+            # 根据历史运行统计校准估算
+            base_path = os.path.dirname(os.path.abspath(__file__))
+            logs_dir = FileUtils.init_output_dirs(base_path)["logs"]
+            calibration = Calibration.from_logs(logs_dir, model_id, **self.config.get("planner", {}))
+            
+            planner = self._create_cost_planner(token_target, concurrency, model_id, calibration)
+            result = planner.plan(plugins)
+            currency = result["currency"]
+            
+            for plugin in result["plugins"]:
+                self.log(
+                    f"[预估] {plugin['plugin']}: {plugin['nodes']} 个节点, {plugin['batches']} 个批次, "
+                    f"约 {plugin['prompt_tokens'] + plugin['completion_tokens']} tokens, "
+                    f"{currency}{plugin['cost']:.4f}, {format_duration(plugin['wall_time'])}"
+                )
+            
+            source = f"根据最近 {calibration.samples} 次运行校准" if calibration.samples else "未校准，使用默认估算"
+            self.log(f"[预估] 合计 {len(result['plugins'])} 个插件 {result['nodes']} 个节点（{source}）:")
+            self.log(f"       - 请求: 约 {result['requests']} 次 ({result['batches']} 个批次)")
+            self.log(f"       - 输入: 约 {result['prompt_tokens']} tokens")
+            self.log(f"       - 输出: 约 {result['completion_tokens']} tokens")
+            self.log(f"       - 费用: 约 {currency}{result['cost']:.4f}")
+            self.log(f"       - 耗时: 约 {format_duration(result['wall_time'])} (并发数 {concurrency})")
+            
+            if self.config.get("global_dedup", False) and len(plugins) > 1:
+                self._log_dedup_savings(GlobalDedup(plugins).estimate_savings(planner))
+        except Exception as e:
+            self.log(f"[错误] 费用预估失败: {str(e)}")
+            logging.error(f"费用预估失败: {str(e)}")
+        finally:
+            self.root.after(0, lambda: self.estimate_btn.config(state=tk.NORMAL))
+
+    def _create_cost_planner(self, token_target: int, concurrency: int, model_id: str,
+                             calibration: Calibration = None) -> CostPlanner:
+        """按当前配置创建费用预估器"""
+        client_config = self.config.get("client", {})
+        return CostPlanner(
+            PromptTemplate.get_translator_prompt(),
+            token_target=token_target,
+            concurrency=concurrency,
+            rpm=client_config.get("rpm", 0),
+            tpm=client_config.get("tpm", 0),
+            price=PriceTable(self.config.get("pricing"), "volcengine", model_id),
+            calibration=calibration,
+            glossary=Glossary.default() if self.config.get("trim_prompt", True) else None,
+            pretranslate=self.config.get("pretranslate", True)
+        )
+
+    def _log_dedup_savings(self, savings: dict):
+        """输出全局去重节省的请求和 tokens"""
+        self.log(
+            f"[去重] {len(self.plugin_folders)} 个插件共 {savings['occurrences']} 处原文，"
+            f"其中唯一原文 {savings['unique']} 个"
+        )
+        self.log(
+            f"[去重] 预计请求 {savings['separate_requests']} → {savings['merged_requests']} 次 "
+            f"(节省 {savings['saved_requests']} 次)，tokens {savings['separate_tokens']} → {savings['merged_tokens']} "
+            f"(节省 {savings['saved_tokens']}，约 {savings['currency']}{savings['saved_cost']:.4f})"
+        )
+
+    def batch_translation_task(self, api_key: str, token_target: int, model_id: str, stream: bool = False,
+                               concurrency: int = 1, auto_tune: bool = False):
         """批量翻译任务"""
+        tuner = tune_key = None
         try:
             # 1. 创建时间戳目录
             self.current_output_dir = os.path.join(  # 保存当前输出目录路径
@@ -782,42 +946,122 @@ class ComfyUITranslator:
             
             successful_translations = []  # 记录成功的翻译
             
-            for i, plugin_folder in enumerate(self.plugin_folders, 1):
-                if not self.translating:
-                    raise Exception("翻译已被用户终止")
-                
-                plugin_name = os.path.basename(plugin_folder)
-                self.log(f"\n[翻译进度] 正在翻译第 {i}/{total_plugins} 个插件: {plugin_name}")
-                
+            # 预算上限：整个任务共用一个，每个插件各有一个
+            budget_config = self.config.get("budget", {})
+            price = PriceTable(self.config.get("pricing"), "volcengine", model_id)
+            run_budget = Budget.from_config(budget_config.get("run"), price, "本次任务")
+            
+            # 配置了其他服务时，整个任务共用一个服务池，熔断状态在插件之间保留
+            pool = self._create_provider_pool(api_key, model_id)
+            if pool:
+                self.log(f"[服务] 使用 {len(pool.providers)} 个服务: {', '.join(p.label for p in pool.providers)}")
+            
+            # 模型梯队：未通过校验的节点交给更强的模型
+            cascade = self._create_cascade(api_key)
+            if cascade:
+                self.log(f"[梯队] 未通过校验的批次依次升级到: {' → '.join(p.providers[0].label for p in cascade)}")
+            
+            # 翻译前更新已有翻译仓库的索引（只重新读取修改过的文件）
+            self._update_translation_index()
+            
+            # 模糊翻译记忆在插件之间共用，前面插件的译文可供后面的插件沿用和参考
+            self.translation_memory = TranslationMemory.from_config(self.config.get("translation_memory"))
+            if self.translation_memory is not None and self.translation_index is not None:
+                self.translation_memory.add_many(self.translation_index.field_pairs())
+                self.log(f"[记忆] 从已有翻译仓库载入 {len(self.translation_memory)} 条译文")
+            
+            # 上下文缓存在插件之间共用，显式上下文每个服务和前缀只创建一次
+            self.context_cache = ContextCache.from_config(self.config.get("context_cache"))
+            
+            # 对冲请求策略在插件之间共用，耗时记录持续积累
+            hedge = HedgePolicy.from_config(self.config.get("hedging"))
+            
+            # 自动调优在插件之间共用，以上次保存的该服务和模型的参数为初始值
+            tuner = None
+            if auto_tune:
+                tune_key = "+".join(p.label for p in pool.providers) if pool else f"volcengine/{model_id}"
+                saved = AutoTuner.load(self._auto_tune_file(), tune_key)
+                if saved:
+                    token_target, concurrency = saved["token_target"], saved["concurrency"]
+                    self.log(f"[调优] 使用上次保存的参数: 每批 tokens 目标 {token_target}，并发数 {concurrency}")
+                tuner = AutoTuner.from_config(self.config.get("auto_tune"), token_target, concurrency)
+            
+            # 全局去重：所有插件的唯一原文合并后只翻译一次，再分发回各插件
+            if self.config.get("global_dedup", False) and total_plugins > 1:
                 try:
-                    # 2.1 翻译节点
-                    translated_nodes = self._translate_single_plugin(
-                        plugin_folder,
-                        plugin_name,
+                    successful_translations = self._translate_deduplicated(
                         api_key,
                         model_id,
-                        batch_size,
-                        self.current_output_dir
+                        token_target,
+                        self.current_output_dir,
+                        stream,
+                        concurrency,
+                        [run_budget],
+                        pool,
+                        hedge,
+                        tuner,
+                        cascade
                     )
+                except Exception as e:
+                    if str(e) == "翻译已被用户终止":
+                        raise
+                    self.log(f"[错误] 全局去重翻译失败: {str(e)}")
+            else:
+                for i, plugin_folder in enumerate(self.plugin_folders, 1):
+                    if not self.translating:
+                        raise Exception("翻译已被用户终止")
                     
-                    # 2.2 保存翻译结果
-                    result_file = os.path.join(self.current_output_dir, f"{plugin_name}.json")
-                    FileUtils.save_json(translated_nodes, result_file)
-                    
-                    # 2.3 验证保存结果
-                    if not os.path.exists(result_file):
-                        raise Exception(f"保存失败: {result_file}")
+                    plugin_name = os.path.basename(plugin_folder)
                     
-                    successful_translations.append({
-                        'plugin_name': plugin_name,
-                        'result_file': result_file
-                    })
+                    # 任务预算已用完时不再开始新插件
+                    if run_budget and run_budget.check():
+                        skipped = [os.path.basename(folder) for folder in self.plugin_folders[i - 1:]]
+                        self.log(f"\n[预算] {run_budget.reason}，跳过剩余 {len(skipped)} 个插件: {', '.join(skipped)}")
+                        break
                     
-                    self.log(f"[完成] 插件 {plugin_name} 翻译完成")
+                    self.log(f"\n[翻译进度] 正在翻译第 {i}/{total_plugins} 个插件: {plugin_name}")
                     
-                except Exception as e:
-                    self.log(f"[错误] 插件 {plugin_name} 翻译失败: {str(e)}")
-                    continue
+                    try:
+                        # 2.1 翻译节点
+                        plugin_budget = Budget.from_config(budget_config.get("plugin"), price, f"插件 {plugin_name} ")
+                        translated_nodes, stop_reason = self._translate_single_plugin(
+                            plugin_folder,
+                            plugin_name,
+                            api_key,
+                            model_id,
+                            token_target,
+                            self.current_output_dir,
+                            stream,
+                            concurrency,
+                            [run_budget, plugin_budget],
+                            pool,
+                            hedge,
+                            tuner,
+                            cascade
+                        )
+                        
+                        # 2.2 保存翻译结果
+                        result_file = os.path.join(self.current_output_dir, f"{plugin_name}.json")
+                        FileUtils.save_json(translated_nodes, result_file)
+                        
+                        # 2.3 验证保存结果
+                        if not os.path.exists(result_file):
+                            raise Exception(f"保存失败: {result_file}")
+                        
+                        successful_translations.append({
+                            'plugin_name': plugin_name,
+                            'result_file': result_file,
+                            'partial': bool(stop_reason)
+                        })
+                        
+                        if stop_reason:
+                            self.log(f"[预算] 插件 {plugin_name} 因预算停止，已保存部分结果: {result_file}")
+                        else:
+                            self.log(f"[完成] 插件 {plugin_name} 翻译完成")
+                        
+                    except Exception as e:
+                        self.log(f"[错误] 插件 {plugin_name} 翻译失败: {str(e)}")
+                        continue
             
             # 3. 清理临时文件
             temp_dir = os.path.join(self.current_output_dir, "temp")
@@ -851,6 +1095,13 @@ class ComfyUITranslator:
                 self.log(f"[错误] 批量处理出错: {str(e)}")
                 logging.error(f"批量处理出错: {str(e)}")
         finally:
+            # 自动调优的参数在所有插件结束（包括被终止）后保存一次
+            if tuner:
+                try:
+                    tuner.save(self._auto_tune_file(), tune_key)
+                except Exception as e:
+                    self.log(f"[警告] 保存自动调优参数失败: {str(e)}")
+            
             # 恢复按钮状态
             self.root.after(0, lambda: [
                 self.start_btn.config(state=tk.NORMAL),
@@ -920,10 +1171,41 @@ class ComfyUITranslator:
             logging.error(error_msg)  # 在终端显示错误
             messagebox.showerror("错误", error_msg)  # 同时显示错误对话框
 
+    def _auto_tune_file(self) -> str:
+        """自动调优结果文件，按服务和模型保存"""
+        return os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", "auto_tune.json")
+
+    def _create_cascade(self, api_key: str) -> List[ProviderPool]:
+        """根据 config.json 的 cascade 创建更强模型的梯队，每个启用的条目为一个梯队"""
+        tiers = []
+        for entry in self.config.get("cascade", []):
+            if not entry.get("enabled", True):
+                continue
+            # 火山引擎的梯队默认使用界面中填写的密钥
+            if entry.get("service", "volcengine") == "volcengine" and not entry.get("api_key"):
+                entry = {**entry, "api_key": api_key}
+            tiers.append(ProviderPool.from_config([entry], self.config, **self.config.get("provider_pool", {})))
+        return tiers
+
+    def _create_provider_pool(self, api_key: str, model_id: str):
+        """根据 config.json 的 providers 创建服务池，没有启用其他服务时返回 None"""
+        entries = [e for e in self.config.get("providers", []) if e.get("enabled", True)]
+        if not entries:
+            return None
+        entries = [{"service": "volcengine", "api_key": api_key, "model_id": model_id}] + entries
+        return ProviderPool.from_config(entries, self.config, **self.config.get("provider_pool", {}))
+
     def _translate_single_plugin(self, plugin_folder: str, plugin_name: str,
-                               api_key: str, model_id: str, batch_size: int,
-                               timestamp_dir: str) -> dict:
-        """翻译单个插件"""
+                               api_key: str, model_id: str, token_target: int,
+                               timestamp_dir: str, stream: bool = False, concurrency: int = 1,
+                               budgets: List[Budget] = None, pool: ProviderPool = None,
+                               hedge: HedgePolicy = None, tuner: AutoTuner = None,
+                               cascade: List[ProviderPool] = None) -> tuple:
+        """翻译单个插件
+        
+        Returns:
+            tuple: (翻译结果, 因预算停止的原因，未停止时为 None)
+        """
         # 1. 解析节点
         node_parser = NodeParser(plugin_folder)
         nodes = node_parser.parse_folder(plugin_folder)
@@ -934,8 +1216,167 @@ class ComfyUITranslator:
         # 2. 优化节点信息
         nodes = node_parser.optimize_node_info(nodes)
         
-        # 3. 翻译节点
-        translator = Translator(api_key=api_key, model_id=model_id)
+        # 3. 增量翻译：已有翻译文件时只翻译差异部分
+        previous, previous_source = self._load_previous_translation(plugin_name)
+        
+        # 4. 翻译节点
+        translated_nodes, stop_reason = self._translate_parsed_nodes(
+            nodes, plugin_folder, plugin_name, api_key, model_id, token_target, timestamp_dir, stream,
+            concurrency, budgets, pool, hedge, tuner, cascade, previous, previous_source
+        )
+        
+        # 5. 保存本次翻译的英文原文，下次增量翻译时用于发现原文有变化的标题和字段
+        if not stop_reason:
+            FileUtils.save_json(nodes, self._source_snapshot_file(plugin_name))
+        return translated_nodes, stop_reason
+
+    def _update_translation_index(self):
+        """按 config.json 的 translation_index 打开并增量更新已有翻译仓库的索引，未启用时不做任何事"""
+        index_config = self.config.get("translation_index", {})
+        repo_dir = index_config.get("repo_dir", "")
+        if not index_config.get("enabled", False):
+            return
+        if not repo_dir or not os.path.isdir(repo_dir):
+            self.log(f"[警告] 翻译仓库文件夹不存在，不使用索引: {repo_dir}")
+            return
+        
+        with self._index_lock:
+            try:
+                if self.translation_index is None:
+                    self.translation_index = TranslationIndex(os.path.join(
+                        os.path.dirname(os.path.abspath(__file__)), "output", "translation_index.sqlite"
+                    ))
+                result = self.translation_index.update(TranslationIndex.nodes_dir(repo_dir))
+                summary = self.translation_index.summary()
+                self.log(
+                    f"[索引] 已有翻译仓库: {summary['files']} 个文件，{summary['nodes']} 个节点，"
+                    f"{summary['fields']} 个字段（新增 {result['added']}，更新 {result['updated']}，"
+                    f"删除 {result['removed']}，读取失败 {result['failed']}，用时 {result['seconds']:.2f} 秒）"
+                )
+            except Exception as e:
+                self.log(f"[警告] 更新翻译仓库索引失败，不使用索引: {str(e)}")
+                self.translation_index = None
+
+    def _source_snapshot_file(self, plugin_name: str) -> str:
+        """插件上次翻译时的英文原文文件"""
+        return os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", "sources", f"{plugin_name}.json")
+
+    def _load_previous_translation(self, plugin_name: str) -> tuple:
+        """读取增量翻译使用的已有翻译文件和对应的英文原文
+        
+        已有翻译文件为 config.json 中 incremental.previous_dir（如 AIGODLIKE-ComfyUI-Translation/zh-CN/Nodes）
+        下的 插件名.json
+        
+        Returns:
+            tuple: (已有翻译, 英文原文)，未启用增量翻译或没有已有翻译时均为 None
+        """
+        incremental = self.config.get("incremental", {})
+        previous_dir = incremental.get("previous_dir", "")
+        if not incremental.get("enabled", False) or not previous_dir:
+            return None, None
+        
+        previous_file = os.path.join(previous_dir, f"{plugin_name}.json")
+        if not os.path.exists(previous_file):
+            self.log(f"[增量] 未找到已有翻译文件 {previous_file}，完整翻译")
+            return None, None
+        try:
+            previous = FileUtils.load_json(previous_file)
+        except Exception as e:
+            self.log(f"[警告] 读取已有翻译文件失败，完整翻译: {str(e)}")
+            return None, None
+        
+        previous_source = None
+        source_file = self._source_snapshot_file(plugin_name)
+        if os.path.exists(source_file):
+            try:
+                previous_source = FileUtils.load_json(source_file)
+            except Exception:
+                previous_source = None
+        self.log(
+            f"[增量] 使用已有翻译文件: {previous_file}"
+            + ("" if previous_source else "（没有上次翻译的原文，只检测新增的节点和字段）")
+        )
+        return previous, previous_source
+
+    def _translate_deduplicated(self, api_key: str, model_id: str, token_target: int,
+                                timestamp_dir: str, stream: bool = False, concurrency: int = 1,
+                                budgets: List[Budget] = None, pool: ProviderPool = None,
+                                hedge: HedgePolicy = None, tuner: AutoTuner = None,
+                                cascade: List[ProviderPool] = None) -> List[dict]:
+        """跨插件全局去重后翻译所有插件
+        
+        所有插件中相同的标题和字段只翻译一次，译文按原文分发回每个插件并分别保存
+        
+        Returns:
+            List[dict]: 成功保存的插件 {plugin_name, result_file, partial}
+        """
+        plugins = []
+        for plugin_folder in self.plugin_folders:
+            plugin_name = os.path.basename(plugin_folder)
+            node_parser = NodeParser(plugin_folder)
+            nodes = node_parser.parse_folder(plugin_folder)
+            if not nodes:
+                self.log(f"[错误] 插件 {plugin_name} 翻译失败: 未检测到节点")
+                continue
+            plugins.append((plugin_name, node_parser.optimize_node_info(nodes)))
+        if not plugins:
+            return []
+        
+        dedup = GlobalDedup(plugins)
+        self._log_dedup_savings(dedup.estimate_savings(self._create_cost_planner(token_target, concurrency, model_id)))
+        self.log(f"\n[翻译进度] 正在翻译 {len(plugins)} 个插件去重后的 {len(dedup.nodes)} 个节点")
+        
+        translated_nodes, stop_reason = self._translate_parsed_nodes(
+            dedup.nodes,
+            os.path.join(timestamp_dir, "global_dedup"),
+            "global_dedup",
+            api_key,
+            model_id,
+            token_target,
+            timestamp_dir,
+            stream,
+            concurrency,
+            budgets,
+            pool,
+            hedge,
+            tuner,
+            cascade
+        )
+        
+        successful_translations = []
+        for plugin_name, plugin_nodes, partial in dedup.fan_out(translated_nodes):
+            result_file = os.path.join(timestamp_dir, f"{plugin_name}.json")
+            FileUtils.save_json(plugin_nodes, result_file)
+            successful_translations.append({
+                'plugin_name': plugin_name,
+                'result_file': result_file,
+                'partial': partial
+            })
+            if partial:
+                self.log(f"[预算] 插件 {plugin_name} 因{stop_reason or '翻译未完成'}只保存了部分结果: {result_file}")
+            else:
+                self.log(f"[完成] 插件 {plugin_name} 翻译完成")
+        return successful_translations
+
+    def _translate_parsed_nodes(self, nodes: dict, plugin_folder: str, plugin_name: str,
+                                api_key: str, model_id: str, token_target: int,
+                                timestamp_dir: str, stream: bool = False, concurrency: int = 1,
+                                budgets: List[Budget] = None, pool: ProviderPool = None,
+                                hedge: HedgePolicy = None, tuner: AutoTuner = None,
+                                cascade: List[ProviderPool] = None, previous: dict = None,
+                                previous_source: dict = None) -> tuple:
+        """翻译已解析的节点
+        
+        Returns:
+            tuple: (翻译结果, 因预算停止的原因，未停止时为 None)
+        """
+        translator = Translator(
+            api_key=api_key, 
+            model_id=model_id, 
+            pricing=self.config.get("pricing"), 
+            pool=pool, 
+            cascade=cascade
+        )
         
         def update_progress(progress: int, message: str = None):
             if not self.translating:
@@ -955,12 +1396,26 @@ class ComfyUITranslator:
         translated_nodes = translator.translate_nodes(
             nodes,
             folder_path=plugin_folder,
-            batch_size=batch_size,
             update_progress=update_progress,
-            temp_dir=temp_dir  # 为每个插件创建独立的临时目录
+            temp_dir=temp_dir,  # 为每个插件创建独立的临时目录
+            token_target=token_target,
+            stream=stream,
+            concurrency=concurrency,
+            budgets=budgets,
+            hedge=hedge,
+            tuner=tuner,
+            pretranslate=self.config.get("pretranslate", True),
+            trim_prompt=self.config.get("trim_prompt", True),
+            context_cache=self.context_cache,
+            wire_format=self.config.get("wire_format", "json"),
+            response_format=self.config.get("response_format", "text"),
+            previous=previous,
+            previous_source=previous_source,
+            index=self.translation_index,
+            memory=self.translation_memory
         )
         
-        return translated_nodes
+        return translated_nodes, translator.stop_reason
 
     def setup_help_ui(self):
         """设置操作说明界面"""
@@ -996,7 +1451,18 @@ class ComfyUITranslator:
 - 检测完成后，您可以点击"查看待翻译 JSON"按钮，查看检测到的节点。
 
 ### 第五步：开始翻译
-- 设置一次性翻译的节点数（建议：5-8）。
+- 设置每批 tokens 目标（建议：1000-2000），程序会按节点大小自动分批，过大的节点会被拆分翻译。
+- 设置并发数可同时翻译多个批次，账户限流较严时请保持为 1。
+- 勾选"自动调优"后，程序以上面的设置为初始值，在翻译过程中根据响应截断、校验失败和限流情况自动调整 tokens 目标和并发数，调整结果按服务和模型保存，下次运行时自动沿用。
+- 点击"预估费用"按钮，可在不调用 API 的情况下预估请求数、tokens、费用和耗时。
+- 可在 config.json 的 budget 中设置整个任务（run）和单个插件（plugin）的 tokens、费用和时间上限，达到上限时停止翻译并保存已完成的部分。
+- 可在 config.json 的 providers 中启用其他服务（如阿里云、硅基流动），批次会按各服务的延迟、错误率和价格分配，某个服务出错或被限流时自动切换，欠费或密钥无效的服务会被停用。
+- 可在 config.json 的 cascade 中配置更强的模型：批次先由界面中的模型翻译，缺失、未翻译或格式错误的节点再交给更强的模型，翻译结束后会显示各梯队的用量和节省的费用。
+- 同时翻译多个插件时，可在 config.json 中设置 global_dedup 为 true：所有插件中相同的标题和字段只翻译一次，译文再分发回各插件，分叉或重新打包的插件越多节省越多；此时只使用整个任务（run）的预算。
+- 插件更新后，可在 config.json 的 incremental 中启用增量翻译并将 previous_dir 设置为 AIGODLIKE-ComfyUI-Translation 的 zh-CN\\Nodes 文件夹：已有 插件名.json 时只翻译新增的节点、新增或改名的字段、有变化的标题以及译文为空或仍为英文的部分，其余沿用已有译文（全局去重时不使用）。
+- 可在 config.json 的 translation_index 中启用已有翻译仓库的索引并将 repo_dir 设置为 AIGODLIKE-ComfyUI-Translation 文件夹：所有 zh-CN\\Nodes 下的翻译文件建立为本地索引（只重新读取修改过的文件），翻译前先沿用同名节点的人工校对译文和相同字段最常用的译文。
+- 可在 config.json 的 translation_memory 中启用模糊翻译记忆：已翻译的词条（包括已有翻译仓库中的译文）建立为字符三元组索引，只差大小写、分隔符、单复数或末尾编号的词条（如 image_1 / image1 / images）直接沿用译文，其余请求附带最相似的已有译文作为参考（examples 为每个请求最多附带的条数，min_score 为最低相似度）。
+- 可在 config.json 的 hedging 中启用对冲请求：请求超过近期 p90 耗时仍未完成时再发出一个相同的请求，先完成的结果生效，可减少个别慢请求拖长的总耗时，但会多用一些 tokens。
 - 点击"开始翻译"按钮，程序将开始翻译过程。
 
 ### 第六步：查看翻译结果
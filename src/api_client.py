@@ -0,0 +1,156 @@
+"""API 客户端管理模块"""
+
+import atexit
+import threading
+from typing import Dict, List, Tuple
+
+import httpx
+from openai import OpenAI
+
+from .rate_limiter import RateLimiter
+
+# 火山引擎方舟 API 地址
+VOLCENGINE_BASE_URL = "https://ark.cn-beijing.volces.com/api/v3"
+
+
+class ClientManager:
+    """进程级 API 客户端管理器
+
+    所有插件和翻译任务共用一个 HTTP 连接池，保持长连接，
+    按 (API 密钥, 服务地址) 缓存 OpenAI 客户端，避免每个插件重复建立连接和 TLS 握手
+    """
+
+    _lock = threading.Lock()
+    _http_client: httpx.Client = None
+    _clients: Dict[Tuple[str, str, int], OpenAI] = {}
+    _rate_limiters: Dict[str, RateLimiter] = {}
+    _retired: List[httpx.Client] = []    # 重新配置前的连接池，可能仍有请求在使用，退出时才关闭
+
+    # 收到的限流（429）和服务端错误（5xx）响应数，包括客户端自动重试前的响应
+    throttled_responses = 0
+
+    # 连接池与超时配置
+    max_connections = 20
+    max_keepalive_connections = 10
+    keepalive_expiry = 60.0
+    connect_timeout = 10.0
+    read_timeout = 30.0
+    max_retries = 2
+
+    # 每个服务地址的限流配置，0 表示不限制
+    rpm = 0
+    tpm = 0
+
+    @classmethod
+    def configure(cls, max_connections: int = None, max_keepalive_connections: int = None,
+                  keepalive_expiry: float = None, connect_timeout: float = None,
+                  read_timeout: float = None, max_retries: int = None,
+                  rpm: int = None, tpm: int = None):
+        """修改连接池和超时配置，之后获取的客户端使用按新配置创建的连接池
+
+        已创建的连接池可能仍被其他任务的工作线程使用，不会立即关闭，在 close 时统一关闭
+
+        Args:
+            max_connections: 最大连接数
+            max_keepalive_connections: 最大保持的空闲长连接数
+            keepalive_expiry: 空闲长连接的保持时间（秒）
+            connect_timeout: 建立连接的超时时间（秒）
+            read_timeout: 读取响应的超时时间（秒），流式输出时为两次数据之间的最长等待时间
+            max_retries: 网络错误时的自动重试次数
+            rpm: 每个服务地址每分钟最多请求数
+            tpm: 每个服务地址每分钟最多输入 tokens 数
+        """
+        with cls._lock:
+            for name, value in (
+                ("max_connections", max_connections),
+                ("max_keepalive_connections", max_keepalive_connections),
+                ("keepalive_expiry", keepalive_expiry),
+                ("connect_timeout", connect_timeout),
+                ("read_timeout", read_timeout),
+                ("max_retries", max_retries),
+                ("rpm", rpm),
+                ("tpm", tpm),
+            ):
+                if value is not None:
+                    setattr(cls, name, value)
+            cls._rate_limiters = {}
+            if cls._http_client is not None:
+                cls._retired.append(cls._http_client)
+            cls._http_client = None
+            cls._clients = {}
+
+    @classmethod
+    def timeout(cls) -> httpx.Timeout:
+        """获取请求超时配置"""
+        return httpx.Timeout(cls.read_timeout, connect=cls.connect_timeout)
+
+    @classmethod
+    def get_client(cls, api_key: str, base_url: str = VOLCENGINE_BASE_URL,
+                   max_retries: int = None) -> OpenAI:
+        """获取共享连接池的 API 客户端
+
+        Args:
+            api_key: API 密钥
+            base_url: 服务地址
+            max_retries: 自动重试次数，为空时使用全局配置；多服务故障转移时设为 0，由服务池切换服务
+
+        Returns:
+            OpenAI: API 客户端
+        """
+        if max_retries is None:
+            max_retries = cls.max_retries
+        key = (api_key, base_url, max_retries)
+        with cls._lock:
+            if cls._http_client is None:
+                cls._http_client = httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=cls.max_connections,
+                        max_keepalive_connections=cls.max_keepalive_connections,
+                        keepalive_expiry=cls.keepalive_expiry
+                    ),
+                    timeout=cls.timeout(),
+                    event_hooks={"response": [cls._record_response]}
+                )
+            if key not in cls._clients:
+                cls._clients[key] = OpenAI(
+                    api_key=api_key,
+                    base_url=base_url,
+                    http_client=cls._http_client,
+                    timeout=cls.timeout(),
+                    max_retries=max_retries
+                )
+            return cls._clients[key]
+
+    @classmethod
+    def _record_response(cls, response: httpx.Response):
+        """统计限流和服务端错误响应，自动调优据此判断服务是否拥塞"""
+        if response.status_code == 429 or response.status_code >= 500:
+            with cls._lock:
+                cls.throttled_responses += 1
+
+    @classmethod
+    def get_rate_limiter(cls, base_url: str = VOLCENGINE_BASE_URL) -> RateLimiter:
+        """获取服务地址共用的限流器，所有插件和并发批次共享同一配额"""
+        with cls._lock:
+            if base_url not in cls._rate_limiters:
+                cls._rate_limiters[base_url] = RateLimiter(cls.rpm, cls.tpm)
+            return cls._rate_limiters[base_url]
+
+    @classmethod
+    def close(cls):
+        """关闭当前和重新配置前的全部连接池，只在退出时调用"""
+        with cls._lock:
+            cls._close_locked()
+
+    @classmethod
+    def _close_locked(cls):
+        for http_client in cls._retired:
+            http_client.close()
+        cls._retired = []
+        if cls._http_client is not None:
+            cls._http_client.close()
+        cls._http_client = None
+        cls._clients = {}
+
+
+atexit.register(ClientManager.close)
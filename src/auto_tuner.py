@@ -0,0 +1,205 @@
+"""批次大小与并发数自动调优模块"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+
+class AutoTuner:
+    """按 AIMD（加性增、乘性减）在运行中调整每批 tokens 目标和并发数
+
+    - 每完成一轮（与当前并发数相同个数的批次）且没有异常时，tokens 目标加一个固定步长，并发数加 1
+    - 出现响应截断或校验失败率超过阈值时，tokens 目标按比例缩小
+    - 出现限流、请求失败或单位 tokens 耗时明显变长时，并发数减半
+    - 增加并发后一轮的已验证节点吞吐量没有提升时回退，并将其作为并发上限，连续若干轮正常后再重新尝试
+
+    调优结果按服务和模型保存，下次运行时作为初始值
+    """
+
+    def __init__(self, token_target: int = 1500, concurrency: int = 1, min_token_target: int = 300,
+                 max_token_target: int = 4000, max_concurrency: int = 8, token_step: int = 200,
+                 decrease_factor: float = 0.7, failure_threshold: float = 0.05, latency_factor: float = 2.0,
+                 probe_rounds: int = 5):
+        """初始化自动调优
+
+        Args:
+            token_target: 初始每批 tokens 目标
+            concurrency: 初始并发数
+            min_token_target: tokens 目标下限
+            max_token_target: tokens 目标上限
+            max_concurrency: 并发数上限
+            token_step: 每轮增加的 tokens 目标
+            decrease_factor: 截断或校验失败时 tokens 目标的缩小比例
+            failure_threshold: 批次中校验失败字段的比例超过该值时缩小 tokens 目标
+            latency_factor: 单位 tokens 耗时的移动平均超过其最低值的倍数时视为服务拥塞
+            probe_rounds: 达到并发上限后连续多少轮正常时重新尝试增加并发
+        """
+        self.min_token_target = min_token_target
+        self.max_token_target = max(min_token_target, max_token_target)
+        self.max_concurrency = max(1, max_concurrency)
+        self.token_step = token_step
+        self.decrease_factor = decrease_factor
+        self.failure_threshold = failure_threshold
+        self.latency_factor = latency_factor
+        self.probe_rounds = probe_rounds
+
+        self.token_target = min(self.max_token_target, max(min_token_target, token_target))
+        self.concurrency = min(self.max_concurrency, max(1, concurrency))
+
+        self._lock = threading.Lock()
+        self._ceiling = self.max_concurrency    # 增加并发不再提升吞吐量的上限
+        self._clean_rounds = 0                  # 达到上限后连续正常的轮数
+        self._latency = None                    # 单位 tokens 耗时的移动平均（秒/千 tokens）
+        self._base_latency = None               # 移动平均的最低值
+        self._samples = 0
+        self._previous_throughput = None
+        self._raised_concurrency = False
+        self.adjustments = []                   # 调整记录
+        self._start_round()
+
+    @classmethod
+    def from_config(cls, config: Dict, token_target: int, concurrency: int) -> "AutoTuner":
+        """根据配置创建自动调优，token_target 和 concurrency 为初始值"""
+        options = {k: v for k, v in (config or {}).items() if k != "enabled"}
+        return cls(token_target=token_target, concurrency=concurrency, **options)
+
+    def begin(self):
+        """开始翻译一个新插件，重新计时当前一轮，避免插件之间的准备和校验时间计入吞吐量"""
+        with self._lock:
+            self._start_round()
+
+    def _start_round(self):
+        self._round_started = time.time()
+        self._round_batches = 0
+        self._round_nodes = 0
+        self._round_clean = True
+
+    def observe(self, validated_nodes: int, latency: float, tokens: int, truncated: bool = False,
+                failure_rate: float = 0.0, congested: bool = False) -> Optional[str]:
+        """记录一个完成的批次并调整参数
+
+        Args:
+            validated_nodes: 批次中全部字段通过校验的节点数
+            latency: 批次耗时（秒）
+            tokens: 批次的估算 tokens
+            truncated: 批次期间是否出现响应截断
+            failure_rate: 批次中校验失败字段的比例
+            congested: 批次期间是否出现限流或请求失败
+
+        Returns:
+            Optional[str]: 参数有变化时返回说明
+        """
+        with self._lock:
+            changes = []
+            self._round_batches += 1
+            self._round_nodes += validated_nodes
+
+            # 按单位 tokens 耗时的移动平均判断服务是否变慢，避免批次变大或个别慢请求被误判为拥塞；
+            # 插件末尾未装满的小批次固定开销占比高，不参与判断
+            slow = False
+            if tokens >= self.token_target * 0.5:
+                per_1k = latency / max(tokens, 1) * 1000
+                self._samples += 1
+                self._latency = per_1k if self._latency is None else self._latency + 0.2 * (per_1k - self._latency)
+                if self._samples > 3:
+                    if self._base_latency is None or self._latency < self._base_latency:
+                        self._base_latency = self._latency
+                    slow = self._latency > self._base_latency * self.latency_factor
+
+            if truncated or failure_rate > self.failure_threshold:
+                target = max(self.min_token_target, int(self.token_target * self.decrease_factor))
+                if target != self.token_target:
+                    changes.append(f"tokens 目标 {self.token_target} → {target}")
+                    self.token_target = target
+                self._round_clean = False
+
+            if congested or slow:
+                concurrency = max(1, self.concurrency // 2)
+                if concurrency != self.concurrency:
+                    changes.append(f"并发数 {self.concurrency} → {concurrency}")
+                    self.concurrency = concurrency
+                self._ceiling = max(1, min(self._ceiling, self.concurrency * 2 - 1))
+                self._round_clean = False
+
+            if self._round_batches >= self.concurrency:
+                changes.extend(self._finish_round())
+
+            if changes:
+                self.adjustments.append({"time": time.time(), "changes": changes})
+            return "，".join(changes) if changes else None
+
+    def _finish_round(self) -> list:
+        """一轮批次完成后根据吞吐量加性增加参数，调用方需持有锁"""
+        changes = []
+        elapsed = max(time.time() - self._round_started, 1e-6)
+        throughput = self._round_nodes / elapsed
+
+        if self._round_clean:
+            if self._ceiling < self.max_concurrency and self.concurrency >= self._ceiling:
+                self._clean_rounds += 1
+                if self._clean_rounds >= self.probe_rounds:
+                    self._ceiling += 1
+                    self._clean_rounds = 0
+
+            if self._raised_concurrency and self._previous_throughput and \
+                    throughput < self._previous_throughput * 1.05:
+                # 上一轮增加的并发没有带来吞吐量提升
+                self._ceiling = max(1, self.concurrency - 1)
+                changes.append(f"并发数 {self.concurrency} → {self._ceiling}（吞吐量未提升）")
+                self.concurrency = self._ceiling
+                self._raised_concurrency = False
+            else:
+                target = min(self.max_token_target, self.token_target + self.token_step)
+                if target != self.token_target:
+                    changes.append(f"tokens 目标 {self.token_target} → {target}")
+                    self.token_target = target
+                self._raised_concurrency = self.concurrency < min(self.max_concurrency, self._ceiling)
+                if self._raised_concurrency:
+                    changes.append(f"并发数 {self.concurrency} → {self.concurrency + 1}")
+                    self.concurrency += 1
+        else:
+            self._raised_concurrency = False
+            self._clean_rounds = 0
+
+        self._previous_throughput = throughput
+        self._start_round()
+        return changes
+
+    def settings(self) -> Dict:
+        """当前参数"""
+        with self._lock:
+            return {"token_target": self.token_target, "concurrency": self.concurrency}
+
+    @staticmethod
+    def load(path: str, key: str) -> Optional[Dict]:
+        """读取保存的调优结果
+
+        Args:
+            path: 调优结果文件
+            key: 服务和模型，如 "volcengine/doubao-pro-32k"
+
+        Returns:
+            Optional[Dict]: {"token_target", "concurrency", "updated"}，没有记录时返回 None
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f).get(key)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def save(self, path: str, key: str):
+        """按服务和模型保存当前参数，保留其他服务的记录"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            saved = {}
+        saved[key] = {**self.settings(), "updated": time.strftime("%Y-%m-%d %H:%M:%S")}
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(saved, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
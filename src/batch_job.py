@@ -0,0 +1,314 @@
+"""离线批量任务模块
+
+按 OpenAI 兼容的批量推理（Batch API）格式导出请求文件、读取结果文件，
+并提供在本地逐行处理请求文件的替身，用于在没有批量推理服务时测试整个流程
+
+用法:
+    python -m src.batch_job export --folder D:/ComfyUI/custom_nodes/a --folder D:/ComfyUI/custom_nodes/b --output output/job.jsonl
+    python -m src.batch_job run --input output/job.jsonl --output output/job_results.jsonl
+    python -m src.batch_job ingest --job output/job.jsonl --results output/job_results.jsonl --output-dir output/job --retry output/job_retry.jsonl
+"""
+
+import argparse
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .json_stream import IncrementalJSONParser
+
+# 批量请求的接口路径
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+
+class BatchJob:
+    """离线批量任务
+
+    请求文件为 JSONL，每行一个请求 {"custom_id", "method", "url", "body"}；
+    清单文件记录每个 custom_id 对应的插件和批次节点以及各插件的原始节点，
+    结果文件可以在任意时间、由任意进程读取处理，请求生成与结果处理互不依赖
+    """
+
+    def __init__(self, path: str, model_id: str = "", token_target: int = 1500):
+        """初始化批量任务
+
+        Args:
+            path: 请求文件路径（JSONL），清单文件保存在同目录的 <文件名>.manifest.json
+            model_id: 模型 ID
+            token_target: 每批请求内容与响应的估算 tokens 上限
+        """
+        self.path = path
+        self.manifest_path = self.manifest_path_for(path)
+        self.model_id = model_id
+        self.token_target = token_target
+        self.created = time.strftime("%Y-%m-%d %H:%M:%S")
+        self.plugins: Dict[str, Dict] = {}    # 插件名 -> 原始节点信息
+        self.local: Dict[str, Dict] = {}      # 插件名 -> 本地规则翻译的结果
+        self.requests: Dict[str, Dict] = {}   # custom_id -> {"plugin", "batch", "round"}
+        self.rounds = 0                       # 已导出的重试轮数
+
+    @staticmethod
+    def manifest_path_for(path: str) -> str:
+        """请求文件对应的清单文件路径"""
+        return f"{os.path.splitext(path)[0]}.manifest.json"
+
+    def add_plugin(self, name: str, nodes_info: Dict, local_nodes: Dict = None):
+        """登记一个插件的原始节点信息和本地规则翻译的结果，插件名重复时抛出异常"""
+        if name in self.plugins:
+            raise Exception(f"插件名重复: {name}")
+        self.plugins[name] = nodes_info
+        if local_nodes:
+            self.local[name] = local_nodes
+
+    def add_request(self, custom_id: str, plugin: str, batch: Dict, body: Dict) -> Dict:
+        """登记一个批次请求
+
+        Args:
+            custom_id: 请求编号，结果文件按此编号对应回批次
+            plugin: 所属插件名
+            batch: 批次节点（可能是拆分后节点的一部分）
+            body: 补全请求体
+
+        Returns:
+            Dict: 请求文件中的一行
+        """
+        self.requests[custom_id] = {"plugin": plugin, "batch": batch, "round": self.rounds}
+        return {"custom_id": custom_id, "method": "POST", "url": BATCH_ENDPOINT, "body": body}
+
+    def plugin_requests(self, plugin: str) -> List[Tuple[str, Dict]]:
+        """按导出顺序获取插件的全部批次 [(custom_id, batch)]，重试轮次排在原始请求之后"""
+        return [
+            (custom_id, request["batch"]) for custom_id, request in self.requests.items()
+            if request["plugin"] == plugin
+        ]
+
+    @staticmethod
+    def write_lines(path: str, lines: List[Dict]):
+        """写入 JSONL 文件"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for line in lines:
+                f.write(json.dumps(line, ensure_ascii=False, separators=(',', ':')) + "\n")
+
+    def save(self):
+        """保存清单文件"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.manifest_path)), exist_ok=True)
+        temp_path = f"{self.manifest_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "model_id": self.model_id,
+                "token_target": self.token_target,
+                "created": self.created,
+                "rounds": self.rounds,
+                "plugins": self.plugins,
+                "local": self.local,
+                "requests": self.requests
+            }, f, ensure_ascii=False)
+        os.replace(temp_path, self.manifest_path)
+
+    @classmethod
+    def load(cls, path: str) -> "BatchJob":
+        """按请求文件路径读取批量任务的清单"""
+        manifest_path = cls.manifest_path_for(path)
+        if not os.path.exists(manifest_path):
+            raise FileNotFoundError(f"批量任务清单不存在: {manifest_path}")
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        job = cls(path, data.get("model_id", ""), data.get("token_target", 1500))
+        job.created = data.get("created", job.created)
+        job.rounds = data.get("rounds", 0)
+        job.plugins = data.get("plugins", {})
+        job.local = data.get("local", {})
+        job.requests = data.get("requests", {})
+        return job
+
+    @staticmethod
+    def read_results(paths: List[str]) -> Dict[str, Dict]:
+        """读取一个或多个结果文件
+
+        同一请求在多个文件中出现时，成功的结果优先，其次是后读取的结果
+
+        Args:
+            paths: 结果文件路径（JSONL）
+
+        Returns:
+            Dict[str, Dict]: custom_id -> {"content", "finish_reason", "usage", "error"}
+        """
+        results = {}
+        for path in paths:
+            for line in _read_jsonl(path):
+                custom_id = line.get("custom_id")
+                if not custom_id:
+                    continue
+                result = parse_result_line(line)
+                previous = results.get(custom_id)
+                if previous is None or previous["error"] or not result["error"]:
+                    results[custom_id] = result
+        return results
+
+    @staticmethod
+    def extract_translations(content: str) -> Dict[str, object]:
+        """从回复内容中尽量提取编号译文
+
+        离线结果无法在请求时重试，截断或个别键值对格式错误时也保留能解析的部分
+        """
+        parser = IncrementalJSONParser()
+        return dict(parser.feed(content or ""))
+
+
+def parse_result_line(line: Dict) -> Dict:
+    """将结果文件中的一行转换为 {"content", "finish_reason", "usage", "error"}"""
+    response = line.get("response") or {}
+    error = line.get("error")
+    body = response.get("body") or {}
+    status = response.get("status_code")
+
+    if error or status != 200:
+        message = (error or {}).get("message") or (body.get("error") or {}).get("message") or f"HTTP {status}"
+        return {"content": "", "finish_reason": None, "usage": None, "error": message}
+
+    choices = body.get("choices") or [{}]
+    return {
+        "content": (choices[0].get("message") or {}).get("content") or "",
+        "finish_reason": choices[0].get("finish_reason"),
+        "usage": body.get("usage"),
+        "error": None
+    }
+
+
+def _read_jsonl(path: str) -> Iterator[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def run_local(input_path: str, output_path: str, complete: Callable[[Dict], Tuple[int, Dict]],
+              concurrency: int = 4) -> Dict[str, int]:
+    """在本地逐行处理请求文件，按批量推理结果文件的格式写出结果
+
+    Args:
+        input_path: 请求文件
+        output_path: 结果文件
+        complete: 处理一个请求体的函数，返回 (状态码, 响应体)
+        concurrency: 同时处理的请求数
+
+    Returns:
+        Dict[str, int]: {"requests", "completed", "failed"}
+    """
+    requests = list(_read_jsonl(input_path))
+
+    def handle(request: Dict) -> Dict:
+        result = {"id": f"batch_req_{uuid.uuid4().hex[:12]}", "custom_id": request["custom_id"],
+                  "response": None, "error": None}
+        try:
+            status, body = complete(request["body"])
+            result["response"] = {"status_code": status, "request_id": uuid.uuid4().hex, "body": body}
+        except Exception as e:
+            result["error"] = {"code": type(e).__name__, "message": str(e)}
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        results = list(executor.map(handle, requests))
+    BatchJob.write_lines(output_path, results)
+
+    failed = sum(1 for result in results if parse_result_line(result)["error"])
+    return {"requests": len(results), "completed": len(results) - failed, "failed": failed}
+
+
+def mock_completer(server) -> Callable[[Dict], Tuple[int, Dict]]:
+    """使用本地模拟服务（MockLLMServer）处理请求，不经过 HTTP"""
+    def complete(body: Dict) -> Tuple[int, Dict]:
+        status, _, response = server.complete(body)
+        return status, response
+    return complete
+
+
+def client_completer(client) -> Callable[[Dict], Tuple[int, Dict]]:
+    """使用 OpenAI 兼容客户端逐个发送请求，用于本地部署的模型服务"""
+    from openai import APIStatusError
+
+    def complete(body: Dict) -> Tuple[int, Dict]:
+        try:
+            return 200, client.chat.completions.create(**body).model_dump()
+        except APIStatusError as e:
+            return e.status_code, e.body if isinstance(e.body, dict) else {"error": {"message": str(e)}}
+    return complete
+
+
+def _load_folder(folder: str) -> Optional[Dict]:
+    from .node_parser import NodeParser
+
+    parser = NodeParser(folder)
+    return parser.optimize_node_info(parser.parse_folder(folder))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线批量翻译任务（OpenAI 兼容的批量推理文件格式）")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="将多个插件的全部批次导出为一个请求文件")
+    export_parser.add_argument("--folder", action="append", required=True, help="插件文件夹，可重复指定")
+    export_parser.add_argument("--output", required=True, help="请求文件（JSONL）")
+    export_parser.add_argument("--model", default="doubao-pro-32k", help="模型 ID")
+    export_parser.add_argument("--token-target", type=int, default=1500)
+    export_parser.add_argument("--batch-size", type=int, default=None)
+
+    run_parser = subparsers.add_parser("run", help="在本地处理请求文件并生成结果文件")
+    run_parser.add_argument("--input", required=True, help="请求文件")
+    run_parser.add_argument("--output", required=True, help="结果文件")
+    run_parser.add_argument("--base-url", default=None, help="OpenAI 兼容服务地址，为空时使用本地模拟服务")
+    run_parser.add_argument("--api-key", default="local")
+    run_parser.add_argument("--concurrency", type=int, default=4)
+    run_parser.add_argument("--error-rate", type=float, default=0.0)
+    run_parser.add_argument("--truncate-rate", type=float, default=0.0)
+    run_parser.add_argument("--malformed-rate", type=float, default=0.0)
+    run_parser.add_argument("--seed", type=int, default=0)
+
+    ingest_parser = subparsers.add_parser("ingest", help="读取结果文件，校验并输出各插件的翻译结果")
+    ingest_parser.add_argument("--job", required=True, help="导出时的请求文件，用于定位清单")
+    ingest_parser.add_argument("--results", nargs="+", required=True, help="结果文件，可包含重试的结果")
+    ingest_parser.add_argument("--output-dir", required=True, help="翻译结果输出目录")
+    ingest_parser.add_argument("--retry", default=None, help="为失败和缺失的部分导出重试请求文件")
+
+    args = parser.parse_args()
+
+    def report(progress, message):
+        print(message)
+
+    if args.command == "run":
+        if args.base_url:
+            from .api_client import ClientManager
+            complete = client_completer(ClientManager.get_client(args.api_key, args.base_url))
+        else:
+            from .mock_server import MockLLMServer
+            complete = mock_completer(MockLLMServer(
+                error_rate=args.error_rate, truncate_rate=args.truncate_rate,
+                malformed_rate=args.malformed_rate, seed=args.seed
+            ))
+        counts = run_local(args.input, args.output, complete, args.concurrency)
+        print(f"[批量] 处理 {counts['requests']} 个请求，成功 {counts['completed']} 个，失败 {counts['failed']} 个")
+        return
+
+    from .translator import Translator
+
+    if args.command == "export":
+        plugins = []
+        for folder in args.folder:
+            nodes_info = _load_folder(folder)
+            if nodes_info:
+                plugins.append((os.path.basename(folder.rstrip("/\\")), nodes_info))
+        translator = Translator("batch-job", args.model)
+        translator.export_batch_job(plugins, args.output, args.token_target, args.batch_size, report)
+    else:
+        job = BatchJob.load(args.job)
+        translator = Translator("batch-job", job.model_id)
+        translator.ingest_batch_job(args.job, args.results, args.output_dir, args.retry, report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""批次规划模块"""
+
+from typing import Dict, List, Optional, Set
+
+from .request_builder import BatchRequestBuilder, SECTIONS
+from .token_utils import TokenEstimator
+
+
+class BatchPlanner:
+    """批次规划器
+
+    估算每个节点的输入和输出 tokens，按 tokens 目标将节点装入批次；
+    单个节点超过目标时按字段拆分到多个请求，翻译后再按原顺序拼回
+    """
+
+    # 编号、引号、逗号等 JSON 结构开销
+    ENTRY_INPUT_OVERHEAD = 3
+    ENTRY_OUTPUT_OVERHEAD = 4
+
+    def __init__(self, token_target: int = 1500, max_output_tokens: int = 1536,
+                 max_nodes: Optional[int] = None):
+        """初始化批次规划器
+
+        Args:
+            token_target: 每批请求内容与响应的估算 tokens 上限
+            max_output_tokens: 每批响应的估算 tokens 上限
+            max_nodes: 每批最多节点数，为空表示不限制
+        """
+        self.token_target = token_target
+        self.max_output_tokens = max_output_tokens
+        self.max_nodes = max_nodes
+
+    @classmethod
+    def term_cost(cls, term: str) -> tuple:
+        """估算单个词条的输入和输出 tokens"""
+        return (
+            TokenEstimator.estimate(term) + cls.ENTRY_INPUT_OVERHEAD,
+            TokenEstimator.estimate_translation(term) + cls.ENTRY_OUTPUT_OVERHEAD
+        )
+
+    @staticmethod
+    def node_terms(node_info: Dict) -> List[str]:
+        """获取节点需要翻译的全部原文（按出现顺序去重）"""
+        terms = []
+        title = node_info.get("title", "")
+        if title:
+            terms.append(title)
+        for section in SECTIONS:
+            for key, value in node_info.get(section, {}).items():
+                term = BatchRequestBuilder.source_text(key, value)
+                if term and term not in terms:
+                    terms.append(term)
+        return terms
+
+    def _cost(self, terms: List[str], known: Set[str] = frozenset()) -> tuple:
+        """估算一组词条中未出现在 known 中的部分的 tokens"""
+        input_tokens = output_tokens = 0
+        for term in terms:
+            if term not in known:
+                term_input, term_output = self.term_cost(term)
+                input_tokens += term_input
+                output_tokens += term_output
+        return input_tokens, output_tokens
+
+    def _fits(self, input_tokens: int, output_tokens: int) -> bool:
+        return (input_tokens + output_tokens <= self.token_target and
+                output_tokens <= self.max_output_tokens)
+
+    def split_node(self, node_info: Dict) -> List[Dict]:
+        """将超出 tokens 目标的节点按字段拆分
+
+        标题只放在第一部分，每个部分尽量填满 tokens 目标
+
+        Args:
+            node_info: 节点信息
+
+        Returns:
+            List[Dict]: 拆分后的节点部分列表
+        """
+        parts = []
+        current = {"title": node_info.get("title", ""), "inputs": {}, "widgets": {}, "outputs": {}}
+        current_terms = [current["title"]] if current["title"] else []
+
+        for section in SECTIONS:
+            for key, value in node_info.get(section, {}).items():
+                term = BatchRequestBuilder.source_text(key, value)
+                input_tokens, output_tokens = self._cost(current_terms + [term])
+                has_fields = any(current[s] for s in SECTIONS)
+                if has_fields and not self._fits(input_tokens, output_tokens):
+                    parts.append(current)
+                    current = {"title": "", "inputs": {}, "widgets": {}, "outputs": {}}
+                    current_terms = []
+                current[section][key] = value
+                current_terms.append(term)
+
+        parts.append(current)
+        return parts
+
+    def plan(self, nodes_info: Dict) -> List[Dict]:
+        """规划批次
+
+        按节点顺序做首次适配装箱，批次内重复的词条只计算一次
+
+        Args:
+            nodes_info: 全部待翻译节点
+
+        Returns:
+            List[Dict]: 批次列表，每个批次是节点名到节点信息（或其一部分）的字典
+        """
+        batches = []  # [(batch_nodes, batch_terms, input_tokens, output_tokens)]
+
+        for node_name, node_info in nodes_info.items():
+            terms = self.node_terms(node_info)
+            if self._fits(*self._cost(terms)):
+                pieces = [(node_info, terms)]
+            else:
+                pieces = [(part, self.node_terms(part)) for part in self.split_node(node_info)]
+
+            for piece, piece_terms in pieces:
+                placed = False
+                for batch in batches:
+                    batch_nodes, batch_terms, input_tokens, output_tokens = batch
+                    # 同一节点的多个部分不能放入同一批次
+                    if node_name in batch_nodes:
+                        continue
+                    if self.max_nodes and len(batch_nodes) >= self.max_nodes:
+                        continue
+                    extra_input, extra_output = self._cost(piece_terms, batch_terms)
+                    if self._fits(input_tokens + extra_input, output_tokens + extra_output):
+                        batch_nodes[node_name] = piece
+                        batch_terms.update(piece_terms)
+                        batch[2] = input_tokens + extra_input
+                        batch[3] = output_tokens + extra_output
+                        placed = True
+                        break
+
+                if not placed:
+                    input_tokens, output_tokens = self._cost(piece_terms)
+                    batches.append([{node_name: piece}, set(piece_terms), input_tokens, output_tokens])
+
+        return [batch[0] for batch in batches]
+
+    @staticmethod
+    def merge_translated(all_translated: Dict, batch_translated: Dict):
+        """将批次翻译结果合并到总结果中，拆分节点的各部分合并为一个节点
+
+        只有带标题的部分会写入标题，没有得到标题译文的节点不含 title 键
+        """
+        for node_name, node_part in batch_translated.items():
+            if node_name not in all_translated:
+                all_translated[node_name] = {"inputs": {}, "widgets": {}, "outputs": {}}
+            merged = all_translated[node_name]
+            if node_part.get("title"):
+                merged["title"] = node_part["title"]
+            for section in SECTIONS:
+                merged.setdefault(section, {}).update(node_part.get(section, {}))
+
+    @staticmethod
+    def restore_order(nodes_info: Dict, all_translated: Dict) -> Dict:
+        """按原始节点和字段顺序重排翻译结果"""
+        ordered = {}
+        for node_name, node_info in nodes_info.items():
+            if node_name not in all_translated:
+                continue
+            translated = all_translated[node_name]
+            ordered_node = {"title": translated.get("title", "")}
+            for section in SECTIONS:
+                trans_section = translated.get(section, {})
+                ordered_node[section] = {
+                    key: trans_section[key]
+                    for key in node_info.get(section, {})
+                    if key in trans_section
+                }
+            ordered[node_name] = ordered_node
+        return ordered
@@ -0,0 +1,127 @@
+"""翻译预算模块"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+from .cost_planner import PriceTable
+
+
+class BudgetExceededError(Exception):
+    """继续请求会超出预算上限"""
+    pass
+
+
+class Budget:
+    """tokens、费用和耗时上限
+
+    翻译引擎在调度每个批次和发送每次请求前检查预算，
+    预计会超出上限时停止调度，已发送的请求照常完成；上限为 0 表示不限制
+    """
+
+    def __init__(self, max_tokens: int = 0, max_cost: float = 0.0, max_seconds: float = 0.0,
+                 price: PriceTable = None, name: str = "本次运行"):
+        """初始化预算
+
+        Args:
+            max_tokens: 最多使用的 tokens
+            max_cost: 最多花费的金额
+            max_seconds: 最长运行时间（秒）
+            price: 计算费用使用的价格
+            name: 预算名称，用于提示信息
+        """
+        self.max_tokens = max_tokens or 0
+        self.max_cost = max_cost or 0.0
+        self.max_seconds = max_seconds or 0.0
+        self.price = price or PriceTable()
+        self.name = name
+
+        self._lock = threading.Lock()
+        self.started = None
+        self.tokens = 0
+        self.cost = 0.0
+        self.reason = None          # 触发停止的原因，触发后不再恢复
+
+    @classmethod
+    def from_config(cls, limits: Dict, price: PriceTable = None, name: str = "本次运行") -> Optional["Budget"]:
+        """根据配置创建预算，没有设置任何上限时返回 None
+
+        Args:
+            limits: {"max_tokens": ..., "max_cost": ..., "max_seconds": ...}
+            price: 计算费用使用的价格
+            name: 预算名称
+        """
+        limits = limits or {}
+        if not any(limits.get(k) for k in ("max_tokens", "max_cost", "max_seconds")):
+            return None
+        return cls(
+            max_tokens=limits.get("max_tokens", 0),
+            max_cost=limits.get("max_cost", 0.0),
+            max_seconds=limits.get("max_seconds", 0.0),
+            price=price,
+            name=name
+        )
+
+    def start(self):
+        """开始计时，重复调用不会重置"""
+        with self._lock:
+            if self.started is None:
+                self.started = time.time()
+
+    @property
+    def elapsed(self) -> float:
+        return time.time() - self.started if self.started else 0.0
+
+    def add_usage(self, prompt_tokens: int, completion_tokens: int, cost: float = None):
+        """累计一次请求的用量
+
+        Args:
+            prompt_tokens: 输入 tokens
+            completion_tokens: 输出 tokens
+            cost: 实际费用，为空时按预算的价格计算
+        """
+        if cost is None:
+            cost = sum(self.price.cost(prompt_tokens or 0, completion_tokens or 0))
+        with self._lock:
+            self.tokens += (prompt_tokens or 0) + (completion_tokens or 0)
+            self.cost += cost
+
+    def check(self, prompt_tokens: int = 0, completion_tokens: int = 0) -> Optional[str]:
+        """检查再发送一个估算用量的请求是否会超出上限
+
+        Args:
+            prompt_tokens: 下一个请求的估算输入 tokens
+            completion_tokens: 下一个请求的估算输出 tokens
+
+        Returns:
+            Optional[str]: 会超出时返回原因，否则返回 None
+        """
+        with self._lock:
+            if self.reason:
+                return self.reason
+
+            next_tokens = prompt_tokens + completion_tokens
+            if self.max_tokens and self.tokens + next_tokens > self.max_tokens:
+                self.reason = f"{self.name}已用 {self.tokens} tokens，达到上限 {self.max_tokens}"
+            elif self.max_cost and self.cost + sum(self.price.cost(prompt_tokens, completion_tokens)) > self.max_cost:
+                self.reason = (
+                    f"{self.name}已花费 {self.price.currency}{self.cost:.4f}，"
+                    f"达到上限 {self.price.currency}{self.max_cost:.4f}"
+                )
+            elif self.max_seconds and self.started and time.time() - self.started >= self.max_seconds:
+                self.reason = f"{self.name}已运行 {time.time() - self.started:.1f} 秒，达到上限 {self.max_seconds:.1f} 秒"
+            return self.reason
+
+    def summary(self) -> Dict:
+        """导出预算使用情况"""
+        with self._lock:
+            return {
+                "name": self.name,
+                "tokens": self.tokens,
+                "cost": round(self.cost, 6),
+                "elapsed": round(self.elapsed, 3),
+                "max_tokens": self.max_tokens,
+                "max_cost": self.max_cost,
+                "max_seconds": self.max_seconds,
+                "reason": self.reason
+            }
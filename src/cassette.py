@@ -0,0 +1,280 @@
+"""请求录制与回放模块"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Optional
+
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+
+class CassetteMissError(Exception):
+    """回放模式下录像中没有匹配的请求"""
+    pass
+
+
+class Cassette:
+    """LLM 请求录像
+
+    record 模式下把每次请求和响应追加保存到 JSONL 文件；replay 模式下按请求内容查找响应，
+    完全不访问网络；auto 模式下有录像时回放，没有时请求并录制。
+    响应以统一格式保存，非流式录制的响应也可以按流式回放，反之亦然。
+    """
+
+    MODES = ("record", "replay", "auto")
+
+    # 只影响传输方式、不影响响应内容的参数，不参与请求键计算
+    TRANSPORT_PARAMS = ("stream", "timeout", "extra_headers")
+
+    def __init__(self, path: str, mode: str = "replay", latency_scale: float = 0.0):
+        """初始化录像
+
+        Args:
+            path: 录像文件路径（JSONL）
+            mode: record / replay / auto
+            latency_scale: 回放时按录制耗时的倍数等待，0 表示立即返回，1 表示还原真实耗时
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"不支持的录像模式: {mode}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[Dict]] = {}
+        self._replay_index: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+
+        if mode == "record":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            open(path, "w", encoding="utf-8").close()
+        elif os.path.exists(path):
+            self._load()
+        elif mode == "replay":
+            raise FileNotFoundError(f"录像文件不存在: {path}")
+
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                self._entries.setdefault(record["key"], []).append(record["response"])
+
+    @classmethod
+    def request_key(cls, params: Dict) -> str:
+        """计算请求键：模型、消息和采样参数规范化后的哈希
+
+        Args:
+            params: chat.completions.create 的参数
+
+        Returns:
+            str: 请求键
+        """
+        normalized = {
+            key: value for key, value in params.items()
+            if key not in cls.TRANSPORT_PARAMS
+        }
+        extra_body = dict(normalized.pop("extra_body", None) or {})
+        extra_body.pop("stream_options", None)
+        if extra_body:
+            normalized["extra_body"] = extra_body
+        normalized["messages"] = [
+            {"role": m.get("role"), "content": (m.get("content") or "").strip()}
+            for m in normalized.get("messages", [])
+        ]
+        text = json.dumps(normalized, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def wrap(self, client):
+        """包装 OpenAI 客户端，chat.completions.create 调用经过录像"""
+        return _CassetteClient(self, client)
+
+    def lookup(self, key: str) -> Optional[Dict]:
+        """查找录制的响应，同一请求录制了多次时按录制顺序依次返回，最后一次重复使用"""
+        with self._lock:
+            responses = self._entries.get(key)
+            if not responses:
+                self.misses += 1
+                return None
+            index = self._replay_index.get(key, 0)
+            self._replay_index[key] = index + 1
+            self.hits += 1
+            return responses[min(index, len(responses) - 1)]
+
+    def save(self, key: str, params: Dict, response: Dict):
+        """追加录制一次请求的响应"""
+        messages = params.get("messages", [])
+        record = {
+            "key": key,
+            "model": params.get("model"),
+            "user_message": next(
+                (m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), ""
+            ),
+            "response": response
+        }
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._entries.setdefault(key, []).append(response)
+            self.recorded += 1
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def summary(self) -> Dict:
+        """导出录像使用情况"""
+        with self._lock:
+            return {"mode": self.mode, "hits": self.hits, "misses": self.misses, "recorded": self.recorded}
+
+    def _sleep(self, seconds: float):
+        if self.latency_scale > 0 and seconds > 0:
+            time.sleep(seconds * self.latency_scale)
+
+    def replay(self, response: Dict, model: str, stream: bool = False):
+        """按录制的响应构造返回值
+
+        Args:
+            response: 录制的响应
+            model: 请求的模型
+            stream: 是否按流式数据块返回
+        """
+        if stream:
+            return self._replay_stream(response, model)
+
+        self._sleep(response.get("latency", 0))
+        if response.get("error"):
+            raise Exception(response["error"])
+
+        message = {"role": "assistant", "content": response.get("content", "")}
+        if response.get("reasoning_content") is not None:
+            message["reasoning_content"] = response["reasoning_content"]
+        return ChatCompletion.model_validate({
+            "id": f"replay-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": message,
+                "finish_reason": response.get("finish_reason") or "stop"
+            }],
+            "usage": response.get("usage")
+        })
+
+    def _replay_stream(self, response: Dict, model: str) -> Iterator[ChatCompletionChunk]:
+        completion_id = f"replay-{uuid.uuid4().hex[:12]}"
+        content = response.get("content", "")
+        pieces = [content[i:i + 16] for i in range(0, len(content), 16)]
+        latency = response.get("latency", 0)
+        first_token = response.get("first_token_latency", latency * 0.3)
+
+        def chunk(delta: Dict, finish_reason=None, usage=None, choices=True) -> ChatCompletionChunk:
+            return ChatCompletionChunk.model_validate({
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if choices else [],
+                "usage": usage
+            })
+
+        self._sleep(first_token)
+        yield chunk({"role": "assistant", "content": ""})
+        per_piece = max(0.0, latency - first_token) / len(pieces) if pieces else 0.0
+        for piece in pieces:
+            yield chunk({"content": piece})
+            self._sleep(per_piece)
+
+        if response.get("error"):
+            raise Exception(response["error"])
+
+        yield chunk({}, response.get("finish_reason") or "stop")
+        if response.get("usage"):
+            yield chunk({}, usage=response["usage"], choices=False)
+
+
+class _CassetteClient:
+    """经过录像的客户端，只提供 chat.completions.create"""
+
+    def __init__(self, cassette: Cassette, client):
+        self.cassette = cassette
+        self.client = client
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **params):
+        key = Cassette.request_key(params)
+        stream = bool(params.get("stream"))
+        model = params.get("model", "")
+
+        if self.cassette.mode != "record":
+            response = self.cassette.lookup(key)
+            if response is not None:
+                return self.cassette.replay(response, model, stream)
+            if self.cassette.mode == "replay":
+                raise CassetteMissError(f"录像中没有匹配的请求: {key[:12]}")
+
+        if stream:
+            return self._record_stream(key, params)
+
+        started = time.time()
+        try:
+            completion = self.client.chat.completions.create(**params)
+        except Exception as e:
+            self.cassette.save(key, params, {"error": str(e), "latency": time.time() - started})
+            raise
+
+        choice = completion.choices[0]
+        usage = getattr(completion, "usage", None)
+        self.cassette.save(key, params, {
+            "content": choice.message.content or "",
+            "reasoning_content": getattr(choice.message, "reasoning_content", None),
+            "finish_reason": choice.finish_reason,
+            "usage": usage.model_dump() if usage else None,
+            "latency": time.time() - started
+        })
+        return completion
+
+    def _record_stream(self, key: str, params: Dict) -> Iterator:
+        """边转发流式数据块边录制，连接中断时录制已收到的内容和错误"""
+        started = time.time()
+        first_token = None
+        content = []
+        finish_reason = None
+        usage = None
+        try:
+            for chunk in self.client.chat.completions.create(**params):
+                if getattr(chunk, "usage", None):
+                    usage = chunk.usage.model_dump()
+                if chunk.choices:
+                    choice = chunk.choices[0]
+                    if choice.delta and choice.delta.content:
+                        if first_token is None:
+                            first_token = time.time() - started
+                        content.append(choice.delta.content)
+                    if choice.finish_reason:
+                        finish_reason = choice.finish_reason
+                yield chunk
+        except Exception as e:
+            self.cassette.save(key, params, {
+                "content": "".join(content),
+                "finish_reason": finish_reason,
+                "usage": usage,
+                "error": str(e),
+                "latency": time.time() - started,
+                "first_token_latency": first_token or 0.0
+            })
+            raise
+
+        self.cassette.save(key, params, {
+            "content": "".join(content),
+            "finish_reason": finish_reason,
+            "usage": usage,
+            "latency": time.time() - started,
+            "first_token_latency": first_token or 0.0
+        })
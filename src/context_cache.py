@@ -0,0 +1,136 @@
+"""服务商上下文缓存模块"""
+
+import hashlib
+import threading
+import time
+from typing import Dict, List, Tuple
+
+# 支持显式上下文缓存的服务
+VOLCENGINE = "volcengine"
+ALIYUN = "aliyun"
+
+
+class ContextCache:
+    """让请求的固定前缀命中服务商的上下文缓存
+
+    请求消息按"固定的系统消息在前、随批次变化的内容在后"排列，前缀在整个运行中逐字节相同，
+    支持前缀缓存的服务会自动以折扣价计费。启用显式缓存时：
+
+    - 火山方舟：为每个服务和前缀调用一次 /context/create 创建 common_prefix 上下文，
+      之后的请求发往 /context/chat/completions 并只携带变化的部分
+    - 阿里云百炼：在系统消息上添加 cache_control 标记，由服务端创建显式缓存
+
+    创建失败或客户端不支持时退回到普通请求（仍可命中隐式缓存）
+    """
+
+    def __init__(self, explicit: bool = False, ttl: int = 3600):
+        """初始化上下文缓存
+
+        Args:
+            explicit: 是否使用服务商的显式上下文缓存接口
+            ttl: 显式上下文的有效期（秒）
+        """
+        self.explicit = explicit
+        self.ttl = ttl
+        self._contexts: Dict[Tuple[tuple, str], Tuple[str, float]] = {}   # (端点, 前缀哈希) -> (上下文 ID, 过期时间)
+        self._clients = {}             # 端点 -> 上下文接口的客户端
+        self._unsupported = set()      # 创建上下文失败的端点
+        self._lock = threading.Lock()
+        self.created = 0
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "ContextCache":
+        """根据配置创建上下文缓存"""
+        return cls(**(config or {}))
+
+    @staticmethod
+    def prefix_key(messages: List[Dict]) -> str:
+        """请求开头连续的系统消息的哈希"""
+        prefix = []
+        for message in messages:
+            if message.get("role") != "system":
+                break
+            prefix.append(message.get("content", ""))
+        return hashlib.sha256("\n".join(prefix).encode("utf-8")).hexdigest() if prefix else ""
+
+    @staticmethod
+    def endpoint_key(provider) -> Tuple[str, str, str]:
+        """区分上下文的端点：(服务地址, 模型, 密钥哈希)
+
+        同一地址上的不同模型或不同账户（服务池、模型梯队）各自创建上下文，不共用上下文 ID
+        """
+        api_key = getattr(provider.client, "api_key", "") or ""
+        return (
+            provider.base_url.rstrip("/"),
+            provider.model_id,
+            hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+        )
+
+    def prepare(self, provider, messages: List[Dict]) -> Tuple[object, List[Dict], Dict]:
+        """按服务调整请求
+
+        Args:
+            provider: 服务端点（name、base_url、model_id、client）
+            messages: 请求消息，开头为固定的系统消息
+
+        Returns:
+            Tuple: (发送请求使用的客户端, 请求消息, 需要附加到请求体的参数)
+        """
+        if not self.explicit or not messages or messages[0].get("role") != "system":
+            return provider.client, messages, {}
+
+        if provider.name == ALIYUN:
+            marked = [
+                {**m, "content": [{"type": "text", "text": m["content"], "cache_control": {"type": "ephemeral"}}]}
+                if m.get("role") == "system" and isinstance(m.get("content"), str) else m
+                for m in messages
+            ]
+            return provider.client, marked, {}
+
+        if provider.name == VOLCENGINE:
+            context = self._volcengine_context(provider, messages)
+            if context:
+                client, context_id = context
+                remaining = [m for m in messages if m.get("role") != "system"]
+                return client, remaining, {"context_id": context_id}
+
+        return provider.client, messages, {}
+
+    def _volcengine_context(self, provider, messages: List[Dict]):
+        """获取或创建火山方舟的前缀上下文，返回 (上下文接口的客户端, 上下文 ID)，不支持时返回 None"""
+        client = provider.client
+        # 录像等包装过的客户端无法调用上下文接口
+        if not hasattr(client, "with_options") or not hasattr(client, "post"):
+            return None
+
+        endpoint = self.endpoint_key(provider)
+        key = (endpoint, self.prefix_key(messages))
+        with self._lock:
+            if endpoint in self._unsupported:
+                return None
+            context_id, expires = self._contexts.get(key, (None, 0))
+            if context_id and time.time() < expires:
+                return self._clients[endpoint], context_id
+
+            try:
+                response = client.post(
+                    "/context/create",
+                    cast_to=object,
+                    body={
+                        "model": provider.model_id,
+                        "messages": [m for m in messages if m.get("role") == "system"],
+                        "mode": "common_prefix",
+                        "ttl": self.ttl
+                    }
+                )
+                context_id = response["id"]
+            except Exception:
+                self._unsupported.add(endpoint)
+                return None
+
+            # 提前一分钟过期，避免请求发出时上下文刚好失效
+            self._contexts[key] = (context_id, time.time() + max(self.ttl - 60, 1))
+            if endpoint not in self._clients:
+                self._clients[endpoint] = client.with_options(base_url=f"{endpoint[0]}/context")
+            self.created += 1
+            return self._clients[endpoint], context_id
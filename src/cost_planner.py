@@ -0,0 +1,280 @@
+"""翻译费用与耗时预估模块"""
+
+import copy
+import glob
+import heapq
+import json
+import math
+import os
+from typing import Dict, List, Optional, Tuple
+
+from .batch_planner import BatchPlanner
+from .request_builder import BatchRequestBuilder
+from .rule_translator import RuleTranslator
+
+# 默认价格表（元/千 tokens），可在 config.json 的 pricing 中按服务商和模型覆盖
+DEFAULT_PRICING = {
+    "volcengine": {
+        "currency": "¥",
+        "input_per_1k": 0.0008,
+        "output_per_1k": 0.0020,
+        "models": {}
+    }
+}
+
+
+class PriceTable:
+    """单个服务商和模型的价格"""
+
+    def __init__(self, pricing: Dict = None, provider: str = "volcengine", model_id: str = None):
+        """初始化价格
+
+        Args:
+            pricing: 价格配置 {服务商: {currency, input_per_1k, output_per_1k, models: {模型: {...}}}}
+            provider: 服务商
+            model_id: 模型 ID，models 中有该模型时使用模型价格
+        """
+        table = {**DEFAULT_PRICING, **(pricing or {})}
+        provider_prices = table.get(provider) or DEFAULT_PRICING["volcengine"]
+        model_prices = (provider_prices.get("models") or {}).get(model_id, {})
+
+        self.provider = provider
+        self.currency = model_prices.get("currency", provider_prices.get("currency", "¥"))
+        self.input_per_1k = model_prices.get("input_per_1k", provider_prices.get("input_per_1k", 0.0))
+        self.output_per_1k = model_prices.get("output_per_1k", provider_prices.get("output_per_1k", 0.0))
+        # 命中服务商上下文缓存的输入价格，未配置时与普通输入相同
+        self.cached_input_per_1k = model_prices.get(
+            "cached_input_per_1k", provider_prices.get("cached_input_per_1k", self.input_per_1k)
+        )
+        # 离线批量推理相对在线请求的价格折扣，1.0 表示没有折扣
+        self.batch_discount = model_prices.get("batch_discount", provider_prices.get("batch_discount", 1.0))
+
+    def cost(self, prompt_tokens: float, completion_tokens: float, cached_tokens: float = 0) -> Tuple[float, float]:
+        """计算输入和输出费用，cached_tokens 为输入中命中上下文缓存的部分"""
+        cached_tokens = min(cached_tokens, prompt_tokens)
+        return (
+            (prompt_tokens - cached_tokens) / 1000 * self.input_per_1k + cached_tokens / 1000 * self.cached_input_per_1k,
+            completion_tokens / 1000 * self.output_per_1k
+        )
+
+    def for_batch(self) -> "PriceTable":
+        """离线批量推理使用的价格（按 batch_discount 折算）"""
+        price = copy.copy(self)
+        price.input_per_1k = self.input_per_1k * self.batch_discount
+        price.output_per_1k = self.output_per_1k * self.batch_discount
+        price.cached_input_per_1k = self.cached_input_per_1k * self.batch_discount
+        price.batch_discount = 1.0
+        return price
+
+
+class Calibration:
+    """估算校准系数
+
+    根据历史运行统计（logs/translation_stats_*.json）中实际用量与估算值之比校准 tokens，
+    根据实际请求数与批次数之比估计拆分重试和补译带来的额外请求，
+    根据实际批次耗时校准延迟模型：批次耗时 = 基础延迟 + 输出 tokens / 输出速度
+    """
+
+    def __init__(self, input_scale: float = 1.0, output_scale: float = 1.0,
+                 request_overhead: float = 1.0, latency_base: float = 1.0,
+                 output_tokens_per_sec: float = 40.0, latency_scale: float = 1.0, samples: int = 0):
+        self.input_scale = input_scale
+        self.output_scale = output_scale
+        self.request_overhead = request_overhead
+        self.latency_base = latency_base
+        self.output_tokens_per_sec = output_tokens_per_sec
+        self.latency_scale = latency_scale
+        self.samples = samples
+
+    def batch_latency(self, output_tokens: float) -> float:
+        """估算单个批次的耗时（秒）"""
+        return (self.latency_base + output_tokens / self.output_tokens_per_sec) * self.latency_scale
+
+    @classmethod
+    def from_logs(cls, logs_dir: str, model_id: str = None, limit: int = 20, **defaults) -> "Calibration":
+        """从最近的运行统计计算校准系数，没有可用记录时使用默认值
+
+        Args:
+            logs_dir: 日志目录
+            model_id: 模型 ID，指定时只使用该模型的记录
+            limit: 最多使用的记录数
+            defaults: latency_base、output_tokens_per_sec 等默认值
+        """
+        calibration = cls(**defaults)
+        records = []
+        for path in sorted(glob.glob(os.path.join(logs_dir, "translation_stats_*.json")),
+                           key=os.path.getmtime, reverse=True):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    record = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            if record.get("estimated_input_tokens") and record.get("batches"):
+                records.append(record)
+
+        # 不同模型的输出长度和速度差别较大，只使用同一模型的记录
+        if model_id:
+            records = [r for r in records if r.get("model_id") == model_id]
+        records = records[:limit]
+        if not records:
+            return calibration
+
+        def total(name: str) -> float:
+            return sum(r.get(name, 0) or 0 for r in records)
+
+        if total("prompt_tokens"):
+            calibration.input_scale = total("prompt_tokens") / total("estimated_input_tokens")
+        if total("completion_tokens") and total("estimated_output_tokens"):
+            calibration.output_scale = total("completion_tokens") / total("estimated_output_tokens")
+        if total("requests"):
+            calibration.request_overhead = max(1.0, total("requests") / total("batches"))
+
+        # 按估算输出预测的批次总耗时与实际总耗时之比
+        predicted = sum(
+            r["batches"] * calibration.latency_base +
+            (r.get("estimated_output_tokens", 0) or 0) / calibration.output_tokens_per_sec
+            for r in records
+        )
+        observed = total("batch_latency_sum")
+        if predicted and observed:
+            calibration.latency_scale = observed / predicted
+
+        calibration.samples = len(records)
+        return calibration
+
+
+class CostPlanner:
+    """翻译预估（不调用 API）
+
+    按实际翻译相同的方式规划批次，估算每批的输入输出 tokens，
+    结合价格表、并发数和限流配置估算请求数、费用和耗时
+    """
+
+    def __init__(self, system_prompt: str, token_target: int = 1500, max_completion_tokens: int = 2048,
+                 max_nodes: Optional[int] = None, concurrency: int = 1, rpm: int = 0, tpm: int = 0,
+                 price: PriceTable = None, calibration: Calibration = None, glossary=None,
+                 pretranslate: bool = False):
+        """初始化预估器
+
+        Args:
+            system_prompt: 系统提示词
+            token_target: 每批 tokens 目标
+            max_completion_tokens: 单次请求的输出 tokens 上限
+            max_nodes: 每批最多节点数
+            concurrency: 同时进行的批次请求数
+            rpm: 每分钟最多请求数，0 表示不限制
+            tpm: 每分钟最多输入 tokens 数，0 表示不限制
+            price: 价格表
+            calibration: 校准系数
+            glossary: 术语表，指定时每批的系统提示词只包含批次原文中出现的术语，与实际翻译一致
+            pretranslate: 是否先去掉本地规则能翻译的字段，与实际翻译一致
+        """
+        self.system_prompt = system_prompt
+        self.glossary = glossary
+        self.pretranslate = pretranslate
+        self.planner = BatchPlanner(
+            token_target=token_target,
+            max_output_tokens=int(max_completion_tokens * 0.75),
+            max_nodes=max_nodes
+        )
+        self.concurrency = max(1, concurrency)
+        self.rpm = rpm or 0
+        self.tpm = tpm or 0
+        self.price = price or PriceTable()
+        self.calibration = calibration or Calibration()
+
+    def _schedule(self, latencies: List[float]) -> float:
+        """按并发数依次调度批次，返回全部完成的时间"""
+        workers = [0.0] * min(self.concurrency, len(latencies))
+        for latency in latencies:
+            heapq.heapreplace(workers, workers[0] + latency)
+        return max(workers) if workers else 0.0
+
+    def _rate_limit_time(self, requests: float, prompt_tokens: float) -> float:
+        """限流下完成指定请求所需的最短时间（秒）"""
+        bounds = [0.0]
+        if self.rpm:
+            bounds.append(requests / self.rpm * 60)
+        if self.tpm:
+            bounds.append(prompt_tokens / self.tpm * 60)
+        return max(bounds)
+
+    def plan_plugin(self, plugin_name: str, nodes_info: Dict) -> Dict:
+        """预估单个插件
+
+        Args:
+            plugin_name: 插件名称
+            nodes_info: 待翻译节点
+
+        Returns:
+            Dict: 批次数、请求数、tokens、费用和耗时
+        """
+        cal = self.calibration
+        request_nodes = RuleTranslator.default().split_nodes(nodes_info)[0] if self.pretranslate else nodes_info
+        batches = self.planner.plan(request_nodes)
+        prompt_tokens = completion_tokens = 0.0
+        latencies = []
+        for batch in batches:
+            builder = BatchRequestBuilder(batch)
+            # 请求中的提示词说明：固定的系统消息加上用户消息开头的术语表
+            system_prompt = self.glossary.system_prompt(builder.terms) if self.glossary else self.system_prompt
+            estimate = builder.estimate_tokens(system_prompt)
+            prompt_tokens += estimate["input"] * cal.input_scale
+            completion_tokens += estimate["output"] * cal.output_scale
+            # 历史批次耗时已包含拆分重试，延迟模型按未校准的估算输出计算
+            latencies.append(cal.batch_latency(estimate["output"]))
+
+        requests = len(batches) * cal.request_overhead
+        prompt_cost, completion_cost = self.price.cost(prompt_tokens, completion_tokens)
+        wall_time = max(self._schedule(latencies), self._rate_limit_time(requests, prompt_tokens))
+
+        return {
+            "plugin": plugin_name,
+            "nodes": len(nodes_info),
+            "batches": len(batches),
+            "requests": math.ceil(requests),
+            "prompt_tokens": round(prompt_tokens),
+            "completion_tokens": round(completion_tokens),
+            "cost": prompt_cost + completion_cost,
+            "wall_time": wall_time
+        }
+
+    def plan(self, plugins: List[Tuple[str, Dict]]) -> Dict:
+        """预估多个插件（按批量翻译任务依次翻译）
+
+        Args:
+            plugins: [(插件名称, 待翻译节点)]
+
+        Returns:
+            Dict: 汇总结果，plugins 中为每个插件的预估
+        """
+        results = [self.plan_plugin(name, nodes) for name, nodes in plugins]
+        requests = sum(r["requests"] for r in results)
+        prompt_tokens = sum(r["prompt_tokens"] for r in results)
+        # 插件依次翻译，限流配额在整个任务内共享
+        wall_time = max(sum(r["wall_time"] for r in results), self._rate_limit_time(requests, prompt_tokens))
+
+        return {
+            "plugins": results,
+            "nodes": sum(r["nodes"] for r in results),
+            "batches": sum(r["batches"] for r in results),
+            "requests": requests,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": sum(r["completion_tokens"] for r in results),
+            "cost": sum(r["cost"] for r in results),
+            "currency": self.price.currency,
+            "wall_time": wall_time,
+            "calibration_samples": self.calibration.samples
+        }
+
+
+def format_duration(seconds: float) -> str:
+    """将秒数格式化为易读的时长"""
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours} 小时 {minutes} 分"
+    if minutes:
+        return f"{minutes} 分 {secs} 秒"
+    return f"{secs} 秒"
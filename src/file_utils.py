@@ -9,6 +9,21 @@ class FileUtils:
     处理文件扫描、读写等操作
     """
     
+    # 输出目录，为空时为程序根目录下的 output；基准测试等工具改为临时目录，避免写入仓库
+    output_root = None
+    
+    @staticmethod
+    def output_dir(base_path: str) -> str:
+        """获取输出目录
+        
+        Args:
+            base_path: 程序根目录
+            
+        Returns:
+            str: 输出目录路径
+        """
+        return FileUtils.output_root or os.path.join(base_path, "output")
+    
     @staticmethod
     def scan_python_files(folder_path: str) -> List[str]:
         """扫描目录下的所有 Python 文件
@@ -181,7 +196,7 @@ class FileUtils:
             dict: 包含各个输出目录路径的字典
         """
         # 创建主输出目录
-        output_dir = os.path.join(base_path, "output")
+        output_dir = FileUtils.output_dir(base_path)
         
         # 创建子目录
         dirs = {
@@ -214,7 +229,7 @@ class FileUtils:
         plugin_name = os.path.basename(plugin_path.rstrip(os.path.sep))
         
         # 创建主输出目录
-        plugin_output_dir = os.path.join(base_path, "output", plugin_name)
+        plugin_output_dir = os.path.join(FileUtils.output_dir(base_path), plugin_name)
         
         # 创建子目录
         dirs = {
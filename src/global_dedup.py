@@ -0,0 +1,142 @@
+"""跨插件全局去重模块"""
+
+from typing import Dict, List, Optional, Tuple
+
+from .request_builder import BatchRequestBuilder, SECTIONS
+
+# 合并节点名中插件名与节点名的分隔符
+NODE_SEPARATOR = "::"
+
+
+class GlobalDedup:
+    """跨插件的全局去重
+
+    分叉、重新打包的插件和常用工具节点在多个插件中重复出现，大量字段名也完全相同。
+    翻译前分别收集所有选中插件中的唯一标题和唯一字段原文（标题和字段的译文规则不同，
+    相同的英文不合并），每个原文只保留首次出现的位置，组成一份合并的待翻译节点；
+    翻译完成后按原文把译文分发回每个插件的节点
+    """
+
+    def __init__(self, plugins: List[Tuple[str, Dict]]):
+        """收集唯一原文并生成合并的待翻译节点
+
+        Args:
+            plugins: [(插件名称, 待翻译节点)]
+        """
+        self.plugins = plugins
+        self.nodes: Dict[str, Dict] = {}    # "插件名::节点名" -> 只包含首次出现原文的节点
+        self.occurrences = 0                # 全部插件中需要翻译的原文出现次数
+        self.unique = 0                     # 唯一原文数
+
+        seen_titles, seen_fields = set(), set()
+        for plugin_name, nodes_info in plugins:
+            for node_name, node_info in nodes_info.items():
+                title = node_info.get("title", "")
+                part = {"title": "", "inputs": {}, "widgets": {}, "outputs": {}}
+                if title:
+                    self.occurrences += 1
+                    if title not in seen_titles:
+                        seen_titles.add(title)
+                        part["title"] = title
+                for section in SECTIONS:
+                    for key, value in node_info.get(section, {}).items():
+                        source = BatchRequestBuilder.source_text(key, value)
+                        self.occurrences += 1
+                        if source not in seen_fields:
+                            seen_fields.add(source)
+                            part[section][key] = value
+                if part["title"] or any(part[section] for section in SECTIONS):
+                    self.nodes[f"{plugin_name}{NODE_SEPARATOR}{node_name}"] = part
+        self.unique = len(seen_titles) + len(seen_fields)
+
+    @property
+    def duplicates(self) -> int:
+        """被去重的原文出现次数"""
+        return self.occurrences - self.unique
+
+    def translation_map(self, translated_nodes: Dict) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """从合并节点的翻译结果中分别收集标题和字段原文到译文的映射
+
+        Args:
+            translated_nodes: translate_nodes 对合并节点的翻译结果，因预算停止时只包含已完成的节点
+
+        Returns:
+            Tuple[Dict[str, str], Dict[str, str]]: (标题原文 -> 译文, 字段原文 -> 译文)
+        """
+        titles, fields = {}, {}
+        for merged_name, node_info in self.nodes.items():
+            translated = translated_nodes.get(merged_name)
+            if not translated:
+                continue
+            if node_info["title"] and translated.get("title"):
+                titles[node_info["title"]] = translated["title"]
+            for section in SECTIONS:
+                trans_section = translated.get(section, {})
+                for key, value in node_info[section].items():
+                    if key in trans_section:
+                        fields[BatchRequestBuilder.source_text(key, value)] = trans_section[key]
+        return titles, fields
+
+    def fan_out(self, translated_nodes: Dict) -> List[Tuple[str, Dict, bool]]:
+        """将合并节点的译文分发回每个插件
+
+        节点的全部原文都有译文时才输出该节点
+
+        Args:
+            translated_nodes: translate_nodes 对合并节点的翻译结果
+
+        Returns:
+            List[Tuple[str, Dict, bool]]: [(插件名称, 翻译结果, 是否为部分结果)]
+        """
+        titles, fields = self.translation_map(translated_nodes)
+        results = []
+        for plugin_name, nodes_info in self.plugins:
+            plugin_result = {}
+            for node_name, node_info in nodes_info.items():
+                node = self._translate_node(node_info, titles, fields)
+                if node is not None:
+                    plugin_result[node_name] = node
+            results.append((plugin_name, plugin_result, len(plugin_result) < len(nodes_info)))
+        return results
+
+    @staticmethod
+    def _translate_node(node_info: Dict, titles: Dict[str, str], fields: Dict[str, str]) -> Optional[Dict]:
+        """用标题和字段原文到译文的映射翻译一个节点，有原文缺少译文时返回 None"""
+        title = node_info.get("title", "")
+        if title and title not in titles:
+            return None
+        node = {"title": titles[title] if title else ""}
+        for section in SECTIONS:
+            node[section] = {}
+            for key, value in node_info.get(section, {}).items():
+                source = BatchRequestBuilder.source_text(key, value)
+                if source not in fields:
+                    return None
+                node[section][key] = fields[source]
+        return node
+
+    def estimate_savings(self, planner) -> Dict:
+        """按实际翻译相同的批次规划，估算全局去重相对逐个插件翻译节省的请求和 tokens
+
+        Args:
+            planner: CostPlanner
+
+        Returns:
+            Dict: 逐个插件和全局去重的请求数、tokens，以及节省的部分
+        """
+        separate = planner.plan(self.plugins)
+        merged = planner.plan_plugin("全局去重", self.nodes)
+        separate_tokens = separate["prompt_tokens"] + separate["completion_tokens"]
+        merged_tokens = merged["prompt_tokens"] + merged["completion_tokens"]
+        return {
+            "occurrences": self.occurrences,
+            "unique": self.unique,
+            "separate_requests": separate["requests"],
+            "merged_requests": merged["requests"],
+            "separate_tokens": separate_tokens,
+            "merged_tokens": merged_tokens,
+            "saved_requests": separate["requests"] - merged["requests"],
+            "saved_tokens": separate_tokens - merged_tokens,
+            "saved_cost": separate["cost"] - merged["cost"],
+            "currency": separate["currency"]
+        }
@@ -0,0 +1,153 @@
+"""术语表匹配模块"""
+
+import re
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Set, Tuple
+
+from .prompts import GLOSSARY, TRANSLATOR_CORE_PROMPT, PromptTemplate
+
+_SEPARATOR = re.compile(r'[^A-Za-z0-9]+')
+_CAMEL_WORD = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+')
+
+
+def normalize(text: str) -> str:
+    """将原文规范为以单个空格分隔的小写单词，snake_case、camelCase 和数字后缀都拆开
+
+    如 "IPAdapterApply" -> "ip adapter apply"，"image_1" -> "image 1"
+    """
+    words = []
+    for piece in _SEPARATOR.split(text):
+        words.extend(word.lower() for word in _CAMEL_WORD.findall(piece))
+    return " ".join(words)
+
+
+class AhoCorasick:
+    """Aho-Corasick 多模式匹配自动机
+
+    一次扫描文本即可找出所有模式的出现位置，耗时与文本长度和匹配数成正比，与模式数量无关；
+    只接受整词匹配（模式两端是文本边界或空白）
+    """
+
+    def __init__(self, patterns: List[str]):
+        """构建自动机
+
+        Args:
+            patterns: 模式列表，匹配结果为模式在列表中的序号
+        """
+        self.patterns = patterns
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        for index, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._output[state].append(index)
+
+        # 按广度优先计算失败转移，并合并失败状态的输出
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0) if state else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def search(self, text: str) -> Set[int]:
+        """返回在文本中以整词出现的模式序号"""
+        found = set()
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for index in self._output[state]:
+                start = position - len(self.patterns[index]) + 1
+                end = position + 1
+                if (start == 0 or text[start - 1].isspace()) and (end == len(text) or text[end].isspace()):
+                    found.add(index)
+        return found
+
+
+class Glossary:
+    """术语表
+
+    用 Aho-Corasick 在批次原文中查找术语，只把出现的术语条目放进请求，
+    相同的条目组合复用已生成的术语表文本
+    """
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, entries: List[Dict] = None):
+        """初始化术语表
+
+        Args:
+            entries: 术语条目 {"group", "terms", "rule"}，为空时使用提示词模板中的 GLOSSARY
+        """
+        self.entries = entries if entries is not None else GLOSSARY
+        patterns = []
+        self._pattern_entries: List[int] = []
+        for entry_index, entry in enumerate(self.entries):
+            for pattern in self._variants(entry["terms"]):
+                patterns.append(pattern)
+                self._pattern_entries.append(entry_index)
+        self._matcher = AhoCorasick(patterns)
+        self._sections: Dict[Tuple[int, ...], str] = {}
+        self._lock = threading.Lock()
+        self.full_prompt = PromptTemplate.build_translator_prompt(self.entries)
+
+    @classmethod
+    def default(cls) -> "Glossary":
+        """进程内共用的默认术语表"""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @staticmethod
+    def _variants(terms: List[str]) -> Set[str]:
+        """源术语的匹配形式：拆词形式、连写形式（ipadapter）以及单个单词的复数形式
+
+        多词术语（如 start_at）末尾不一定是名词，不生成复数形式
+        """
+        variants = set()
+        for term in terms:
+            words = normalize(term)
+            variants.add(words)
+            if not _SEPARATOR.search(term):
+                variants.add(term.lower())
+            if words.isalpha():
+                variants.add(f"{words}s")
+        variants.discard("")
+        return variants
+
+    def select(self, texts: Iterable[str]) -> List[int]:
+        """返回在原文中出现的术语条目序号（按术语表顺序）"""
+        text = "\n".join(normalize(t) for t in texts if t)
+        return sorted({self._pattern_entries[index] for index in self._matcher.search(text)})
+
+    def section(self, texts: Iterable[str]) -> str:
+        """生成只包含原文中出现的术语条目的术语表文本，没有匹配的术语时为空字符串"""
+        selected = tuple(self.select(texts))
+        with self._lock:
+            section = self._sections.get(selected)
+            if section is None:
+                section = PromptTemplate.build_glossary_section([self.entries[i] for i in selected])
+                self._sections[selected] = section
+        return section
+
+    def system_prompt(self, texts: Iterable[str]) -> str:
+        """生成只包含原文中出现的术语条目的完整提示词（固定规则 + 术语表）"""
+        section = self.section(texts)
+        return f"{TRANSLATOR_CORE_PROMPT}\n\n{section}" if section else TRANSLATOR_CORE_PROMPT
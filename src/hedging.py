@@ -0,0 +1,127 @@
+"""对冲请求模块"""
+
+import queue
+import threading
+from collections import deque
+from typing import Callable, Dict, Optional, Tuple
+
+
+class HedgePolicy:
+    """对冲请求策略
+
+    记录近期成功请求的耗时，请求超过指定百分位耗时（默认 p90）仍未完成时，
+    向同一或其他服务再发出一个相同的请求，先完成的结果生效，另一个请求被取消
+    """
+
+    def __init__(self, percentile: float = 90, min_samples: int = 5, min_delay: float = 1.0,
+                 max_hedges: int = 1, window: int = 200):
+        """初始化对冲策略
+
+        Args:
+            percentile: 发出对冲请求的耗时百分位
+            min_samples: 至少记录多少个请求耗时后才开始对冲
+            min_delay: 对冲等待时间的下限（秒），避免对很快的请求也发出副本
+            max_hedges: 每个请求最多发出的对冲请求数
+            window: 参与计算的最近请求数
+        """
+        self.percentile = percentile
+        self.min_samples = max(1, min_samples)
+        self.min_delay = min_delay
+        self.max_hedges = max(1, max_hedges)
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict) -> Optional["HedgePolicy"]:
+        """根据配置创建对冲策略，未启用时返回 None
+
+        Args:
+            config: {"enabled", "percentile", "min_samples", "min_delay", "max_hedges"}
+        """
+        config = config or {}
+        if not config.get("enabled"):
+            return None
+        return cls(**{k: v for k, v in config.items() if k != "enabled"})
+
+    def record(self, latency: float):
+        """记录一个成功请求的耗时（秒）"""
+        with self._lock:
+            self._latencies.append(latency)
+
+    def delay(self) -> Optional[float]:
+        """发出对冲请求前的等待时间，记录不足时返回 None（不对冲）"""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            latencies = sorted(self._latencies)
+        index = min(len(latencies) - 1, max(0, int(round(self.percentile / 100 * len(latencies))) - 1))
+        return max(self.min_delay, latencies[index])
+
+
+def hedged_call(attempt: Callable[[int, threading.Event], object], delay: float, max_hedges: int = 1,
+                on_hedge: Callable[[int], None] = None,
+                on_discard: Callable[[int], None] = None) -> Tuple[int, object]:
+    """发送请求，超过等待时间仍未完成时发出对冲请求，返回最先成功的结果
+
+    每个请求在单独的线程中执行；有请求成功后设置取消标志，其余请求应在检查到标志后尽快结束。
+    所有请求都失败时抛出第一个请求的异常
+
+    Args:
+        attempt: 发送一个请求的函数 (序号, 取消标志) -> 结果，序号 0 为原始请求
+        delay: 发出下一个对冲请求前的等待时间（秒）
+        max_hedges: 最多发出的对冲请求数
+        on_hedge: 发出对冲请求时调用 (序号)
+        on_discard: 未被采用的请求结束时调用 (序号)，用于统计额外消耗
+
+    Returns:
+        Tuple[int, object]: (被采用请求的序号, 结果)
+    """
+    results = queue.Queue()
+    cancel = threading.Event()
+    lock = threading.Lock()
+    state = {"winner": None, "started": 0}
+
+    def run(index: int):
+        try:
+            result, error = attempt(index, cancel), None
+        except Exception as e:
+            result, error = None, e
+        with lock:
+            won = error is None and state["winner"] is None
+            if won:
+                state["winner"] = index
+                cancel.set()
+            hedged = state["started"] > 1
+        if not won and hedged and on_discard:
+            on_discard(index)
+        results.put((index, result, error))
+
+    def launch():
+        with lock:
+            index = state["started"]
+            state["started"] += 1
+        threading.Thread(target=run, args=(index,), daemon=True).start()
+        return index
+
+    launch()
+    errors = {}
+    finished = 0
+    while True:
+        can_hedge = state["started"] <= max_hedges and not errors
+        try:
+            index, result, error = results.get(timeout=delay if can_hedge else None)
+        except queue.Empty:
+            index = launch()
+            if on_hedge:
+                on_hedge(index)
+            continue
+
+        finished += 1
+        if error is None and state["winner"] == index:
+            return index, result
+        if error is not None:
+            errors[index] = error
+        if finished == state["started"]:
+            # 所有请求都已结束且没有成功的请求
+            cancel.set()
+            raise errors[min(errors)]
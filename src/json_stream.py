@@ -0,0 +1,100 @@
+"""增量 JSON 解析模块"""
+
+import json
+from typing import List, Tuple
+
+
+class IncrementalJSONParser:
+    """顶层 JSON 对象的增量解析器
+
+    逐段接收模型的流式输出，每当顶层对象中的一个键值对完整时立即返回；
+    忽略对象之前的说明文字和代码块标记，单个键值对格式错误时跳过而不影响后续内容
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0                # 下一个待扫描字符的位置
+        self._started = False        # 是否已进入顶层对象
+        self._finished = False       # 顶层对象是否已结束
+        self._pair_start = None      # 当前键值对的起始位置
+        self._depth = 0              # 当前键值对内部的嵌套深度
+        self._in_string = False
+        self._escaped = False
+        self.errors = 0              # 被跳过的格式错误键值对数量
+
+    @property
+    def finished(self) -> bool:
+        """顶层对象是否已完整结束"""
+        return self._finished
+
+    def feed(self, chunk: str) -> List[Tuple[str, object]]:
+        """输入一段文本，返回其中新完成的键值对
+
+        Args:
+            chunk: 流式输出的一段文本
+
+        Returns:
+            List[Tuple[str, object]]: 新完成的 (键, 值) 列表
+        """
+        if self._finished or not chunk:
+            return []
+
+        self._buffer += chunk
+        pairs = []
+
+        while self._pos < len(self._buffer):
+            char = self._buffer[self._pos]
+
+            if not self._started:
+                if char == '{':
+                    self._started = True
+                    self._pair_start = self._pos + 1
+                self._pos += 1
+                continue
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+            elif char in ']}' and self._depth > 0:
+                self._depth -= 1
+            elif char in ',}' and self._depth == 0:
+                pair = self._parse_pair(self._buffer[self._pair_start:self._pos])
+                if pair:
+                    pairs.append(pair)
+                self._pair_start = self._pos + 1
+                if char == '}':
+                    self._finished = True
+                    self._pos += 1
+                    break
+
+            self._pos += 1
+
+        return pairs
+
+    def finish(self) -> List[Tuple[str, object]]:
+        """输出结束时调用；顶层对象以右括号结束，没有需要补充解析的内容"""
+        return []
+
+    def _parse_pair(self, text: str):
+        """解析一个 "键": 值 片段，格式错误时返回 None"""
+        text = text.strip()
+        if not text:
+            return None
+        try:
+            # 将片段包成单键对象交给标准库解析，保证转义等细节正确
+            parsed = json.loads("{" + text + "}")
+        except json.JSONDecodeError:
+            self.errors += 1
+            return None
+        if len(parsed) != 1:
+            self.errors += 1
+            return None
+        return next(iter(parsed.items()))
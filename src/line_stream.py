@@ -0,0 +1,102 @@
+"""逐行词条格式模块
+
+紧凑的请求和响应格式：每行一个词条 "编号<TAB>文本"，以单独一行 END 结束。
+相比 JSON 不需要引号、逗号和括号，单行格式错误也只影响该行
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+# 响应结束标记
+END_MARKER = "END"
+
+# 一行词条：编号、制表符、文本（允许行首空白）
+_LINE = re.compile(r'\s*(\d+)\t(.*)')
+
+_ESCAPES = {"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"}
+_UNESCAPE = re.compile(r'\\(.)')
+_UNESCAPES = {"\\": "\\", "t": "\t", "n": "\n", "r": "\r"}
+
+
+def escape(text: str) -> str:
+    """转义文本中的反斜杠、制表符和换行符，保证一个词条只占一行"""
+    return "".join(_ESCAPES.get(char, char) for char in text)
+
+
+def unescape(text: str) -> str:
+    """还原 escape 转义的文本，未知的转义保持原样"""
+    return _UNESCAPE.sub(lambda m: _UNESCAPES.get(m.group(1), m.group(0)), text)
+
+
+def encode(entries: Dict[str, str]) -> str:
+    """将编号到文本的映射编码为逐行格式（不含结束标记）"""
+    return "\n".join(f"{key}\t{escape(text)}" for key, text in entries.items())
+
+
+class LineParser:
+    """逐行格式的增量解析器，接口与 IncrementalJSONParser 相同
+
+    只解析以换行符结束的完整行，收到 END 行后结束；空行和代码块标记被忽略，
+    其他不符合格式的行计入 errors 后跳过，不影响其余词条
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._finished = False
+        self.errors = 0              # 被跳过的格式错误行数
+
+    @property
+    def finished(self) -> bool:
+        """是否已收到结束标记"""
+        return self._finished
+
+    def feed(self, chunk: str) -> List[Tuple[str, object]]:
+        """输入一段文本，返回其中新完成的词条
+
+        Args:
+            chunk: 流式输出的一段文本
+
+        Returns:
+            List[Tuple[str, object]]: 新完成的 (编号, 译文) 列表
+        """
+        if self._finished or not chunk:
+            return []
+
+        self._buffer += chunk
+        pairs = []
+        while not self._finished:
+            end = self._buffer.find("\n")
+            if end < 0:
+                break
+            line, self._buffer = self._buffer[:end], self._buffer[end + 1:]
+            pair = self._parse_line(line)
+            if pair:
+                pairs.append(pair)
+        return pairs
+
+    def finish(self) -> List[Tuple[str, object]]:
+        """输出已完整结束（如 finish_reason 为 stop）时调用，解析最后一行没有换行符的内容
+
+        输出被截断时不应调用，最后一行可能只有一半
+        """
+        if self._finished or not self._buffer:
+            return []
+        line, self._buffer = self._buffer, ""
+        pair = self._parse_line(line)
+        return [pair] if pair else []
+
+    def _parse_line(self, line: str):
+        """解析一行，返回 (编号, 译文)，结束标记和可忽略的行返回 None"""
+        line = line.rstrip("\r")
+        stripped = line.strip()
+        if stripped == END_MARKER:
+            self._finished = True
+            return None
+        if not stripped or stripped.startswith("```"):
+            return None
+
+        match = _LINE.fullmatch(line)
+        if not match:
+            self.errors += 1
+            return None
+        return match.group(1), unescape(match.group(2)).strip()
@@ -0,0 +1,465 @@
+"""本地模拟 LLM 服务
+
+提供 OpenAI 兼容的 /chat/completions 接口，返回确定性的"译文"，
+可配置延迟分布、错误和限流注入、响应截断和 JSON 格式错误，用于离线测试和性能对比。
+模拟服务商的前缀缓存：系统消息与之前的请求完全相同时，在 usage.prompt_tokens_details.cached_tokens
+中返回命中的 tokens，并统计出现过的不同前缀数量，用于验证请求前缀是否稳定；
+同时提供火山方舟上下文缓存接口（/context/create、/context/chat/completions）的简化实现。
+
+用法:
+    python -m src.mock_server --port 8765 --latency lognormal:2,0.6 --rate-limit-rate 0.05
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+from . import line_stream
+from .token_utils import TokenEstimator
+
+
+class LatencyModel:
+    """响应延迟分布
+
+    支持的格式:
+        fixed:秒                 固定延迟
+        uniform:最小,最大        均匀分布
+        lognormal:中位数,sigma   对数正态分布，模拟长尾延迟
+    """
+
+    def __init__(self, spec: str = "fixed:0", rng: random.Random = None):
+        self.spec = spec
+        self.rng = rng or random.Random()
+        kind, _, params = spec.partition(":")
+        self.kind = kind
+        self.params = [float(p) for p in params.split(",") if p.strip()] if params else []
+        if kind not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"不支持的延迟分布: {spec}")
+
+    def sample(self) -> float:
+        """采样一次延迟（秒）"""
+        if self.kind == "fixed":
+            return self.params[0] if self.params else 0.0
+        if self.kind == "uniform":
+            return self.rng.uniform(self.params[0], self.params[1])
+        median, sigma = self.params
+        return self.rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+
+
+class MockLLMServer:
+    """本地模拟 LLM 服务
+
+    译文为原文加上"译"字前缀，保证结果确定且包含中文，便于验证映射是否正确
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: str = "fixed:0",
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 truncate_rate: float = 0.0, malformed_rate: float = 0.0,
+                 untranslated_rate: float = 0.0, retry_after: float = 0.05, seed: int = 0,
+                 prefix_cache: bool = True, cache_min_tokens: int = 0):
+        """初始化模拟服务
+
+        Args:
+            host: 监听地址
+            port: 监听端口，0 表示自动分配
+            latency: 延迟分布，见 LatencyModel
+            error_rate: 返回 500 错误的概率
+            rate_limit_rate: 返回 429 限流的概率
+            truncate_rate: 截断响应并返回 finish_reason=length 的概率
+            malformed_rate: 返回格式错误 JSON 的概率
+            untranslated_rate: 单个词条原样返回（未翻译）的概率，用于模拟能力较弱的模型
+            retry_after: 限流响应建议的重试等待时间（秒）
+            seed: 随机种子
+            prefix_cache: 是否模拟前缀缓存
+            cache_min_tokens: 前缀至少多少 tokens 才会被缓存
+        """
+        self.host = host
+        self.port = port
+        self.rng = random.Random(seed)
+        self.latency = LatencyModel(latency, self.rng)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.truncate_rate = truncate_rate
+        self.malformed_rate = malformed_rate
+        self.untranslated_rate = untranslated_rate
+        self.retry_after = retry_after
+        self.prefix_cache = prefix_cache
+        self.cache_min_tokens = cache_min_tokens
+        self.prefixes = {}     # 系统消息前缀的哈希 -> 出现次数
+        self.contexts = {}     # 上下文缓存 ID -> 消息
+
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {
+            "requests": 0,
+            "errors": 0,
+            "rate_limited": 0,
+            "truncated": 0,
+            "malformed": 0,
+            "untranslated": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "cached_tokens": 0,
+            "contexts": 0
+        }
+
+    @property
+    def base_url(self) -> str:
+        """OpenAI 客户端使用的服务地址"""
+        return f"http://{self.host}:{self.port}/v1"
+
+    def start(self) -> str:
+        """在后台线程启动服务，返回服务地址"""
+        self._server = ThreadingHTTPServer((self.host, self.port), _MockRequestHandler)
+        self._server.daemon_threads = True
+        self._server.mock = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        """停止服务"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.stats[name] += amount
+
+    def _chance(self, rate: float) -> bool:
+        with self._lock:
+            return rate > 0 and self.rng.random() < rate
+
+    @staticmethod
+    def translate_text(text: str) -> str:
+        """生成确定性的"译文" """
+        return f"译{text}"
+
+    @classmethod
+    def build_reply(cls, messages: List[Dict], keep_source=None) -> str:
+        """根据请求消息生成回复内容
+
+        用户消息中的 JSON 对象（标题和参数名分开时有两个）视为待翻译内容，值为字符串或包含"原文"的对象；
+        用户消息包含 "编号<TAB>原文" 行时按逐行格式回复，以结束标记结尾
+
+        Args:
+            messages: 请求消息
+            keep_source: 对每个词条调用，返回 True 时原样返回该词条
+        """
+        user_message = next(
+            (cls.message_text(m) for m in reversed(messages) if m.get("role") == "user"), ""
+        )
+        parser = line_stream.LineParser()
+        entries = parser.feed(user_message) + parser.finish()
+        if entries:
+            lines = [
+                f"{key}\t{line_stream.escape(value if keep_source and keep_source() else cls.translate_text(value))}"
+                for key, value in entries
+            ]
+            return "\n".join(lines + [line_stream.END_MARKER])
+
+        # 标题和参数名分为两部分时有两个 JSON 对象，合并后一起回复
+        payload = {}
+        decoder = json.JSONDecoder()
+        json_start = user_message.find("{")
+        while json_start >= 0:
+            try:
+                part, json_end = decoder.raw_decode(user_message, json_start)
+            except json.JSONDecodeError:
+                json_start = user_message.find("{", json_start + 1)
+                continue
+            if isinstance(part, dict):
+                payload.update(part)
+            json_start = user_message.find("{", json_end)
+        if not payload:
+            return "你好，我是本地模拟翻译服务。"
+
+        reply = {}
+        for key, value in payload.items():
+            if isinstance(value, dict):
+                value = value.get("原文", "")
+            reply[key] = str(value) if keep_source and keep_source() else cls.translate_text(str(value))
+        return json.dumps(reply, ensure_ascii=False, separators=(',', ':'))
+
+    def handle_completion(self, body: Dict) -> Tuple[int, Dict, Dict, str, str]:
+        """处理一次补全请求
+
+        Returns:
+            Tuple: (状态码, 额外响应头, 错误响应体, 回复内容, finish_reason)
+        """
+        self._count("requests")
+
+        if self._chance(self.rate_limit_rate):
+            self._count("rate_limited")
+            headers = {
+                "retry-after-ms": str(int(self.retry_after * 1000)),
+                "retry-after": str(max(0, math.ceil(self.retry_after)))
+            }
+            return 429, headers, {"error": {
+                "message": "mock rate limit", "type": "rate_limit_exceeded", "code": "RateLimitExceeded"
+            }}, "", ""
+
+        if self._chance(self.error_rate):
+            self._count("errors")
+            return 500, {}, {"error": {
+                "message": "mock internal error", "type": "server_error", "code": "InternalServiceError"
+            }}, "", ""
+
+        def keep_source() -> bool:
+            if self._chance(self.untranslated_rate):
+                self._count("untranslated")
+                return True
+            return False
+
+        content = self.build_reply(body.get("messages", []), keep_source)
+        finish_reason = "stop"
+
+        if self._chance(self.truncate_rate):
+            self._count("truncated")
+            content = content[:max(1, len(content) // 2)]
+            finish_reason = "length"
+        elif self._chance(self.malformed_rate) and \
+                (body.get("response_format") or {}).get("type", "text") == "text":
+            # 结构化输出由服务端保证为合法 JSON，不注入格式错误
+            self._count("malformed")
+            # 删除一个键值对之间的逗号，JSON 括号仍然配对但无法解析；逐行格式删除一行的制表符
+            if content.endswith(line_stream.END_MARKER):
+                content = content.replace("\t", " ", 1)
+            else:
+                content = content.replace('","', '""', 1)
+
+        return 200, {}, {}, content, finish_reason
+
+    def complete(self, body: Dict) -> Tuple[int, Dict, Dict]:
+        """处理一次非流式补全请求，不经过 HTTP，供离线批量任务的本地替身直接调用
+
+        Returns:
+            Tuple: (状态码, 额外响应头, 响应体)，成功时响应体为 chat.completion 对象
+        """
+        status, headers, error_body, content, finish_reason = self.handle_completion(body)
+        if status != 200:
+            return status, headers, error_body
+        return 200, headers, {
+            "id": f"mock-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock-model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": finish_reason
+            }],
+            "usage": self.usage_for(body, content)
+        }
+
+    @staticmethod
+    def message_text(message: Dict) -> str:
+        """消息的文本内容，content 为分段列表（如带 cache_control 的显式缓存标记）时拼接各段文本"""
+        content = message.get("content", "")
+        if isinstance(content, list):
+            return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+        return content if isinstance(content, str) else ""
+
+    def create_context(self, body: Dict) -> Dict:
+        """创建上下文缓存，返回上下文对象"""
+        context_id = f"ctx-{uuid.uuid4().hex[:12]}"
+        with self._lock:
+            self.contexts[context_id] = list(body.get("messages", []))
+            self.stats["contexts"] += 1
+        return {
+            "id": context_id,
+            "model": body.get("model", "mock-model"),
+            "mode": body.get("mode", "common_prefix"),
+            "ttl": body.get("ttl", 86400),
+            "usage": {"prompt_tokens": sum(
+                TokenEstimator.estimate(self.message_text(m)) for m in body.get("messages", [])
+            )}
+        }
+
+    def _cached_tokens(self, body: Dict) -> int:
+        """按请求开头连续的系统消息模拟前缀缓存，返回命中的 tokens"""
+        prefix = []
+        for message in body.get("messages", []):
+            if message.get("role") != "system":
+                break
+            prefix.append(self.message_text(message))
+        if not prefix:
+            return 0
+
+        text = "\n".join(prefix)
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with self._lock:
+            seen = self.prefixes.get(digest, 0)
+            self.prefixes[digest] = seen + 1
+        tokens = TokenEstimator.estimate(text)
+        if body.get("_context") or (self.prefix_cache and seen and tokens >= self.cache_min_tokens):
+            return tokens
+        return 0
+
+    def usage_for(self, body: Dict, content: str) -> Dict:
+        """估算请求的 tokens 使用量"""
+        prompt_tokens = sum(TokenEstimator.estimate(self.message_text(m)) for m in body.get("messages", []))
+        completion_tokens = TokenEstimator.estimate(content)
+        cached_tokens = self._cached_tokens(body)
+        self._count("prompt_tokens", prompt_tokens)
+        self._count("completion_tokens", completion_tokens)
+        self._count("cached_tokens", cached_tokens)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached_tokens}
+        }
+
+
+class _MockRequestHandler(BaseHTTPRequestHandler):
+    """模拟服务的 HTTP 请求处理器"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        mock: MockLLMServer = self.server.mock
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": {"message": "invalid json", "type": "invalid_request_error"}})
+            return
+
+        path = self.path.rstrip("/")
+        if path.endswith("/context/create"):
+            self._send_json(200, mock.create_context(body))
+            return
+
+        if not path.endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"unknown path {self.path}", "type": "not_found"}})
+            return
+
+        if path.endswith("/context/chat/completions"):
+            # 上下文缓存的消息拼接在请求消息之前
+            context = mock.contexts.get(body.get("context_id"))
+            if context is None:
+                self._send_json(404, {"error": {"message": "context not found", "type": "not_found"}})
+                return
+            body = {**body, "messages": context + body.get("messages", []), "_context": True}
+
+        latency = mock.latency.sample()
+        if not body.get("stream"):
+            status, headers, response = mock.complete(body)
+            time.sleep(latency if status == 200 else min(latency, 0.05))
+            self._send_json(status, response, headers)
+            return
+
+        status, headers, error_body, content, finish_reason = mock.handle_completion(body)
+        if status != 200:
+            time.sleep(min(latency, 0.05))
+            self._send_json(status, error_body, headers)
+            return
+
+        usage = mock.usage_for(body, content)
+        completion_id = f"mock-{uuid.uuid4().hex[:12]}"
+        model = body.get("model", "mock-model")
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+        self._send_stream(completion_id, model, content, finish_reason, usage, include_usage, latency)
+
+    def _send_json(self, status: int, data: Dict, headers: Dict = None):
+        payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_stream(self, completion_id: str, model: str, content: str, finish_reason: str,
+                     usage: Dict, include_usage: bool, latency: float):
+        """以 SSE 格式分块发送回复，首个数据块前等待 30% 的延迟，其余延迟平均分摊"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        pieces = [content[i:i + 8] for i in range(0, len(content), 8)] or [""]
+        time.sleep(latency * 0.3)
+        per_piece = latency * 0.7 / len(pieces)
+
+        def chunk(delta: Dict, reason=None, chunk_usage=None, choices=True) -> bytes:
+            data = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": reason}] if choices else []
+            }
+            if chunk_usage:
+                data["usage"] = chunk_usage
+            return f"data: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+
+        try:
+            self.wfile.write(chunk({"role": "assistant", "content": ""}))
+            for piece in pieces:
+                self.wfile.write(chunk({"content": piece}))
+                self.wfile.flush()
+                if per_piece:
+                    time.sleep(per_piece)
+            self.wfile.write(chunk({}, finish_reason))
+            if include_usage:
+                self.wfile.write(chunk({}, chunk_usage=usage, choices=False))
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地模拟 LLM 服务（OpenAI 兼容）")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="fixed:0", help="fixed:秒 / uniform:最小,最大 / lognormal:中位数,sigma")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--truncate-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--untranslated-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = MockLLMServer(
+        host=args.host, port=args.port, latency=args.latency,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+        truncate_rate=args.truncate_rate, malformed_rate=args.malformed_rate,
+        untranslated_rate=args.untranslated_rate, seed=args.seed
+    )
+    print(f"模拟服务已启动: {server.start()}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
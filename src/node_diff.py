@@ -1,6 +1,7 @@
 import json
 import os
 from typing import Dict, Tuple, List
+from .request_builder import BatchRequestBuilder, SECTIONS
 
 class NodeDiffer:
     """节点差异分析器"""
@@ -150,4 +151,109 @@ class NodeDiffer:
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(normalized_nodes, f, indent=4, ensure_ascii=False)
             
-        return output_file 
\ No newline at end of file
+        return output_file
+    
+    @staticmethod
+    def match_node_names(new_names: List[str], old_names: List[str]) -> Dict[str, str]:
+        """按节点名称匹配新旧节点，名称不同时按规范化后的基础名称匹配
+        
+        Args:
+            new_names: 新版本的节点名称
+            old_names: 旧版本的节点名称
+            
+        Returns:
+            Dict[str, str]: 新节点名称 -> 旧节点名称，未匹配的新节点不在结果中
+        """
+        old_set = set(old_names)
+        old_by_base = {}
+        for name in old_names:
+            old_by_base.setdefault(NodeDiffer._get_base_name(name), name)
+        
+        matched = {}
+        for name in new_names:
+            if name in old_set:
+                matched[name] = name
+            else:
+                old_name = old_by_base.get(NodeDiffer._get_base_name(name))
+                if old_name:
+                    matched[name] = old_name
+        return matched
+    
+    @staticmethod
+    def translation_delta(nodes_info: Dict, previous: Dict, previous_source: Dict = None,
+                          validator=None) -> Tuple[Dict, Dict, Dict]:
+        """比较新版本节点与已有的翻译文件，计算字段级的差异
+        
+        已有译文的标题和字段直接沿用，只有以下部分需要翻译：
+        新增的节点、新增或改名的字段、原文有变化的标题和字段（需要 previous_source），
+        以及已有译文为空或仍为英文的部分
+        
+        Args:
+            nodes_info: 新版本的节点信息
+            previous: 已有的翻译文件（如 zh-CN/Nodes/插件名.json）
+            previous_source: 已有译文对应的英文原文，为空时无法发现原文有变化但键名不变的标题和字段
+            validator: ValidationEngine，用于判断已有译文是否仍为英文
+            
+        Returns:
+            Tuple[Dict, Dict, Dict]: (需要翻译的部分, 沿用的译文, 差异统计)
+        """
+        previous_source = previous_source or {}
+        matched = NodeDiffer.match_node_names(list(nodes_info), list(previous))
+        delta, reused = {}, {}
+        summary = {
+            "new_nodes": 0, "changed_titles": 0, "new_fields": 0, "changed_fields": 0,
+            "stale_fields": 0, "removed_fields": 0, "reused_fields": 0
+        }
+        
+        def usable(source: str, translation) -> bool:
+            if not BatchRequestBuilder.is_valid_value(translation):
+                return False
+            return not (validator and validator.is_untranslated(source, translation))
+        
+        for node_name, node_info in nodes_info.items():
+            old_name = matched.get(node_name)
+            if old_name is None or not isinstance(previous.get(old_name), dict):
+                delta[node_name] = node_info
+                summary["new_nodes"] += 1
+                continue
+            
+            old = previous[old_name]
+            old_source = previous_source.get(node_name) or previous_source.get(old_name)
+            part = {"title": "", "inputs": {}, "widgets": {}, "outputs": {}}
+            done = {"inputs": {}, "widgets": {}, "outputs": {}}
+            
+            title = node_info.get("title", "")
+            if title:
+                if old_source is not None and old_source.get("title", "") != title:
+                    part["title"] = title
+                    summary["changed_titles"] += 1
+                elif usable(title, old.get("title")):
+                    done["title"] = old["title"]
+                else:
+                    part["title"] = title
+            
+            for section in SECTIONS:
+                old_section = old.get(section) or {}
+                old_source_section = (old_source or {}).get(section) or {}
+                summary["removed_fields"] += sum(1 for key in old_section if key not in node_info.get(section, {}))
+                for key, value in node_info.get(section, {}).items():
+                    source = BatchRequestBuilder.source_text(key, value)
+                    if key not in old_section:
+                        summary["new_fields"] += 1
+                    elif (key in old_source_section and
+                          BatchRequestBuilder.source_text(key, old_source_section[key]) != source):
+                        summary["changed_fields"] += 1
+                    elif not usable(source, old_section[key]):
+                        summary["stale_fields"] += 1
+                    else:
+                        done[section][key] = old_section[key]
+                        summary["reused_fields"] += 1
+                        continue
+                    part[section][key] = value
+            
+            if done.get("title") or any(done[section] for section in SECTIONS):
+                reused[node_name] = done
+            if part["title"] or any(part[section] for section in SECTIONS):
+                delta[node_name] = part
+        
+        return delta, reused, summary
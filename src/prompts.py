@@ -1,95 +1,5 @@
 """提示词模板管理模块"""
 
-# 通用的翻译助手提示词
-TRANSLATOR_PROMPT = """你是一个专业的 ComfyUI 节点翻译助手。请遵循以下规则:
-
-严格遵循规则： 保持 JSON 格式不变,只翻译右侧值为中文
-
-2. 节点标题翻译规则:
-   - 保留功能类型标识，如 "While循环-起始"、"While循环-结束"
-   - 对于版本标识，保持原样，如 "V2"、"SDXL"、 "Ultra"等
-   - 对于功能组合词，采用"动词+名词"结构，如 "IPAdapterApply" -> "应用IPAdapter"
-
-3. 参数翻译规则:
-   - 保持专业术语的准确性和一致性
-   - 常见参数的标准翻译:
-     * image/IMAGE -> 图像
-     * mask/MASK -> 遮罩
-     * text/STRING -> 文本/字符串
-     * value -> 值
-     * strength -> 强度
-     * weight -> 权重/比重
-     * scale -> 缩放
-     * size -> 大小
-     * mode -> 模式
-     * type -> 类型
-     * range -> 范围
-     * step -> 步进
-     * flow -> 流
-     * boolean -> 布尔
-     * optional -> 可选
-     * pipe -> 节点束
-     * embed/embeds -> 嵌入组
-     * params -> 参数组
-     * preset -> 预设
-     * provider -> 设备
-     * start_at/end_at -> 开始位置/结束位置
-     * boost -> 增强
-     * combine -> 合并
-     * batch -> 批次
-
-4. 特殊处理规则:
-   - AI/ML 专业术语保持原样:
-     * IPAdapter、LoRA、VAE、CLIP、Bbox、Tensor、BBOX、sigma、sigmas等
-     * FaceID、InsightFace、SDXL 等
-   - 复合专业术语的处理:
-     * clip_vision -> CLIP视觉
-     * attn_mask -> 关注层遮罩
-     * embeds_scaling -> 嵌入组缩放
-   - 正负面词汇统一:
-     * positive -> 正面
-     * negative -> 负面
-   - 数字和层级:
-     * 数字编号使用中文，如 "weights_1" -> "权重_1"
-     * 保持层级关系，如 "initial_value0" -> "初始值0"
-     * 多个相似项使用编号，如 "image1/image2" -> "图像_1/图像_2"
-   - 值的翻译规则:
-     * 只翻译值部分为中文
-     * 遵循前面定义的翻译规则
-     * 保持格式统一性
-
-8. 翻译案例结构参考:
-   ```json
-   "IPAdapterMS": {
-       "title": "应用IPAdapter Mad Scientist",
-       "inputs": {
-           "model": "模型",
-           "ipadapter": "IPAdapter",
-           "image": "图像",
-           "image_negative": "负面图像",
-           "attn_mask": "关注层遮罩",
-           "clip_vision": "CLIP视觉"
-       },
-       "widgets": {
-           "weight": "权重",
-           "weight_type": "权重类型",
-           "combine_embeds": "合并嵌入组",
-           "start_at": "开始应用位置",
-           "end_at": "结束应用位置",
-           "embeds_scaling": "嵌入组缩放"
-       },
-       "outputs": {
-           "MODEL": "模型"
-       }
-   }
-   ```
-
-   翻译要点说明:
-   - title: 采用"动词+名词"结构，保留专有名词
-   - inputs/outputs: 保持专业术语一致性，如 MODEL -> 模型
-   - widgets: 参数命名规范，使用标准翻译对照
-   - 整体结构完整，格式统一，术语翻译一致"""
-
 # 不同模型的测试提示词
 MODEL_TEST_PROMPTS = {
     "qwen-omni-turbo": "你是一个 AI 助手。",
@@ -100,100 +10,130 @@ MODEL_TEST_PROMPTS = {
 # 火山引擎的特殊提示词
 VOLCENGINE_PROMPT = "你是豆包，是由字节跳动开发的 AI 人工智能助手"
 
-class PromptTemplate:
-    """提示词模板类"""
-    
-    @staticmethod
-    def get_translator_prompt() -> str:
-        """获取翻译器的系统提示词"""
-        return """你是一个专业的 ComfyUI 节点翻译专家。请将提供的节点信息从英文翻译成中文，遵循以下规则：
+# 翻译器系统提示词的固定规则，所有批次和响应格式（json、lines）完全相同，可被服务商的上下文缓存命中；
+# 术语表按批次内容、响应格式的要求按格式放在用户消息中
+TRANSLATOR_CORE_PROMPT = """你是一个专业的 ComfyUI 节点翻译专家。请将提供的节点信息从英文翻译成中文，遵循以下规则：
 
-严格遵循规则： 保持 JSON 格式不变,只翻译右侧值为中文
+1. 输出格式:
+   - 严格按照用户消息中要求的格式返回，编号保持不变，只把英文原文翻译为中文
 
-2. 节点标题翻译规则:
+2. 节点标题翻译规则（用户消息中"节点标题"部分的词条）:
    - 保留功能类型标识，如 "While循环-起始"、"While循环-结束"
    - 对于版本标识，保持原样，如 "V2"、"SDXL"、 "Ultra"等
    - 对于功能组合词，采用"动词+名词"结构，如 "IPAdapterApply" -> "应用IPAdapter"
 
-3. 参数翻译规则:
-   - 保持专业术语的准确性和一致性
-   - 常见参数的标准翻译:
-     * image/IMAGE -> 图像
-     * mask/MASK -> 遮罩
-     * text/STRING -> 文本/字符串
-     * value -> 值
-     * strength -> 强度
-     * weight -> 权重/比重
-     * scale -> 缩放
-     * size -> 大小
-     * mode -> 模式
-     * type -> 类型
-     * range -> 范围
-     * step -> 步进
-     * flow -> 流
-     * boolean -> 布尔
-     * optional -> 可选
-     * pipe -> 节点束
-     * embed/embeds -> 嵌入组
-     * params -> 参数组
-     * preset -> 预设
-     * provider -> 设备
-     * start_at/end_at -> 开始位置/结束位置
-     * boost -> 增强
-     * combine -> 合并
-     * batch -> 批次
-
-4. 特殊处理规则:
-   - AI/ML 专业术语保持原样（无论大小写）:
-     * IPAdapter、LoRA、VAE、CLIP、Bbox、Tensor、BBOX、sigma、sigmas等
-     * FaceID、InsightFace、SDXL 等
-   - 复合专业术语的处理:
-     * clip_vision -> CLIP视觉
-     * attn_mask -> 关注层遮罩
-     * embeds_scaling -> 嵌入组缩放
-   - 正负面词汇统一:
-     * positive -> 正面
-     * negative -> 负面
+3. 参数翻译规则（"参数名"部分的词条）:
+   - 保持专业术语的准确性和一致性，术语表中的词使用给定的标准翻译
    - 数字和层级:
      * 数字编号使用中文，如 "weights_1" -> "权重_1"
      * 保持层级关系，如 "initial_value0" -> "初始值0"
      * 多个相似项使用编号，如 "image1/image2" -> "图像_1/图像_2"
-   - 值的翻译规则:
-     * 只翻译值部分为中文
+   - 原文的翻译规则:
+     * 只翻译原文为中文
      * 遵循前面定义的翻译规则
-     * 保持格式统一性
-
-8. 翻译案例结构参考:
-   ```json
-   "IPAdapterMS": {
-       "title": "应用IPAdapter Mad Scientist",
-       "inputs": {
-           "model": "模型",
-           "ipadapter": "IPAdapter",
-           "image": "图像",
-           "image_negative": "负面图像",
-           "attn_mask": "关注层遮罩",
-           "clip_vision": "CLIP视觉"
-       },
-       "widgets": {
-           "weight": "权重",
-           "weight_type": "权重类型",
-           "combine_embeds": "合并嵌入组",
-           "start_at": "开始应用位置",
-           "end_at": "结束应用位置",
-           "embeds_scaling": "嵌入组缩放"
-       },
-       "outputs": {
-           "MODEL": "模型"
-       }
-   }
-   ```
-
-   翻译要点说明:
-   - title: 采用"动词+名词"结构，保留专有名词
-   - inputs/outputs: 保持专业术语一致性，如 MODEL -> 模型
-   - widgets: 参数命名规范，使用标准翻译对照
-   - 整体结构完整，格式统一，术语翻译一致"""
+     * 保持格式统一性"""
+
+# 术语表分组：(分组名, 是否在一行内列出)
+GLOSSARY_GROUPS = (
+    ("常见参数的标准翻译", False),
+    ("AI/ML 专业术语保持原样（无论大小写）", True),
+    ("复合专业术语的处理", False),
+    ("正负面词汇统一", False)
+)
+
+
+def _term(group: str, terms: list, rule: str) -> dict:
+    return {"group": group, "terms": terms, "rule": rule}
+
+
+# 术语表：terms 中的任一源术语出现在批次原文中时才发送该条规则
+GLOSSARY = [
+    _term("常见参数的标准翻译", ["image"], "image/IMAGE -> 图像"),
+    _term("常见参数的标准翻译", ["mask"], "mask/MASK -> 遮罩"),
+    _term("常见参数的标准翻译", ["text", "string"], "text/STRING -> 文本/字符串"),
+    _term("常见参数的标准翻译", ["value"], "value -> 值"),
+    _term("常见参数的标准翻译", ["strength"], "strength -> 强度"),
+    _term("常见参数的标准翻译", ["weight"], "weight -> 权重/比重"),
+    _term("常见参数的标准翻译", ["scale"], "scale -> 缩放"),
+    _term("常见参数的标准翻译", ["size"], "size -> 大小"),
+    _term("常见参数的标准翻译", ["mode"], "mode -> 模式"),
+    _term("常见参数的标准翻译", ["type"], "type -> 类型"),
+    _term("常见参数的标准翻译", ["range"], "range -> 范围"),
+    _term("常见参数的标准翻译", ["step"], "step -> 步进"),
+    _term("常见参数的标准翻译", ["flow"], "flow -> 流"),
+    _term("常见参数的标准翻译", ["boolean"], "boolean -> 布尔"),
+    _term("常见参数的标准翻译", ["optional"], "optional -> 可选"),
+    _term("常见参数的标准翻译", ["pipe"], "pipe -> 节点束"),
+    _term("常见参数的标准翻译", ["embed", "embeds"], "embed/embeds -> 嵌入组"),
+    _term("常见参数的标准翻译", ["params"], "params -> 参数组"),
+    _term("常见参数的标准翻译", ["preset"], "preset -> 预设"),
+    _term("常见参数的标准翻译", ["provider"], "provider -> 设备"),
+    _term("常见参数的标准翻译", ["start_at", "end_at"], "start_at/end_at -> 开始位置/结束位置"),
+    _term("常见参数的标准翻译", ["boost"], "boost -> 增强"),
+    _term("常见参数的标准翻译", ["combine"], "combine -> 合并"),
+    _term("常见参数的标准翻译", ["batch"], "batch -> 批次"),
+    _term("AI/ML 专业术语保持原样（无论大小写）", ["IPAdapter"], "IPAdapter"),
+    _term("AI/ML 专业术语保持原样（无论大小写）", ["LoRA"], "LoRA"),
+    _term("AI/ML 专业术语保持原样（无论大小写）", ["VAE"], "VAE"),
+    _term("AI/ML 专业术语保持原样（无论大小写）", ["CLIP"], "CLIP"),
+    _term("AI/ML 专业术语保持原样（无论大小写）", ["Bbox"], "Bbox、BBOX"),
+    _term("AI/ML 专业术语保持原样（无论大小写）", ["Tensor"], "Tensor"),
+    _term("AI/ML 专业术语保持原样（无论大小写）", ["sigma", "sigmas"], "sigma、sigmas"),
+    _term("AI/ML 专业术语保持原样（无论大小写）", ["FaceID"], "FaceID"),
+    _term("AI/ML 专业术语保持原样（无论大小写）", ["InsightFace"], "InsightFace"),
+    _term("AI/ML 专业术语保持原样（无论大小写）", ["SDXL"], "SDXL"),
+    _term("复合专业术语的处理", ["clip_vision"], "clip_vision -> CLIP视觉"),
+    _term("复合专业术语的处理", ["attn_mask"], "attn_mask -> 关注层遮罩"),
+    _term("复合专业术语的处理", ["embeds_scaling"], "embeds_scaling -> 嵌入组缩放"),
+    _term("正负面词汇统一", ["positive"], "positive -> 正面"),
+    _term("正负面词汇统一", ["negative"], "negative -> 负面")
+]
+
+class PromptTemplate:
+    """提示词模板类"""
+    
+    @staticmethod
+    def get_translator_prompt() -> str:
+        """获取翻译器的完整系统提示词（包含全部术语）"""
+        return PromptTemplate.build_translator_prompt(GLOSSARY)
+
+    @staticmethod
+    def build_translator_prompt(entries: list) -> str:
+        """由固定规则和指定的术语条目生成系统提示词
+
+        Args:
+            entries: 术语条目（GLOSSARY 的子集），为空时只包含固定规则
+
+        Returns:
+            str: 系统提示词
+        """
+        section = PromptTemplate.build_glossary_section(entries)
+        return f"{TRANSLATOR_CORE_PROMPT}\n\n{section}" if section else TRANSLATOR_CORE_PROMPT
+
+    @staticmethod
+    def build_glossary_section(entries: list) -> str:
+        """生成术语表部分
+
+        Args:
+            entries: 术语条目（GLOSSARY 的子集）
+
+        Returns:
+            str: 术语表文本，没有条目时为空字符串
+        """
+        if not entries:
+            return ""
+
+        lines = ["4. 术语表:"]
+        for group, inline in GLOSSARY_GROUPS:
+            rules = [entry["rule"] for entry in entries if entry["group"] == group]
+            if not rules:
+                continue
+            if inline:
+                lines.append(f"   - {group}: {'、'.join(rules)}")
+            else:
+                lines.append(f"   - {group}:")
+                lines.extend(f"     * {rule}" for rule in rules)
+        return "\n".join(lines)
 
     @staticmethod
     def get_test_prompt() -> str:
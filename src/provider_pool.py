@@ -0,0 +1,356 @@
+"""多服务路由与故障转移模块"""
+
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .api_client import ClientManager, VOLCENGINE_BASE_URL
+from .cost_planner import PriceTable
+from .rate_limiter import RateLimiter
+
+
+class RequestCancelledError(Exception):
+    """请求在发送前或接收过程中被取消（如对冲请求中另一个请求已先完成）"""
+    pass
+
+
+class Provider:
+    """单个服务端点（服务商、地址、模型和密钥）及其健康状态"""
+
+    # 账户或鉴权类错误，重试没有意义，直接熔断
+    FATAL_MARKERS = (
+        "AccountOverdueError", "InvalidApiKeyError", "ModelNotFoundError",
+        "AuthenticationError", "PermissionDeniedError"
+    )
+    FATAL_STATUS = (401, 403)
+
+    # 换一个端点可能成功的错误：超时、连接错误、限流和服务端错误；
+    # 其他错误（如 400 参数错误、超出上下文长度）换端点重试结果相同，直接抛出
+    RETRYABLE_STATUS = (408, 409, 429)
+    RETRYABLE_MARKERS = ("Timeout", "Connection")
+
+    # 延迟和错误率的指数移动平均系数
+    EWMA_ALPHA = 0.3
+
+    def __init__(self, name: str, base_url: str, api_key: str, model_id: str, weight: float = 1.0,
+                 price: PriceTable = None, rpm: int = 0, tpm: int = 0, client=None, max_retries: int = None):
+        """初始化服务端点
+
+        Args:
+            name: 服务商名称，同时用于选择价格
+            base_url: OpenAI 兼容的服务地址
+            api_key: API 密钥
+            model_id: 模型 ID
+            weight: 基础权重
+            price: 价格，为空时按服务商和模型从默认价格表获取
+            rpm: 该端点每分钟最多请求数，0 表示使用全局限流配置
+            tpm: 该端点每分钟最多输入 tokens 数
+            client: 预先创建的客户端（如经过录像包装的客户端）
+            max_retries: 客户端自动重试次数
+        """
+        self.name = name
+        self.base_url = base_url
+        self.model_id = model_id
+        self.weight = weight
+        self.price = price or PriceTable(None, name, model_id)
+        self.client = client or ClientManager.get_client(api_key, base_url, max_retries)
+        self.rate_limiter = RateLimiter(rpm, tpm) if (rpm or tpm) else ClientManager.get_rate_limiter(base_url)
+
+        self.latency = None           # 请求耗时的移动平均（秒）
+        self.error_rate = 0.0         # 失败率的移动平均
+        self.consecutive_failures = 0
+        self.open_until = 0.0         # 熔断到期时间
+        self.fatal_reason = None      # 致命错误，熔断后不再恢复
+        self.requests = 0
+        self.failures = 0
+        self.rate_limited = 0
+        self.in_flight = 0
+
+    @property
+    def label(self) -> str:
+        return f"{self.name}/{self.model_id}"
+
+    @property
+    def unit_price(self) -> float:
+        return self.price.input_per_1k + self.price.output_per_1k
+
+    def available(self, now: float) -> bool:
+        """是否可以接收请求（未熔断或熔断已到期）"""
+        return not self.fatal_reason and now >= self.open_until
+
+    def summary(self) -> Dict:
+        """导出服务状态"""
+        return {
+            "provider": self.label,
+            "requests": self.requests,
+            "failures": self.failures,
+            "rate_limited": self.rate_limited,
+            "latency": round(self.latency, 3) if self.latency is not None else None,
+            "error_rate": round(self.error_rate, 3),
+            "fatal_reason": self.fatal_reason
+        }
+
+
+class ProviderPool:
+    """服务池
+
+    按观测到的延迟、错误率和价格加权选择服务端点，优先选择限流配额未用完的端点，
+    多个端点的配额叠加后总吞吐量可超过单个端点；请求失败或被限流时自动切换到其他端点，
+    连续失败的端点暂时熔断，账户欠费、密钥无效等致命错误则永久熔断
+    """
+
+    def __init__(self, providers: List[Provider], failure_threshold: int = 3, cooldown: float = 30.0,
+                 rate_limit_cooldown: float = 5.0, price_weight: float = 1.0, seed: int = None):
+        """初始化服务池
+
+        Args:
+            providers: 服务端点列表
+            failure_threshold: 连续失败多少次后熔断
+            cooldown: 熔断持续时间（秒），到期后允许一次试探请求
+            rate_limit_cooldown: 被限流且服务未给出重试时间时暂停使用的时间（秒）
+            price_weight: 价格对选择权重的影响程度，0 表示不考虑价格
+            seed: 随机种子
+        """
+        if not providers:
+            raise ValueError("服务池至少需要一个服务")
+        self.providers = providers
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.rate_limit_cooldown = rate_limit_cooldown
+        self.price_weight = price_weight
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, entries: List[Dict], config: Dict = None, cassette=None, **options) -> "ProviderPool":
+        """根据配置创建服务池
+
+        每个条目可直接给出 base_url 和 api_key，或用 service 引用 api_configs 和 api_keys 中的服务
+
+        Args:
+            entries: [{"name"/"service", "base_url", "api_key", "model_id", "weight", "rpm", "tpm", "enabled"}]
+            config: 完整配置，用于查找 api_configs、api_keys 和 pricing
+            cassette: 请求录像，所有端点的客户端经过录像
+            options: 传给 ProviderPool 的其他参数
+        """
+        config = config or {}
+        providers = []
+        failover = len([e for e in entries if e.get("enabled", True)]) > 1
+        for entry in entries:
+            if not entry.get("enabled", True):
+                continue
+            service = entry.get("service") or entry.get("name", "volcengine")
+            base_url = entry.get("base_url") or config.get("api_configs", {}).get(service, {}).get("base_url")
+            if not base_url and service == "volcengine":
+                base_url = VOLCENGINE_BASE_URL
+            if not base_url:
+                raise ValueError(f"服务 {service} 未配置 base_url")
+            # OpenAI 客户端会自动拼接 /chat/completions
+            base_url = base_url.rstrip("/")
+            if base_url.endswith("/chat/completions"):
+                base_url = base_url[:-len("/chat/completions")]
+
+            api_key = entry.get("api_key") or config.get("api_keys", {}).get(service, "")
+            model_id = entry.get("model_id") or config.get("model_ids", {}).get(service, "")
+            # 多个端点时不在单个端点上重试，失败后直接切换
+            max_retries = 0 if failover else None
+            client = ClientManager.get_client(api_key, base_url, max_retries)
+            if cassette:
+                client = cassette.wrap(client)
+            providers.append(Provider(
+                name=service,
+                base_url=base_url,
+                api_key=api_key,
+                model_id=model_id,
+                weight=entry.get("weight", 1.0),
+                price=PriceTable(config.get("pricing"), service, model_id),
+                rpm=entry.get("rpm", 0),
+                tpm=entry.get("tpm", 0),
+                client=client
+            ))
+        return cls(providers, **options)
+
+    def _score(self, provider: Provider, default_latency: float, cheapest: float) -> float:
+        """端点的选择权重：基础权重 / (预计延迟 × 错误惩罚 × 相对价格)"""
+        latency = provider.latency if provider.latency is not None else default_latency
+        penalty = 1 + 4 * provider.error_rate
+        # 未配置价格的端点按最便宜的计算
+        relative_price = (max(provider.unit_price, cheapest) / cheapest) ** self.price_weight if cheapest > 0 else 1.0
+        return provider.weight / (max(latency, 0.01) * penalty * relative_price)
+
+    def choose(self, tokens: int = 0, exclude=()) -> Optional[Provider]:
+        """选择一个端点
+
+        Args:
+            tokens: 请求的估算输入 tokens，用于判断限流配额
+            exclude: 本次请求已失败的端点
+
+        Returns:
+            Optional[Provider]: 选中的端点，没有可用端点时返回 None
+        """
+        now = time.time()
+        with self._lock:
+            candidates = [p for p in self.providers if p.available(now) and p not in exclude]
+            if not candidates:
+                return None
+
+            known = [p.latency for p in candidates if p.latency is not None]
+            default_latency = sum(known) / len(known) if known else 1.0
+            prices = [p.unit_price for p in candidates if p.unit_price > 0]
+            cheapest = min(prices) if prices else 0.0
+
+            # 优先选择现在就有限流配额的端点，都没有时选择等待时间最短的
+            ready = [p for p in candidates if p.rate_limiter.wait_time(tokens) <= 0]
+            if ready:
+                scores = [self._score(p, default_latency, cheapest) for p in ready]
+                chosen = self._rng.choices(ready, weights=scores)[0]
+            else:
+                chosen = min(candidates, key=lambda p: p.rate_limiter.wait_time(tokens))
+            chosen.in_flight += 1
+            return chosen
+
+    @staticmethod
+    def should_fail_over(error: Exception) -> bool:
+        """错误是否与端点有关，需要计入失败并切换到其他端点
+
+        超时、连接错误、限流和服务端错误可能只影响当前端点；密钥无效、账户欠费等致命错误
+        同样切换端点并永久熔断当前端点；其他错误与端点无关
+        """
+        status = getattr(error, "status_code", None)
+        if status in Provider.FATAL_STATUS or any(m in f"{type(error).__name__}: {error}"
+                                                   for m in Provider.FATAL_MARKERS):
+            return True
+        if status is not None:
+            return status in Provider.RETRYABLE_STATUS or status >= 500
+        if isinstance(error, (TimeoutError, ConnectionError)):
+            return True
+        return any(marker in type(error).__name__ for marker in Provider.RETRYABLE_MARKERS)
+
+    def release(self, provider: Provider):
+        """释放已选择但未发送请求的端点"""
+        with self._lock:
+            provider.in_flight = max(0, provider.in_flight - 1)
+
+    def record_success(self, provider: Provider, latency: float):
+        """记录一次成功请求"""
+        with self._lock:
+            provider.requests += 1
+            provider.in_flight = max(0, provider.in_flight - 1)
+            provider.consecutive_failures = 0
+            provider.error_rate *= (1 - Provider.EWMA_ALPHA)
+            if provider.latency is None:
+                provider.latency = latency
+            else:
+                provider.latency += Provider.EWMA_ALPHA * (latency - provider.latency)
+
+    def record_failure(self, provider: Provider, error: Exception, completed: bool = False):
+        """记录一次失败请求，并根据错误类型决定是否熔断
+
+        Args:
+            provider: 端点
+            error: 异常
+            completed: 请求已被记为成功后才失败（如流式连接中途断开）
+        """
+        message = f"{type(error).__name__}: {error}"
+        status = getattr(error, "status_code", None)
+        now = time.time()
+        with self._lock:
+            if not completed:
+                provider.requests += 1
+                provider.in_flight = max(0, provider.in_flight - 1)
+            provider.failures += 1
+
+            if status in Provider.FATAL_STATUS or any(m in message for m in Provider.FATAL_MARKERS):
+                provider.fatal_reason = message[:200]
+                return
+
+            if status == 429:
+                provider.rate_limited += 1
+                provider.open_until = now + self._retry_after(error)
+                return
+
+            provider.error_rate += Provider.EWMA_ALPHA * (1 - provider.error_rate)
+            provider.consecutive_failures += 1
+            if provider.consecutive_failures >= self.failure_threshold:
+                provider.open_until = now + self.cooldown
+
+    def _retry_after(self, error: Exception) -> float:
+        """从限流响应中读取建议的等待时间"""
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None) or {}
+        try:
+            if headers.get("retry-after-ms"):
+                return float(headers["retry-after-ms"]) / 1000
+            if headers.get("retry-after"):
+                return float(headers["retry-after"])
+        except (TypeError, ValueError):
+            pass
+        return self.rate_limit_cooldown
+
+    def call(self, request: Callable[[Provider], object], tokens: int = 0, avoid=(),
+             cancelled: threading.Event = None) -> Tuple[object, Provider, float]:
+        """通过服务池发送一次请求，超时、连接错误、限流或服务端错误时切换端点重试，其他错误直接抛出
+
+        Args:
+            request: 接收端点并发送请求的函数
+            tokens: 请求的估算输入 tokens
+            avoid: 优先避开的端点（如对冲请求避开原始请求的端点），没有其他可用端点时仍会使用
+            cancelled: 取消标志，获取限流配额后已被设置时不再发送请求
+
+        Returns:
+            Tuple: (请求结果, 完成请求的端点, 限流等待秒数)
+        """
+        tried = set(avoid)
+        last_error = None
+        waited = 0.0
+        for _ in range(len(self.providers) * 2):
+            provider = self.choose(tokens, tried)
+            if provider is None and tried:
+                # 其他端点都不可用，允许再次尝试已失败但未熔断的端点
+                tried = set()
+                provider = self.choose(tokens)
+            if provider is None:
+                # 所有端点都在熔断中，等待最早恢复的端点
+                delay = self._next_recovery()
+                if delay is None:
+                    break
+                time.sleep(delay)
+                waited += delay
+                continue
+
+            waited += provider.rate_limiter.acquire(tokens)
+            if cancelled is not None and cancelled.is_set():
+                self.release(provider)
+                raise RequestCancelledError("请求已取消")
+            started = time.time()
+            try:
+                result = request(provider)
+            except Exception as e:
+                if not self.should_fail_over(e):
+                    # 请求本身的问题，不计入端点的失败
+                    self.release(provider)
+                    raise
+                self.record_failure(provider, e)
+                tried.add(provider)
+                last_error = e
+                continue
+            self.record_success(provider, time.time() - started)
+            return result, provider, waited
+
+        if last_error:
+            raise last_error
+        reasons = "; ".join(f"{p.label}: {p.fatal_reason}" for p in self.providers if p.fatal_reason)
+        raise Exception(f"没有可用的翻译服务 ({reasons})" if reasons else "没有可用的翻译服务")
+
+    def _next_recovery(self) -> Optional[float]:
+        """距离最早一个熔断端点恢复的秒数，所有端点都已永久熔断时返回 None"""
+        now = time.time()
+        with self._lock:
+            waits = [max(0.0, p.open_until - now) for p in self.providers if not p.fatal_reason]
+        return min(waits) + 0.01 if waits else None
+
+    def summary(self) -> List[Dict]:
+        """导出所有端点的状态"""
+        with self._lock:
+            return [provider.summary() for provider in self.providers]
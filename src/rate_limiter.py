@@ -0,0 +1,83 @@
+"""请求限流模块"""
+
+import threading
+import time
+from collections import deque
+
+
+class RateLimiter:
+    """按每分钟请求数（RPM）和每分钟 tokens 数（TPM）限流
+
+    使用 60 秒滑动窗口，超出限制时阻塞等待到窗口内最早的请求过期；限制为 0 表示不限制
+    """
+
+    WINDOW = 60.0
+
+    def __init__(self, rpm: int = 0, tpm: int = 0):
+        """初始化限流器
+
+        Args:
+            rpm: 每分钟最多请求数，0 表示不限制
+            tpm: 每分钟最多 tokens 数，0 表示不限制
+        """
+        self.rpm = rpm or 0
+        self.tpm = tpm or 0
+        self._lock = threading.Lock()
+        self._events = deque()  # [(时间, tokens)]
+        self._window_tokens = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.rpm or self.tpm)
+
+    def _expire(self, now: float):
+        while self._events and now - self._events[0][0] >= self.WINDOW:
+            _, tokens = self._events.popleft()
+            self._window_tokens -= tokens
+
+    def _delay_locked(self, now: float, tokens: int) -> float:
+        """计算当前还需等待的秒数，调用方需持有锁"""
+        self._expire(now)
+        within_rpm = not self.rpm or len(self._events) < self.rpm
+        within_tpm = not self.tpm or self._window_tokens + tokens <= self.tpm
+        if within_rpm and within_tpm:
+            return 0.0
+        return self.WINDOW - (now - self._events[0][0]) if self._events else 0.01
+
+    def wait_time(self, tokens: int = 0) -> float:
+        """不占用配额，返回现在发送一个请求需要等待的秒数"""
+        if not self.enabled:
+            return 0.0
+        if self.tpm:
+            tokens = min(tokens, self.tpm)
+        with self._lock:
+            return self._delay_locked(time.time(), tokens)
+
+    def acquire(self, tokens: int = 0) -> float:
+        """获取一次请求的配额，必要时等待
+
+        Args:
+            tokens: 本次请求的估算 tokens
+
+        Returns:
+            float: 等待的秒数
+        """
+        if not self.enabled:
+            return 0.0
+
+        # 单个请求超过 TPM 时只能独占整个窗口
+        if self.tpm:
+            tokens = min(tokens, self.tpm)
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.time()
+                delay = self._delay_locked(now, tokens)
+                if delay <= 0:
+                    self._events.append((now, tokens))
+                    self._window_tokens += tokens
+                    return waited
+            delay = max(0.01, delay)
+            time.sleep(delay)
+            waited += delay
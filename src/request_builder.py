@@ -0,0 +1,299 @@
+"""批次请求构建模块"""
+
+import json
+import re
+from typing import Dict, List
+
+from . import line_stream
+from .token_utils import TokenEstimator
+
+# 节点解析器为未命名输出生成的默认键名
+DEFAULT_OUTPUT_KEY = re.compile(r'output_\d+')
+
+SECTIONS = ("inputs", "widgets", "outputs")
+
+# 批次请求和响应的格式：JSON 对象，或每行一个 "编号<TAB>文本" 的逐行格式
+WIRE_FORMATS = ("json", "lines")
+
+# 响应中每个词条除译文外的格式开销（tokens）
+ENTRY_OVERHEAD = {"json": 4, "lines": 2}
+
+# 用户消息中标题和参数名两部分的标记，系统提示词中的标题规则针对"节点标题"部分
+TITLE_HEADER = "节点标题:"
+FIELD_HEADER = "参数名:"
+
+
+class BatchRequestBuilder:
+    """批次请求构建器
+
+    将一批节点中需要翻译的字符串去重并编号，生成紧凑的请求内容，
+    再把模型返回的译文映射回每一处出现的位置。标题和参数名分别去重，标题排在前面（编号 0..k-1），
+    在请求中单独列为"节点标题"部分，以便模型按标题规则翻译
+    """
+
+    def __init__(self, batch_nodes: Dict):
+        """初始化请求构建器
+
+        Args:
+            batch_nodes: 当前批次的节点信息
+        """
+        self.batch_nodes = batch_nodes
+        self.terms: List[str] = []        # 按编号排列的唯一原文，标题在前
+        self._title_ids: Dict[str, str] = {}  # 标题到编号的映射
+        self._term_ids: Dict[str, str] = {}   # 参数名到编号的映射
+
+        for node_info in batch_nodes.values():
+            self._add_term(node_info.get("title", ""), self._title_ids)
+        self.title_count = len(self.terms)
+        for node_info in batch_nodes.values():
+            for section in SECTIONS:
+                for key, value in node_info.get(section, {}).items():
+                    self._add_term(self.source_text(key, value), self._term_ids)
+
+    @staticmethod
+    def source_text(key: str, value) -> str:
+        """获取字段需要翻译的原文
+
+        字段键名即原文；只有解析器生成的默认输出键（output_0 等）使用值中的类型名
+
+        Args:
+            key: 字段键名
+            value: 字段值
+
+        Returns:
+            str: 需要翻译的原文
+        """
+        if isinstance(value, str) and value and DEFAULT_OUTPUT_KEY.fullmatch(key):
+            return value
+        return key
+
+    def _add_term(self, text: str, ids: Dict[str, str]):
+        """登记一个原文，同一类（标题或参数名）中重复的原文只保留一份"""
+        if text and text not in ids:
+            ids[text] = str(len(self.terms))
+            self.terms.append(text)
+
+    def term_id(self, text: str) -> str:
+        """获取参数名原文对应的编号"""
+        return self._term_ids.get(text)
+
+    def title_id(self, text: str) -> str:
+        """获取标题原文对应的编号"""
+        return self._title_ids.get(text)
+
+    def split_terms(self) -> tuple:
+        """按编号排列的 (标题原文列表, 参数名原文列表)"""
+        return self.terms[:self.title_count], self.terms[self.title_count:]
+
+    def build_payload(self) -> Dict[str, str]:
+        """生成编号到原文的请求内容"""
+        return {str(i): term for i, term in enumerate(self.terms)}
+
+    def _payload_parts(self) -> List[tuple]:
+        """请求内容按标题和参数名拆分为 [(标记, 编号到原文)]，没有标题时只有一部分且不加标记"""
+        payload = self.build_payload()
+        if not self.title_count:
+            return [("", payload)]
+        items = list(payload.items())
+        parts = [(TITLE_HEADER, dict(items[:self.title_count]))]
+        if len(items) > self.title_count:
+            parts.append((FIELD_HEADER, dict(items[self.title_count:])))
+        return parts
+
+    def build_user_message(self, wire_format: str = "json") -> str:
+        """生成发送给模型的用户消息
+
+        Args:
+            wire_format: 请求和响应的格式，json 或 lines
+        """
+        if wire_format == "lines":
+            lines = [
+                "请翻译以下词条（每行为 编号<TAB>英文原文），"
+                f"每行返回 编号<TAB>中文译文，全部词条之后单独输出一行 {line_stream.END_MARKER}:"
+            ]
+            for header, entries in self._payload_parts():
+                lines.extend([header, line_stream.encode(entries)] if header else [line_stream.encode(entries)])
+            return "\n".join(lines)
+
+        lines = ["请翻译以下词条（键为编号，值为英文原文），返回包含全部编号的一个 JSON 对象:"]
+        for header, entries in self._payload_parts():
+            payload = json.dumps(entries, ensure_ascii=False, separators=(',', ':'))
+            lines.extend([header, payload] if header else [payload])
+        return "\n".join(lines)
+
+    def build_legacy_message(self) -> str:
+        """生成旧版完整节点结构的用户消息，仅用于体积对比"""
+        return f"请翻译以下节点信息:\n{json.dumps(self.batch_nodes, indent=2, ensure_ascii=False)}"
+
+    def apply_translations(self, translations: Dict[str, str]) -> Dict:
+        """将编号译文映射回节点结构
+
+        没有返回译文的字段不会出现在结果中，交由后续的校验流程处理
+
+        Args:
+            translations: 模型返回的编号到译文的映射
+
+        Returns:
+            Dict: 与原始批次结构相同的翻译结果
+        """
+        translated_batch = {}
+
+        for node_name, node_info in self.batch_nodes.items():
+            translated_node = {}
+
+            title_id = self.title_id(node_info.get("title", ""))
+            if self.is_valid_value(translations.get(title_id)):
+                translated_node["title"] = translations[title_id]
+
+            for section in SECTIONS:
+                translated_node[section] = {}
+                for key, value in node_info.get(section, {}).items():
+                    term_id = self.term_id(self.source_text(key, value))
+                    if self.is_valid_value(translations.get(term_id)):
+                        translated_node[section][key] = translations[term_id]
+
+            translated_batch[node_name] = translated_node
+
+        return translated_batch
+
+    def node_term_ids(self) -> Dict[str, set]:
+        """获取每个节点需要的词条编号集合，用于流式接收时判断节点是否完整"""
+        node_ids = {}
+        for node_name, node_info in self.batch_nodes.items():
+            ids = set()
+            title_id = self.title_id(node_info.get("title", ""))
+            if title_id is not None:
+                ids.add(title_id)
+            for section in SECTIONS:
+                for key, value in node_info.get(section, {}).items():
+                    ids.add(self.term_id(self.source_text(key, value)))
+            node_ids[node_name] = ids
+        return node_ids
+
+    def remaining_batch(self, translations: Dict[str, str]) -> Dict:
+        """获取尚未得到有效译文的部分，结构与原始批次相同
+
+        完整收到的节点不再出现；标题已收到的节点其剩余部分的标题为空
+
+        Args:
+            translations: 已收到的编号到译文的映射
+
+        Returns:
+            Dict: 需要重新请求的节点（或节点的一部分）
+        """
+        def received(term_id):
+            return self.is_valid_value(translations.get(term_id))
+
+        remaining = {}
+        for node_name, node_info in self.batch_nodes.items():
+            title = node_info.get("title", "")
+            part = {
+                "title": "" if not title or received(self.title_id(title)) else title,
+                "inputs": {}, "widgets": {}, "outputs": {}
+            }
+            for section in SECTIONS:
+                for key, value in node_info.get(section, {}).items():
+                    if not received(self.term_id(self.source_text(key, value))):
+                        part[section][key] = value
+            if part["title"] or any(part[section] for section in SECTIONS):
+                remaining[node_name] = part
+        return remaining
+
+    @staticmethod
+    def is_valid_value(value) -> bool:
+        """检查译文是否为非空字符串"""
+        return isinstance(value, str) and bool(value.strip())
+
+    def estimate_tokens(self, system_prompt: str = "", wire_format: str = "json") -> Dict[str, int]:
+        """估算去重前后的请求和响应 tokens
+
+        Args:
+            system_prompt: 系统提示词
+            wire_format: 请求和响应的格式，json 或 lines
+
+        Returns:
+            Dict: 包含 legacy_input/legacy_output/input/output 的估算值
+        """
+        system_tokens = TokenEstimator.estimate(system_prompt)
+
+        # 旧格式的响应是完整的节点结构：去掉原文值后的骨架加上每个字段一份译文
+        skeleton = {}
+        legacy_output = 0
+        for node_name, node_info in self.batch_nodes.items():
+            skeleton[node_name] = {"title": ""}
+            legacy_output += TokenEstimator.estimate_translation(node_info.get("title", ""))
+            for section in SECTIONS:
+                skeleton[node_name][section] = {}
+                for key, value in node_info.get(section, {}).items():
+                    skeleton[node_name][section][key] = ""
+                    legacy_output += TokenEstimator.estimate_translation(self.source_text(key, value))
+        legacy_output += TokenEstimator.estimate(json.dumps(skeleton, indent=2, ensure_ascii=False))
+
+        overhead = ENTRY_OVERHEAD.get(wire_format, ENTRY_OVERHEAD["json"])
+        output = sum(TokenEstimator.estimate_translation(term) + overhead for term in self.terms)
+
+        return {
+            "legacy_input": system_tokens + TokenEstimator.estimate(self.build_legacy_message()),
+            "legacy_output": legacy_output,
+            "input": system_tokens + TokenEstimator.estimate(self.build_user_message(wire_format)),
+            "output": output
+        }
+
+
+class RepairRequestBuilder:
+    """缺失字段补译请求构建器
+
+    汇总整个运行中缺失或无效的字段，附带所属节点标题作为上下文，
+    生成一个小的补译请求，并将译文对应回每个缺失位置
+    """
+
+    def __init__(self, gaps: List[Dict]):
+        """初始化补译请求构建器
+
+        Args:
+            gaps: 缺失字段列表，每项包含 node_name/section/key/source/node_title，
+                  section 为 "title" 时表示节点标题缺失
+        """
+        self.gaps = gaps
+        self.entries: List[Dict[str, str]] = []   # 按编号排列的 {原文, 节点}，标题另有 {"类型": "节点标题"}
+        self._entry_ids: Dict[tuple, str] = {}
+        self._gap_ids: List[str] = []
+
+        for gap in gaps:
+            is_title = gap["section"] == "title"
+            entry_key = (gap["source"], gap["node_title"], is_title)
+            if entry_key not in self._entry_ids:
+                self._entry_ids[entry_key] = str(len(self.entries))
+                entry = {"原文": gap["source"], "节点": gap["node_title"]}
+                if is_title:
+                    entry["类型"] = "节点标题"
+                self.entries.append(entry)
+            self._gap_ids.append(self._entry_ids[entry_key])
+
+    def build_user_message(self) -> str:
+        """生成发送给模型的用户消息"""
+        payload = json.dumps(
+            {str(i): entry for i, entry in enumerate(self.entries)},
+            ensure_ascii=False, separators=(',', ':')
+        )
+        return (
+            "以下词条在之前的翻译中缺失，请结合所属节点翻译\"原文\"（类型为节点标题的按节点标题规则翻译），"
+            "返回编号到中文译文的 JSON 对象（值为字符串）:\n"
+            f"{payload}"
+        )
+
+    def apply_translations(self, translations: Dict[str, str]) -> List[tuple]:
+        """将编号译文对应回缺失位置
+
+        Args:
+            translations: 模型返回的编号到译文的映射
+
+        Returns:
+            List[tuple]: 得到有效译文的 (缺失字段, 译文) 列表
+        """
+        repaired = []
+        for gap, entry_id in zip(self.gaps, self._gap_ids):
+            value = translations.get(entry_id)
+            if BatchRequestBuilder.is_valid_value(value):
+                repaired.append((gap, value))
+        return repaired
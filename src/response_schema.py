@@ -0,0 +1,140 @@
+"""结构化输出的 JSON Schema 生成与本地校验模块"""
+
+import re
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 支持的响应格式：text 为普通文本（从回复中提取 JSON），其余为服务商的结构化输出
+RESPONSE_FORMATS = ("text", "json_object", "json_schema")
+
+
+def build_schema(term_count: int) -> Dict:
+    """生成批次响应的 JSON Schema：编号 0..n-1 都必须出现且为非空字符串，不允许其他键
+
+    Args:
+        term_count: 批次中的词条数量
+
+    Returns:
+        Dict: JSON Schema
+    """
+    ids = [str(i) for i in range(term_count)]
+    return {
+        "type": "object",
+        "properties": {term_id: {"type": "string", "minLength": 1} for term_id in ids},
+        "required": ids,
+        "additionalProperties": False
+    }
+
+
+def build_response_format(response_format: str, term_count: int) -> Dict:
+    """生成请求的 response_format 参数
+
+    Args:
+        response_format: 响应格式（RESPONSE_FORMATS 之一）
+        term_count: 批次中的词条数量
+
+    Returns:
+        Dict: 请求的 response_format
+    """
+    if response_format == "json_schema":
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": "translations", "strict": True, "schema": build_schema(term_count)}
+        }
+    return {"type": response_format}
+
+
+class SchemaValidator:
+    """预编译的 JSON Schema 校验器
+
+    只支持批次响应用到的子集（object/string、properties、required、additionalProperties、
+    minLength、pattern），构造时把 Schema 编译为检查函数，校验时对响应只遍历一次；
+    结果中保留通过校验的键值，其余记为错误，不因个别词条不合格丢弃整个响应
+    """
+
+    _cache: Dict[int, "SchemaValidator"] = {}
+    _cache_lock = threading.Lock()
+
+    def __init__(self, schema: Dict):
+        """编译 Schema
+
+        Args:
+            schema: 顶层为 object 的 JSON Schema
+        """
+        if schema.get("type") != "object":
+            raise ValueError("只支持顶层为 object 的 Schema")
+        self.schema = schema
+        self._properties = {
+            key: self._compile(sub_schema) for key, sub_schema in schema.get("properties", {}).items()
+        }
+        self._required = frozenset(schema.get("required", ()))
+        self._additional = schema.get("additionalProperties", True) is not False
+
+    @classmethod
+    def for_terms(cls, term_count: int) -> "SchemaValidator":
+        """获取 n 个词条的批次响应校验器，相同词条数量的批次共用同一个已编译的校验器"""
+        with cls._cache_lock:
+            validator = cls._cache.get(term_count)
+            if validator is None:
+                validator = cls._cache[term_count] = cls(build_schema(term_count))
+            return validator
+
+    @staticmethod
+    def _compile(schema: Dict) -> Callable[[object], Optional[str]]:
+        """将字段的 Schema 编译为检查函数，合格时返回 None，否则返回错误说明"""
+        checks = []
+        expected_type = schema.get("type")
+        if expected_type == "string":
+            checks.append(lambda v: None if isinstance(v, str) else "不是字符串")
+        elif expected_type == "object":
+            checks.append(lambda v: None if isinstance(v, dict) else "不是对象")
+        elif expected_type is not None:
+            raise ValueError(f"不支持的类型: {expected_type}")
+
+        min_length = schema.get("minLength")
+        if min_length:
+            checks.append(lambda v: None if len(v.strip()) >= min_length else "内容为空")
+        pattern = schema.get("pattern")
+        if pattern:
+            compiled = re.compile(pattern)
+            checks.append(lambda v: None if compiled.search(v) else "格式不符合")
+
+        def check(value) -> Optional[str]:
+            for item in checks:
+                error = item(value)
+                if error:
+                    return error
+            return None
+        return check
+
+    def validate(self, instance) -> Tuple[Dict, List[str]]:
+        """校验响应对象
+
+        Args:
+            instance: 解析后的响应
+
+        Returns:
+            Tuple[Dict, List[str]]: (通过校验的键值, 错误说明列表)
+        """
+        if not isinstance(instance, dict):
+            return {}, ["响应不是 JSON 对象"]
+
+        valid = {}
+        errors = []
+        for key, value in instance.items():
+            check = self._properties.get(key)
+            if check is None:
+                if not self._additional:
+                    errors.append(f"多余的键 {key}")
+                    continue
+                valid[key] = value
+                continue
+            error = check(value)
+            if error:
+                errors.append(f"{key} {error}")
+            else:
+                valid[key] = value
+
+        missing = self._required.difference(instance)
+        errors.extend(f"缺少键 {key}" for key in sorted(missing, key=lambda k: (len(k), k)))
+        return valid, errors
@@ -0,0 +1,176 @@
+"""基于规则的键名预翻译模块"""
+
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from .request_builder import BatchRequestBuilder, SECTIONS
+from .translation_config import TranslationConfig
+
+# 键名中的分隔符（下划线、连字符、空格、点等）
+_SEPARATOR = re.compile(r'[^A-Za-z0-9]+')
+
+# camelCase 拆词：连续大写缩写、首字母大写的单词、小写单词、数字
+_CAMEL_WORD = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+')
+
+
+class RuleTranslator:
+    """基于术语表的键名翻译器
+
+    将 snake_case / camelCase 键名拆分为词，优先匹配多词短语，其余逐词按术语表翻译后拼接；
+    支持数字后缀（image_1 -> 图像_1）和人体部位的方向前缀/后缀（l_eye -> 左眼睛）。
+    只有每个词都能翻译的键名才在本地完成，其余返回 None 交给模型翻译
+    """
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, terms: Dict[str, str] = None, phrases: Dict[str, str] = None):
+        """初始化规则翻译器
+
+        Args:
+            terms: 单词术语表，为空时使用 TranslationConfig 中的通用翻译、术语和人体部位
+            phrases: 多词短语表（以下划线连接），为空时使用 TranslationConfig 中的短语和多词人体部位
+        """
+        if terms is None:
+            terms = {
+                **TranslationConfig.TERM_TRANSLATIONS,
+                **TranslationConfig.COMMON_TRANSLATIONS,
+                **{k: v for k, v in TranslationConfig.BODY_PART_TRANSLATIONS.items() if '_' not in k}
+            }
+        if phrases is None:
+            phrases = {
+                **TranslationConfig.PHRASE_TRANSLATIONS,
+                **{k: v for k, v in TranslationConfig.BODY_PART_TRANSLATIONS.items() if '_' in k}
+            }
+
+        self.terms = {k.lower(): v for k, v in terms.items()}
+        self.phrases = {tuple(k.lower().split('_')): v for k, v in phrases.items()}
+        self.max_phrase = max((len(words) for words in self.phrases), default=1)
+        self.body_parts = {k for k in TranslationConfig.BODY_PART_TRANSLATIONS if '_' not in k}
+
+        # 方向只与人体部位组合使用，如 l_eye、eye_l
+        self.direction_prefixes = {
+            k.rstrip('_'): v for k, v in TranslationConfig.DIRECTION_TRANSLATIONS.items() if k.endswith('_')
+        }
+        self.direction_suffixes = {
+            k.lstrip('_'): v for k, v in TranslationConfig.DIRECTION_TRANSLATIONS.items() if k.startswith('_')
+        }
+        self._cache: Dict[str, Optional[str]] = {}
+
+    @classmethod
+    def default(cls) -> "RuleTranslator":
+        """进程内共用的默认规则翻译器"""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def tokenize(self, key: str) -> List[str]:
+        """将键名拆分为小写单词和数字
+
+        按分隔符拆分后，整段是已知术语的不再按大小写拆分（如 IPAdapter、ControlNet）
+        """
+        tokens = []
+        for piece in _SEPARATOR.split(key):
+            if not piece:
+                continue
+            if piece.lower() in self.terms:
+                tokens.append(piece.lower())
+            else:
+                tokens.extend(word.lower() for word in _CAMEL_WORD.findall(piece))
+        return tokens
+
+    def translate(self, key: str) -> Optional[str]:
+        """翻译一个键名，无法完全覆盖时返回 None"""
+        if key not in self._cache:
+            self._cache[key] = self._translate(key)
+        return self._cache[key]
+
+    def split_nodes(self, nodes_info: Dict) -> Tuple[Dict, Dict]:
+        """拆出能由本地规则完整翻译的字段
+
+        节点标题需要调整语序，始终保留给模型；只剩标题的节点仍需请求，标题为空且字段全部完成的节点不再请求
+
+        Args:
+            nodes_info: 节点信息字典
+
+        Returns:
+            Tuple[Dict, Dict]: (需要模型翻译的节点, 本地翻译结果)
+        """
+        request_nodes = {}
+        local_nodes = {}
+        for node_name, node_info in nodes_info.items():
+            part = {"title": node_info.get("title", ""), "inputs": {}, "widgets": {}, "outputs": {}}
+            done = {"inputs": {}, "widgets": {}, "outputs": {}}
+            for section in SECTIONS:
+                for key, value in node_info.get(section, {}).items():
+                    translation = self.translate(BatchRequestBuilder.source_text(key, value))
+                    if translation is None:
+                        part[section][key] = value
+                    else:
+                        done[section][key] = translation
+            if any(done[section] for section in SECTIONS):
+                local_nodes[node_name] = done
+            if part["title"] or any(part[section] for section in SECTIONS):
+                request_nodes[node_name] = part
+        return request_nodes, local_nodes
+
+    def _translate(self, key: str) -> Optional[str]:
+        if not key:
+            return None
+        if TranslationConfig.should_preserve_key(key):
+            return key
+
+        tokens = self.tokenize(key)
+        if not tokens:
+            return None
+
+        # 末尾的数字编号，如 image_1、image2 -> 图像_1、图像_2
+        number = None
+        if len(tokens) > 1 and tokens[-1].isdigit():
+            number = tokens.pop()
+
+        # 人体部位的方向前缀/后缀
+        direction = None
+        if len(tokens) == 2 and tokens[0] in self.direction_prefixes and tokens[1] in self.body_parts:
+            direction = self.direction_prefixes[tokens[0]]
+            tokens = tokens[1:]
+        elif len(tokens) == 2 and tokens[1] in self.direction_suffixes and tokens[0] in self.body_parts:
+            direction = self.direction_suffixes[tokens[1]]
+            tokens = tokens[:1]
+
+        words = self._translate_tokens(tokens)
+        if words is None:
+            return None
+
+        result = ""
+        for word in words:
+            # 相邻的两个英文术语之间保留空格，如 CLIP VAE
+            if result and result[-1].isascii() and result[-1].isalnum() and word[0].isascii() and word[0].isalnum():
+                result += " "
+            result += word
+        if direction:
+            result = direction + result
+        if number is not None:
+            result += f"_{number}"
+        return result
+
+    def _translate_tokens(self, tokens: List[str]) -> Optional[List[str]]:
+        """按最长短语优先逐词翻译，任一词无法翻译时返回 None"""
+        words = []
+        i = 0
+        while i < len(tokens):
+            for length in range(min(self.max_phrase, len(tokens) - i), 1, -1):
+                phrase = tuple(tokens[i:i + length])
+                if phrase in self.phrases:
+                    words.append(self.phrases[phrase])
+                    i += length
+                    break
+            else:
+                word = self.terms.get(tokens[i])
+                if word is None:
+                    return None
+                words.append(word)
+                i += 1
+        return words
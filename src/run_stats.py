@@ -0,0 +1,229 @@
+"""翻译运行统计模块"""
+
+import threading
+from typing import Dict
+
+
+class RunStats:
+    """单次翻译运行的统计信息
+
+    记录请求次数、tokens 使用量以及截断和拆分重试等事件，供日志输出和批次调优使用
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+        self.requests = 0                  # API 请求次数
+        self.prompt_tokens = 0             # 输入 tokens
+        self.completion_tokens = 0         # 输出 tokens
+        self.total_tokens = 0              # 总 tokens
+        self.prompt_cost = 0.0             # 按实际使用的服务价格计算的费用
+        self.completion_cost = 0.0
+
+        # 请求体积估算（旧版完整结构 / 去重词条）
+        self.estimated_legacy_tokens = 0
+        self.estimated_compact_tokens = 0
+        self.estimated_input_tokens = 0    # 去重词条请求的估算输入，用于校准费用预估
+        self.estimated_output_tokens = 0
+
+        # 响应截断与拆分重试
+        self.truncations = 0
+        self.bisections = 0
+        self.truncated_batches = []        # 被截断批次的规模，用于调整 tokens 目标
+
+        # 批次耗时（秒）和整个运行的耗时
+        self.batch_latencies = []
+        self.wall_time = 0.0
+
+        # 限流等待的总时间（秒）
+        self.rate_limit_wait = 0.0
+
+        # 各模型梯队的节点数、请求数、tokens 和费用
+        self.tiers = {}
+
+        # 对冲请求：发出次数、先于原请求完成的次数、未被采用的请求消耗的 tokens
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.hedge_extra_tokens = 0
+
+        # 流式连接中断或截断后只重新请求剩余部分的次数
+        self.stream_resumes = 0
+
+        # 响应解析：被跳过的格式错误词条数，以及整个响应无法解析的次数
+        self.parse_errors = 0
+        self.parse_failures = 0
+        self.schema_violations = 0         # 不符合响应 Schema（缺失、多余、为空）的词条数
+
+        # 批次校验
+        self.untranslated_fields = 0       # 译文仍为英文的字段数
+        self.key_repairs = 0               # 被翻译成中文后还原的键名数
+
+        # 提示词说明（固定规则 + 术语表）的估算 tokens（实际发送的 / 附带完整术语表时），按请求累计
+        self.system_prompt_tokens = 0
+        self.full_system_prompt_tokens = 0
+
+        # 服务商上下文缓存：命中缓存的输入 tokens（来自 usage.prompt_tokens_details）
+        self.cached_tokens = 0
+
+        # 本地规则预翻译
+        self.pretranslate_fields = 0       # 参与预翻译的字段数
+        self.pretranslated_fields = 0      # 在本地完成翻译的字段数
+        self.pretranslate_saved_tokens = 0 # 不再发送给模型的估算 tokens
+
+        # 从已有翻译仓库的索引中沿用的标题和字段数
+        self.index_titles = 0
+        self.index_fields = 0
+
+        # 模糊翻译记忆：直接沿用的标题和字段数，请求中附带的参考译文条数（按请求累计）
+        self.memory_autofilled = 0
+        self.memory_examples = 0
+
+        # 增量翻译：与已有翻译文件的字段级差异（NodeDiffer.translation_delta 的统计），未启用时为空
+        self.incremental = {}
+
+        # 缺失字段补译
+        self.repair_fields = 0             # 需要补译的字段数
+        self.repaired_fields = 0           # 成功补译的字段数
+        self.repair_requests = 0           # 补译请求次数
+
+    def add_usage(self, prompt_tokens: int, completion_tokens: int, total_tokens: int = None):
+        """累计一次请求的 tokens 使用量"""
+        with self._lock:
+            self.prompt_tokens += prompt_tokens or 0
+            self.completion_tokens += completion_tokens or 0
+            if total_tokens is None:
+                total_tokens = (prompt_tokens or 0) + (completion_tokens or 0)
+            self.total_tokens += total_tokens
+
+    def add_cost(self, prompt_cost: float, completion_cost: float):
+        """累计一次请求的费用"""
+        with self._lock:
+            self.prompt_cost += prompt_cost
+            self.completion_cost += completion_cost
+
+    def add_estimate(self, legacy_tokens: int, compact_tokens: int,
+                     input_tokens: int = 0, output_tokens: int = 0):
+        """累计一个批次的请求体积估算"""
+        with self._lock:
+            self.estimated_legacy_tokens += legacy_tokens
+            self.estimated_compact_tokens += compact_tokens
+            self.estimated_input_tokens += input_tokens
+            self.estimated_output_tokens += output_tokens
+
+    def add_tier(self, tier: int, **amounts):
+        """累计模型梯队的统计（batches、nodes、escalated_nodes、requests、tokens、cost）"""
+        with self._lock:
+            stats = self.tiers.setdefault(tier, {
+                "batches": 0, "nodes": 0, "escalated_nodes": 0, "requests": 0,
+                "prompt_tokens": 0, "completion_tokens": 0, "cost": 0.0
+            })
+            for name, amount in amounts.items():
+                stats[name] += amount
+
+    def tier_summary(self) -> Dict[int, Dict]:
+        """导出各模型梯队的统计"""
+        with self._lock:
+            return {tier: dict(stats) for tier, stats in self.tiers.items()}
+
+    def increment(self, name: str, amount: int = 1):
+        """累加一个计数器"""
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def record_truncation(self, node_count: int, term_count: int, estimated_output: int):
+        """记录一次响应截断
+
+        Args:
+            node_count: 批次中的节点数
+            term_count: 批次中的唯一词条数
+            estimated_output: 批次的估算输出 tokens
+        """
+        with self._lock:
+            self.truncations += 1
+            self.truncated_batches.append({
+                "nodes": node_count,
+                "terms": term_count,
+                "estimated_output_tokens": estimated_output
+            })
+
+    def record_batch_latency(self, seconds: float):
+        """记录一个批次从请求到校验完成的耗时"""
+        with self._lock:
+            self.batch_latencies.append(seconds)
+
+    def latency_percentile(self, percent: float) -> float:
+        """获取批次耗时的百分位数（秒），没有记录时返回 0"""
+        with self._lock:
+            latencies = sorted(self.batch_latencies)
+        if not latencies:
+            return 0.0
+        index = min(len(latencies) - 1, max(0, int(round(percent / 100 * len(latencies))) - 1))
+        return latencies[index]
+
+    def suggested_token_target(self, current_target: int, max_completion_tokens: int) -> int:
+        """根据被截断批次给出建议的 tokens 目标，没有截断时返回当前值
+
+        被截断批次的实际输出已达到 max_completion_tokens，
+        其估算输出与上限之比反映了估算偏低的程度，按该比例缩小目标并留 10% 余量
+
+        Args:
+            current_target: 当前每批 tokens 目标
+            max_completion_tokens: 单次请求的输出 tokens 上限
+        """
+        with self._lock:
+            if not self.truncated_batches:
+                return current_target
+            smallest = min(b["estimated_output_tokens"] for b in self.truncated_batches)
+        ratio = min(1.0, smallest / max_completion_tokens) if max_completion_tokens else 1.0
+        return max(200, int(current_target * ratio * 0.9))
+
+    def summary(self) -> Dict:
+        """导出统计信息"""
+        p50 = self.latency_percentile(50)
+        p95 = self.latency_percentile(95)
+        with self._lock:
+            return {
+                "wall_time": round(self.wall_time, 3),
+                "batches": len(self.batch_latencies),
+                "batch_latency_p50": round(p50, 3),
+                "batch_latency_p95": round(p95, 3),
+                "batch_latency_sum": round(sum(self.batch_latencies), 3),
+                "requests": self.requests,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "total_tokens": self.total_tokens,
+                "prompt_cost": round(self.prompt_cost, 6),
+                "completion_cost": round(self.completion_cost, 6),
+                "estimated_legacy_tokens": self.estimated_legacy_tokens,
+                "estimated_compact_tokens": self.estimated_compact_tokens,
+                "estimated_input_tokens": self.estimated_input_tokens,
+                "estimated_output_tokens": self.estimated_output_tokens,
+                "rate_limit_wait": round(self.rate_limit_wait, 3),
+                "truncations": self.truncations,
+                "bisections": self.bisections,
+                "stream_resumes": self.stream_resumes,
+                "parse_errors": self.parse_errors,
+                "parse_failures": self.parse_failures,
+                "schema_violations": self.schema_violations,
+                "untranslated_fields": self.untranslated_fields,
+                "key_repairs": self.key_repairs,
+                "tiers": {str(tier): dict(stats) for tier, stats in self.tiers.items()},
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "hedge_extra_tokens": self.hedge_extra_tokens,
+                "truncated_batches": list(self.truncated_batches),
+                "system_prompt_tokens": self.system_prompt_tokens,
+                "full_system_prompt_tokens": self.full_system_prompt_tokens,
+                "cached_tokens": self.cached_tokens,
+                "pretranslate_fields": self.pretranslate_fields,
+                "pretranslated_fields": self.pretranslated_fields,
+                "pretranslate_saved_tokens": self.pretranslate_saved_tokens,
+                "index_titles": self.index_titles,
+                "index_fields": self.index_fields,
+                "memory_autofilled": self.memory_autofilled,
+                "memory_examples": self.memory_examples,
+                "incremental": dict(self.incremental),
+                "repair_fields": self.repair_fields,
+                "repaired_fields": self.repaired_fields,
+                "repair_requests": self.repair_requests
+            }
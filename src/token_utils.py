@@ -0,0 +1,58 @@
+"""tokens 估算工具"""
+
+import math
+import re
+
+# 中日韩统一表意文字
+CJK_PATTERN = re.compile(r'[\u4e00-\u9fff]')
+
+# 英文单词、驼峰片段和数字
+WORD_PATTERN = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+')
+
+
+class TokenEstimator:
+    """tokens 数量估算器
+
+    不依赖具体模型的分词器，按字符类别粗略估算 tokens 数量，
+    用于请求体积统计和批次规划
+    """
+
+    # 每个汉字约占的 tokens
+    CJK_TOKENS_PER_CHAR = 0.7
+
+    # 每个 tokens 约包含的非汉字字符数
+    ASCII_CHARS_PER_TOKEN = 3.5
+
+    # 英文单词翻译成中文后平均的汉字数
+    CJK_CHARS_PER_WORD = 2
+
+    @classmethod
+    def estimate(cls, text: str) -> int:
+        """估算文本的 tokens 数量
+
+        Args:
+            text: 要估算的文本
+
+        Returns:
+            int: 估算的 tokens 数量
+        """
+        if not text:
+            return 0
+
+        cjk_count = len(CJK_PATTERN.findall(text))
+        other_count = len(text) - cjk_count
+        tokens = cjk_count * cls.CJK_TOKENS_PER_CHAR + other_count / cls.ASCII_CHARS_PER_TOKEN
+        return max(1, math.ceil(tokens))
+
+    @classmethod
+    def estimate_translation(cls, source: str) -> int:
+        """估算英文原文翻译成中文后的 tokens 数量
+
+        Args:
+            source: 英文原文
+
+        Returns:
+            int: 估算的译文 tokens 数量
+        """
+        word_count = len(WORD_PATTERN.findall(source or ""))
+        return max(1, math.ceil(word_count * cls.CJK_CHARS_PER_WORD * cls.CJK_TOKENS_PER_CHAR))
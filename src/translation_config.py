@@ -95,6 +95,111 @@ class TranslationConfig:
         'result': '结果'
     }
     
+    # 键名逐词翻译使用的术语表，与提示词中的标准翻译保持一致
+    TERM_TRANSLATIONS = {
+        'value': '值',
+        'strength': '强度',
+        'weight': '权重',
+        'weights': '权重',
+        'mode': '模式',
+        'type': '类型',
+        'range': '范围',
+        'step': '步进',
+        'steps': '步数',
+        'flow': '流',
+        'boolean': '布尔',
+        'optional': '可选',
+        'pipe': '节点束',
+        'embed': '嵌入组',
+        'embeds': '嵌入组',
+        'params': '参数组',
+        'preset': '预设',
+        'provider': '设备',
+        'boost': '增强',
+        'combine': '合并',
+        'batch': '批次',
+        'text': '文本',
+        'string': '字符串',
+        'positive': '正面',
+        'negative': '负面',
+        'scaling': '缩放',
+        'vision': '视觉',
+        'attn': '关注层',
+        'start': '开始',
+        'end': '结束',
+        'blur': '模糊',
+        'seed': '种子',
+        'width': '宽度',
+        'height': '高度',
+        'sampler': '采样器',
+        'scheduler': '调度器',
+        'denoise': '降噪',
+        'noise': '噪波',
+        'conditioning': '条件',
+        'prompt': '提示词',
+        'offset': '偏移',
+        'color': '颜色',
+        'channel': '通道',
+        'frame': '帧',
+        'frames': '帧',
+        'blend': '混合',
+        'feather': '羽化',
+        'invert': '反转',
+        'crop': '裁剪',
+        'method': '方法',
+        'upscale': '放大',
+        'padding': '填充',
+        'font': '字体',
+        'input': '输入',
+        'output': '输出',
+        'enabled': '启用',
+        'max': '最大',
+        'min': '最小',
+        'name': '名称',
+        'path': '路径',
+        'file': '文件',
+        'filename': '文件名',
+        'format': '格式',
+        'quality': '质量',
+        'factor': '系数',
+        'amount': '数量',
+        'level': '级别',
+        'ratio': '比例',
+        'angle': '角度',
+        'opacity': '不透明度',
+        'depth': '深度',
+        'face': '面部',
+        'detail': '细节',
+        'initial': '初始',
+        'left': '左',
+        'right': '右',
+        'top': '上',
+        'bottom': '下',
+        # AI/ML 专业术语保持原样
+        'clip': 'CLIP',
+        'vae': 'VAE',
+        'lora': 'LoRA',
+        'cfg': 'CFG',
+        'unet': 'UNet',
+        'latent': 'Latent',
+        'ipadapter': 'IPAdapter',
+        'controlnet': 'ControlNet',
+        'sdxl': 'SDXL',
+        'sigma': 'sigma',
+        'sigmas': 'sigmas',
+        'tensor': 'Tensor'
+    }
+    
+    # 需要整体翻译的多词键名，优先于逐词翻译
+    PHRASE_TRANSLATIONS = {
+        'start_at': '开始位置',
+        'end_at': '结束位置',
+        'clip_vision': 'CLIP视觉',
+        'attn_mask': '关注层遮罩',
+        'frame_rate': '帧率',
+        'batch_size': '批次大小'
+    }
+    
     # 人体部位翻译映射
     BODY_PART_TRANSLATIONS = {
         'background': '背景',
@@ -148,14 +253,10 @@ class TranslationConfig:
         if text in cls.BODY_PART_TRANSLATIONS:
             return cls.BODY_PART_TRANSLATIONS[text]
             
-        # 4. 检查是否包含方向前缀/后缀
-        for prefix, direction in cls.DIRECTION_TRANSLATIONS.items():
-            if text.startswith(prefix) or text.endswith(prefix):
-                base = text.replace(prefix, '')
-                if base in cls.BODY_PART_TRANSLATIONS:
-                    return f"{direction}{cls.BODY_PART_TRANSLATIONS[base]}"
-                    
-        return text
+        # 4. 按词拆分键名后逐词翻译（包括方向前缀/后缀和数字后缀）
+        from .rule_translator import RuleTranslator
+        translation = RuleTranslator.default().translate(text)
+        return text if translation is None else translation
     
     @classmethod
     def should_preserve_key(cls, key: str) -> bool:
@@ -0,0 +1,229 @@
+"""已有翻译仓库的索引模块"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from .node_diff import NodeDiffer
+from .request_builder import SECTIONS
+
+# 按键名索引的字段；输出的键名是位置编号（output_0），与原文无关，不按键名索引
+FIELD_SECTIONS = ("inputs", "widgets")
+# 查询时同样排除输出，旧版本建立的索引中可能仍有输出字段
+_FIELD_FILTER = "section IN ({})".format(", ".join(str(SECTIONS.index(section)) for section in FIELD_SECTIONS))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS nodes (
+    file_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    normalized TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS nodes_name ON nodes (name);
+CREATE INDEX IF NOT EXISTS nodes_normalized ON nodes (normalized);
+CREATE INDEX IF NOT EXISTS nodes_file ON nodes (file_id);
+CREATE TABLE IF NOT EXISTS fields (
+    file_id INTEGER NOT NULL,
+    section INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    translation TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS fields_key ON fields (key, section, translation);
+CREATE INDEX IF NOT EXISTS fields_file ON fields (file_id);
+"""
+
+
+class TranslationIndex:
+    """已有翻译仓库（如 AIGODLIKE-ComfyUI-Translation 的 zh-CN/Nodes）的 SQLite 索引
+
+    每个节点文件只在新增或修改（修改时间、大小变化）时重新读取，按节点名、规范化的节点名
+    和字段键名建立索引；翻译前先查询索引，沿用已有的人工校对译文
+    """
+
+    def __init__(self, index_path: str):
+        """打开或创建索引
+
+        Args:
+            index_path: 索引数据库文件路径
+        """
+        self.index_path = index_path
+        os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+        self._conn = sqlite3.connect(index_path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._field_cache: Dict[tuple, Optional[str]] = {}
+
+    @staticmethod
+    def nodes_dir(repo_dir: str) -> str:
+        """翻译仓库中节点翻译文件所在的文件夹，repo_dir 本身即为该文件夹时直接返回"""
+        nodes_dir = os.path.join(repo_dir, "zh-CN", "Nodes")
+        return nodes_dir if os.path.isdir(nodes_dir) else repo_dir
+
+    @staticmethod
+    def normalize(node_name: str) -> str:
+        """节点名的规范化形式（去掉标点和空格差异，不区分大小写）"""
+        return NodeDiffer._get_base_name(node_name).lower()
+
+    def update(self, nodes_dir: str) -> Dict:
+        """按文件修改时间增量更新索引
+
+        Args:
+            nodes_dir: 节点翻译文件所在的文件夹
+
+        Returns:
+            Dict: 新增、更新、删除、未变化和读取失败的文件数，以及耗时（秒）
+        """
+        started = time.time()
+        result = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0, "failed": 0}
+        current = {}
+        with os.scandir(nodes_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    current[entry.path] = (stat.st_mtime, stat.st_size)
+
+        with self._lock, self._conn:
+            known = {
+                path: (file_id, mtime, size)
+                for file_id, path, mtime, size in self._conn.execute("SELECT id, path, mtime, size FROM files")
+            }
+            for path, (file_id, _, _) in known.items():
+                if path not in current:
+                    self._remove_file(file_id)
+                    result["removed"] += 1
+
+            for path, (mtime, size) in current.items():
+                file_id, old_mtime, old_size = known.get(path, (None, None, None))
+                if file_id is not None and old_mtime == mtime and old_size == size:
+                    result["unchanged"] += 1
+                    continue
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                    if not isinstance(data, dict):
+                        raise ValueError("顶层不是 JSON 对象")
+                except Exception:
+                    result["failed"] += 1
+                    continue
+
+                if file_id is None:
+                    file_id = self._conn.execute(
+                        "INSERT INTO files (path, mtime, size) VALUES (?, ?, ?)", (path, mtime, size)
+                    ).lastrowid
+                    result["added"] += 1
+                else:
+                    self._remove_file(file_id, keep_file=True)
+                    self._conn.execute("UPDATE files SET mtime = ?, size = ? WHERE id = ?", (mtime, size, file_id))
+                    result["updated"] += 1
+                self._insert_file(file_id, data)
+
+            if result["added"] or result["updated"] or result["removed"]:
+                self._field_cache.clear()
+        result["seconds"] = round(time.time() - started, 3)
+        return result
+
+    def _remove_file(self, file_id: int, keep_file: bool = False):
+        self._conn.execute("DELETE FROM nodes WHERE file_id = ?", (file_id,))
+        self._conn.execute("DELETE FROM fields WHERE file_id = ?", (file_id,))
+        if not keep_file:
+            self._conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def _insert_file(self, file_id: int, data: Dict):
+        """写入一个翻译文件的节点和字段"""
+        node_rows, field_rows = [], []
+        for node_name, node_info in data.items():
+            if not isinstance(node_info, dict):
+                continue
+            node_rows.append((
+                file_id, node_name, self.normalize(node_name), json.dumps(node_info, ensure_ascii=False)
+            ))
+            for section in FIELD_SECTIONS:
+                section_info = node_info.get(section)
+                if not isinstance(section_info, dict):
+                    continue
+                for key, translation in section_info.items():
+                    if isinstance(translation, str) and translation.strip():
+                        field_rows.append((file_id, SECTIONS.index(section), key, translation))
+        self._conn.executemany("INSERT INTO nodes (file_id, name, normalized, data) VALUES (?, ?, ?, ?)", node_rows)
+        self._conn.executemany(
+            "INSERT INTO fields (file_id, section, key, translation) VALUES (?, ?, ?, ?)", field_rows
+        )
+
+    def lookup_node(self, node_name: str) -> Optional[Dict]:
+        """按节点名查询已有译文，没有同名节点时按规范化的节点名查询
+
+        多个文件包含该节点时使用最近修改的文件
+
+        Returns:
+            Optional[Dict]: 节点译文（title、inputs、widgets、outputs），没有时返回 None
+        """
+        query = (
+            "SELECT nodes.data FROM nodes JOIN files ON files.id = nodes.file_id "
+            "WHERE nodes.{} = ? ORDER BY files.mtime DESC LIMIT 1"
+        )
+        with self._lock:
+            row = self._conn.execute(query.format("name"), (node_name,)).fetchone()
+            if row is None:
+                row = self._conn.execute(query.format("normalized"), (self.normalize(node_name),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def lookup_field(self, section: str, key: str) -> Optional[str]:
+        """查询字段键名在整个仓库中最常用的译文，同类字段（如 inputs）中没有时查询所有字段
+
+        只索引输入和部件，查询输出时返回 None
+        """
+        if section not in FIELD_SECTIONS:
+            return None
+        cache_key = (section, key)
+        with self._lock:
+            if cache_key in self._field_cache:
+                return self._field_cache[cache_key]
+            rows = self._conn.execute(
+                f"SELECT section, translation, COUNT(*) FROM fields WHERE key = ? AND {_FIELD_FILTER} "
+                "GROUP BY section, translation",
+                (key,)
+            ).fetchall()
+            section_id = SECTIONS.index(section)
+            same_section, counts = Counter(), Counter()
+            for row_section, translation, count in rows:
+                counts[translation] += count
+                if row_section == section_id:
+                    same_section[translation] += count
+            counts = same_section or counts
+            result = counts.most_common(1)[0][0] if counts else None
+            self._field_cache[cache_key] = result
+            return result
+
+    def field_pairs(self) -> List[Tuple[str, str]]:
+        """每个输入和部件键名在整个仓库中最常用的译文 [(键名, 译文)]，用于初始化翻译记忆"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key, translation, COUNT(*) FROM fields WHERE {_FIELD_FILTER} GROUP BY key, translation"
+            ).fetchall()
+        best = {}
+        for key, translation, count in rows:
+            if count > best.get(key, ("", 0))[1]:
+                best[key] = (translation, count)
+        return [(key, translation) for key, (translation, _) in best.items()]
+
+    def summary(self) -> Dict:
+        """索引中的文件、节点和字段数"""
+        with self._lock:
+            return {
+                table: self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("files", "nodes", "fields")
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,234 @@
+"""模糊翻译记忆模块"""
+
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .glossary import normalize
+from .validation import has_cjk
+
+# 译文末尾的编号或版本号，如 图像_1、图像1、加载器 V2
+_TRANSLATION_SUFFIX = re.compile(r'(?:\s*[Vv]|_|\s*)(\d+)$')
+
+# 词条类型：节点标题和字段（参数名）的翻译规则不同，只在同类词条之间沿用和参考
+TITLE = "title"
+FIELD = "field"
+
+
+def _singular(word: str) -> str:
+    """英文单词的单数形式（只处理常见的 s 结尾）"""
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+class TranslationMemory:
+    """基于字符三元组倒排索引的模糊翻译记忆
+
+    记录已确认的原文和译文，每个原文拆成单词后按单词生成三元组（单词两端补空格），
+    因此词序不同的 mask_blur 和 blur_mask、写法不同的 image_1 和 image1 也能互相找到。
+    查询时只从较少见的三元组的倒排列表中取候选，再按三元组集合的 Dice 系数精确打分。
+
+    找到的相似译文有两种用途：
+    - 只差大小写、分隔符、单复数或末尾编号（image_1 / image1 / images，Loader / Loader V2）的原文直接沿用译文
+    - 其余相似译文作为参考示例附在批次请求中，帮助模型保持用词一致
+
+    每条译文标记为节点标题（TITLE）或字段（FIELD），沿用和参考示例只在同类词条之间进行，
+    字段 image_blend 的译文不会用于标题 Image Blend
+    """
+
+    def __init__(self, examples: int = 6, min_score: float = 0.6, autofill: bool = True,
+                 max_postings: int = 2000):
+        """初始化翻译记忆
+
+        Args:
+            examples: 每个请求最多附带的参考示例数，0 表示不附带
+            min_score: 参考示例的最低相似度（0~1）
+            autofill: 是否直接沿用只差写法或编号的原文的译文
+            max_postings: 倒排列表长度超过该值的常见三元组不用于生成候选
+        """
+        self.examples = examples
+        self.min_score = min_score
+        self.autofill_enabled = autofill
+        self.max_postings = max_postings
+        self._sources: List[str] = []
+        self._translations: List[str] = []
+        self._grams: List[frozenset] = []
+        self._ids: Dict[tuple, int] = {}             # (类型, 原文) -> 编号
+        self._stems: Dict[tuple, Dict[tuple, int]] = {}   # (类型, 去掉编号的规范形式) -> {(编号, 是否为版本号): 编号}
+        self._postings: Dict[tuple, List[int]] = {}  # (类型, 三元组) -> 包含它的原文编号
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict) -> Optional["TranslationMemory"]:
+        """根据配置创建翻译记忆，未启用时返回 None"""
+        config = dict(config or {})
+        if not config.pop("enabled", False):
+            return None
+        return cls(**config)
+
+    def __len__(self) -> int:
+        return len(self._sources)
+
+    @staticmethod
+    def _words(text: str) -> List[str]:
+        return normalize(text).split()
+
+    @staticmethod
+    def _trigrams(words: List[str]) -> frozenset:
+        grams = set()
+        for word in words:
+            padded = f" {word} "
+            grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+        return frozenset(grams)
+
+    @staticmethod
+    def _split_suffix(words: List[str]) -> Tuple[tuple, Optional[str], bool]:
+        """拆分末尾的编号或版本号
+
+        Returns:
+            Tuple: (去掉编号并转为单数的单词, 编号, 是否为版本号 vN)
+        """
+        number = is_version = None
+        if len(words) > 1 and words[-1].isdigit():
+            number = words[-1]
+            words = words[:-1]
+            if len(words) > 1 and words[-1] == "v":
+                words = words[:-1]
+                is_version = True
+        return tuple(_singular(word) for word in words), number, bool(is_version)
+
+    def add(self, source: str, translation: str, kind: str = FIELD):
+        """记录一条已确认的译文，同类词条中相同原文以最后一次为准；译文中没有中文时不记录
+
+        Args:
+            source: 原文
+            translation: 译文
+            kind: 词条类型，TITLE 或 FIELD
+        """
+        if not source or not isinstance(translation, str) or not has_cjk(translation):
+            return
+        words = self._words(source)
+        if not words:
+            return
+        with self._lock:
+            entry_id = self._ids.get((kind, source))
+            if entry_id is not None:
+                self._translations[entry_id] = translation
+                return
+            entry_id = len(self._sources)
+            grams = self._trigrams(words)
+            self._sources.append(source)
+            self._translations.append(translation)
+            self._grams.append(grams)
+            self._ids[(kind, source)] = entry_id
+            stem, number, is_version = self._split_suffix(words)
+            self._stems.setdefault((kind, stem), {}).setdefault((number, is_version), entry_id)
+            for gram in grams:
+                self._postings.setdefault((kind, gram), []).append(entry_id)
+
+    def add_many(self, pairs: Iterable[Tuple[str, str]], kind: str = FIELD):
+        """批量记录同一类型的译文"""
+        for source, translation in pairs:
+            self.add(source, translation, kind)
+
+    def similar(self, text: str, k: int = 5, min_score: float = 0.0,
+                kind: str = FIELD) -> List[Tuple[str, str, float]]:
+        """查询同类词条中最相似的已有译文
+
+        Args:
+            text: 原文
+            k: 最多返回的条数
+            min_score: 最低相似度
+            kind: 词条类型，TITLE 或 FIELD
+
+        Returns:
+            List[Tuple[str, str, float]]: [(原文, 译文, 相似度)]，按相似度从高到低排列，不包含原文本身
+        """
+        grams = self._trigrams(self._words(text))
+        if not grams:
+            return []
+        with self._lock:
+            postings = sorted((self._postings.get((kind, gram), ()) for gram in grams), key=len)
+            candidates = Counter()
+            for posting in postings:
+                if len(posting) > self.max_postings and candidates:
+                    break
+                candidates.update(posting)
+
+            scored = []
+            size = len(grams)
+            for entry_id in candidates:
+                if self._sources[entry_id] == text:
+                    continue
+                other = self._grams[entry_id]
+                score = 2 * len(grams & other) / (size + len(other))
+                if score >= min_score:
+                    scored.append((score, entry_id))
+            scored.sort(key=lambda item: (-item[0], item[1]))
+            return [(self._sources[i], self._translations[i], round(score, 3)) for score, i in scored[:k]]
+
+    def autofill(self, text: str, kind: str = FIELD) -> Optional[str]:
+        """只差大小写、分隔符、单复数或末尾编号的同类原文直接沿用已有译文，没有时返回 None"""
+        if not self.autofill_enabled:
+            return None
+        words = self._words(text)
+        if not words:
+            return None
+        stem, number, is_version = self._split_suffix(words)
+        with self._lock:
+            entry_id = self._ids.get((kind, text))
+            if entry_id is not None:
+                return self._translations[entry_id]
+            variants = self._stems.get((kind, stem))
+            if not variants:
+                return None
+            exact = variants.get((number, is_version))
+            if exact is not None:
+                return self._translations[exact]
+            base = variants.get((None, False))
+            if base is not None:
+                base_translation = self._translations[base]
+            else:
+                # 已有译文带有其他编号（如 image_2），去掉译文末尾的编号后再使用
+                (other_number, _), numbered = next(iter(variants.items()))
+                match = _TRANSLATION_SUFFIX.search(self._translations[numbered])
+                if not match or match.group(1) != other_number:
+                    return None
+                base_translation = self._translations[numbered][:match.start()]
+        if number is None:
+            return base_translation
+        return f"{base_translation} V{number}" if is_version else f"{base_translation}_{number}"
+
+    def examples_for(self, texts: Iterable[str], kind: str = FIELD, limit: int = None) -> List[Tuple[str, str]]:
+        """为一批同类原文选择参考示例：每个原文取最相似的一条同类译文，按相似度选出最多 limit 条
+
+        Args:
+            texts: 原文
+            kind: 词条类型，TITLE 或 FIELD
+            limit: 最多返回的条数，为空时为 examples
+        """
+        limit = self.examples if limit is None else limit
+        if not limit:
+            return []
+        texts = list(texts)
+        text_set = set(texts)
+        best = {}
+        for text in texts:
+            for source, translation, score in self.similar(text, k=1, min_score=self.min_score, kind=kind):
+                if source not in text_set and score > best.get(source, (0, None))[0]:
+                    best[source] = (score, translation)
+        ranked = sorted(best.items(), key=lambda item: -item[1][0])[:limit]
+        return [(source, translation) for source, (_, translation) in ranked]
+
+    @staticmethod
+    def build_examples_section(examples: List[Tuple[str, str]],
+                               title_examples: List[Tuple[str, str]] = None) -> str:
+        """生成参考示例部分，标题示例带有"(节点标题)"标记，没有示例时为空字符串"""
+        if not examples and not title_examples:
+            return ""
+        lines = ["参考译文（已有的相似词条翻译，请保持用词一致）:"]
+        lines.extend(f"- (节点标题) {source} → {translation}" for source, translation in title_examples or ())
+        lines.extend(f"- {source} → {translation}" for source, translation in examples)
+        return "\n".join(lines)
@@ -1,13 +1,59 @@
 import os
 from typing import Dict, List
-from openai import OpenAI
 import requests
 import json
 import time
-from .prompts import PromptTemplate  # 导入提示词模板
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from .prompts import PromptTemplate, TRANSLATOR_CORE_PROMPT  # 导入提示词模板
 from .translation_config import TranslationConfig
 import glob
 from .file_utils import FileUtils
+from .request_builder import BatchRequestBuilder, RepairRequestBuilder, SECTIONS, WIRE_FORMATS
+from .batch_planner import BatchPlanner
+from .run_stats import RunStats
+from .json_stream import IncrementalJSONParser
+from .line_stream import LineParser
+from .response_schema import RESPONSE_FORMATS, SchemaValidator, build_response_format
+from .token_utils import TokenEstimator
+from .api_client import ClientManager, VOLCENGINE_BASE_URL
+from .cassette import Cassette
+from .cost_planner import PriceTable
+from .budget import Budget, BudgetExceededError
+from .provider_pool import Provider, ProviderPool, RequestCancelledError
+from .hedging import HedgePolicy, hedged_call
+from .auto_tuner import AutoTuner
+from .batch_job import BatchJob
+from .rule_translator import RuleTranslator
+from .glossary import Glossary
+from .validation import BatchCheck, ValidationEngine
+from .node_diff import NodeDiffer
+from .translation_index import TranslationIndex
+from .translation_memory import FIELD, TITLE, TranslationMemory
+from .context_cache import ContextCache
+
+# 程序根目录、输出目录和系统提示词在进程内只初始化一次，供所有翻译器共用
+_BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_SHARED = {}
+_SHARED_LOCK = threading.Lock()
+
+def _get_shared(name: str, factory):
+    """获取进程内共用的对象，首次使用时创建"""
+    with _SHARED_LOCK:
+        if name not in _SHARED:
+            _SHARED[name] = factory()
+        return _SHARED[name]
+
+class IncompleteResponseError(Exception):
+    """模型响应不完整，partial 中保存已收到的编号译文"""
+    
+    def __init__(self, message: str, partial: Dict = None):
+        super().__init__(message)
+        self.partial = partial or {}
+
+class TruncatedResponseError(IncompleteResponseError):
+    """模型响应被截断（达到输出 tokens 上限或 JSON 不完整）"""
+    pass
 
 class Translator:
     """节点翻译器类
@@ -15,37 +61,115 @@ class Translator:
     负责调用火山引擎 API 将节点信息翻译成中文
     """
     
-    def __init__(self, api_key: str, model_id: str):
+    def __init__(self, api_key: str, model_id: str, base_url: str = VOLCENGINE_BASE_URL,
+                 cassette: Cassette = None, pricing: Dict = None, provider: str = "volcengine",
+                 pool: ProviderPool = None, cascade: List[ProviderPool] = None):
         """初始化翻译器
         
+        翻译器只保存单个插件的运行状态（统计、补译队列、工作目录等），
+        API 客户端和连接池由 ClientManager 在进程内共用
+        
         Args:
             api_key: API 密钥
             model_id: 火山引擎模型 ID
+            base_url: OpenAI 兼容的服务地址
+            cassette: 请求录像，用于录制或离线回放模型响应
+            pricing: 价格配置，为空时使用默认的火山引擎价格
+            provider: 服务商，用于选择价格
+            pool: 服务池，配置了多个服务时按服务池路由请求并自动故障转移
+            cascade: 更强模型的服务池（按梯队排列），批次先由 pool 翻译，未通过校验的节点逐级交给后面的梯队
         """
         self.model_id = model_id
         
         # 获取程序根目录
-        self.base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.base_path = _BASE_PATH
         
         # 初始化输出目录
-        self.dirs = FileUtils.init_output_dirs(self.base_path)
+        self.dirs = _get_shared("dirs", lambda: FileUtils.init_output_dirs(self.base_path))
         
         # 从提示词模板获取系统提示词
-        self.system_prompt = PromptTemplate.get_translator_prompt()
+        self.system_prompt = _get_shared("system_prompt", PromptTemplate.get_translator_prompt)
         
-        # 初始化火山引擎客户端
-        self.client = OpenAI(
-            api_key=api_key,
-            base_url="https://ark.cn-beijing.volces.com/api/v3"
-        )
+        # 术语表：每个请求只附带原文中出现的术语
+        self.glossary = Glossary.default()
+        self.trim_prompt = True
+        
+        # 服务商上下文缓存：固定的系统消息作为所有请求共同的前缀
+        self.context_cache = ContextCache()
+        
+        # 模糊翻译记忆：沿用只差写法或编号的原文的译文，并为请求提供相似词条的参考译文
+        self.memory = None
+        
+        # 从共享连接池获取客户端，使用录像时所有请求经过录像
+        self.client = ClientManager.get_client(api_key, base_url)
+        self.cassette = cassette
+        if cassette:
+            self.client = cassette.wrap(self.client)
+        
+        # 用于统计费用的价格
+        self.price = PriceTable(pricing, provider, model_id)
+        
+        # 服务池：未配置多个服务时只包含当前服务，同一服务地址的所有翻译器共用限流配额
+        self.pool = pool or ProviderPool([
+            Provider(provider, base_url, api_key, model_id, price=self.price, client=self.client)
+        ])
+        
+        # 模型梯队：第一梯队为 pool，其余为逐级升级使用的更强模型
+        self.tiers: List[ProviderPool] = [self.pool] + list(cascade or [])
         
         # 创建工作目录
         self.work_dir = os.path.join(self.dirs["temp"], "workspace")
         os.makedirs(self.work_dir, exist_ok=True)
         
-        self.total_prompt_tokens = 0    # 输入 tokens
-        self.total_completion_tokens = 0 # 输出 tokens
-        self.total_tokens = 0           # 总 tokens
+        # 单次请求的输出 tokens 上限，批次规划时预留 25% 余量
+        self.max_completion_tokens = 2048
+        
+        # 是否使用流式输出
+        self.stream = False
+        
+        # 批次请求和响应的格式（json 或 lines），补译请求始终使用 JSON
+        self.wire_format = "json"
+        
+        # 响应格式：text 从回复文本中提取 JSON，json_object / json_schema 使用服务商的结构化输出
+        self.response_format = "text"
+        
+        # 本次运行的 tokens 使用量、截断次数等统计
+        self.stats = RunStats()
+        
+        # 待补译的缺失字段
+        self.repair_queue = []
+        
+        # 校验引擎：在内存中一次遍历完成缺失、未翻译和中文键名检查，缓存字符串的判断结果
+        self.validator = ValidationEngine()
+        self._repair_lock = threading.Lock()
+        
+        # 预算上限，触发后停止调度新批次并输出部分结果
+        self.budgets: List[Budget] = []
+        self.stop_reason = None
+        self.budget_journal = None
+        
+        # 对冲请求策略，为空时不对冲
+        self.hedge: HedgePolicy = None
+        
+        # 批次大小与并发数自动调优，为空时使用固定参数
+        self.tuner: AutoTuner = None
+        self._tune_lock = threading.Lock()
+        self._congestion_mark = None
+
+    @property
+    def total_prompt_tokens(self) -> int:
+        """输入 tokens"""
+        return self.stats.prompt_tokens
+
+    @property
+    def total_completion_tokens(self) -> int:
+        """输出 tokens"""
+        return self.stats.completion_tokens
+
+    @property
+    def total_tokens(self) -> int:
+        """总 tokens"""
+        return self.stats.total_tokens
 
     def test_connection(self) -> bool:
         """测试 API 连接"""
@@ -120,21 +244,69 @@ class Translator:
         except Exception as e:
             raise Exception(f"翻译失败: {str(e)}")
 
-    def translate_nodes(self, nodes_info: Dict, folder_path: str, batch_size: int = 6, 
-                       update_progress=None, temp_dir: str = None) -> Dict:
+    def translate_nodes(self, nodes_info: Dict, folder_path: str, batch_size: int = None, 
+                       update_progress=None, temp_dir: str = None, token_target: int = 1500,
+                       stream: bool = False, concurrency: int = 1, budgets: List[Budget] = None,
+                       hedge: HedgePolicy = None, tuner: AutoTuner = None, pretranslate: bool = True,
+                       trim_prompt: bool = True, context_cache: ContextCache = None,
+                       wire_format: str = "json", response_format: str = "text",
+                       previous: Dict = None, previous_source: Dict = None,
+                       index: TranslationIndex = None, memory: TranslationMemory = None) -> Dict:
         """翻译节点信息
         
         Args:
             nodes_info: 节点信息字典
             folder_path: 插件文件夹路径
-            batch_size: 批处理大小
+            batch_size: 每批最多节点数，为空表示只按 tokens 目标分批
             update_progress: 进度更新回调函数
             temp_dir: 临时文件目录路径
+            token_target: 每批请求内容与响应的估算 tokens 上限
+            stream: 是否使用流式输出，逐个节点提交结果，连接中断时只重新请求剩余部分
+            concurrency: 同时进行的批次请求数
+            budgets: 预算上限（如整个任务和单个插件），任一预算将被超出时停止调度新批次，
+                     返回已完成节点的部分结果，并将未完成的节点记录到预算日志
+            hedge: 对冲请求策略，请求超过近期耗时百分位仍未完成时再发出一个相同的请求
+            tuner: 自动调优，启用时以其当前参数代替 token_target 和 concurrency，并在运行中调整
+            pretranslate: 是否先用本地规则翻译能由术语表完全覆盖的字段键名，只把其余部分发送给模型
+            trim_prompt: 是否只附带批次原文中出现的术语，为 False 时每个请求都附带完整术语表
+            context_cache: 上下文缓存，为空时只依靠服务商的隐式前缀缓存
+            wire_format: 批次请求和响应的格式，json 为编号到文本的 JSON 对象，
+                         lines 为每行一个 "编号<TAB>文本"，格式开销更小且单行错误不影响其他词条
+            response_format: 响应格式，json_object 要求服务商返回 JSON 对象，json_schema 按批次生成
+                             包含全部词条编号的 Schema，由服务商保证输出符合格式；需要 wire_format 为 json
+            previous: 已有的翻译文件（如 zh-CN/Nodes/插件名.json），指定时只翻译新增或有变化的节点、
+                      标题和字段，其余部分沿用已有译文
+            previous_source: 已有译文对应的英文原文，用于发现键名不变但原文有变化的标题和字段
+            index: 已有翻译仓库的索引，指定时先沿用仓库中同名节点的译文和相同字段键名最常用的译文
+            memory: 模糊翻译记忆，可在多个插件之间共用；记录沿用和通过校验的译文，只差写法或编号的原文
+                    直接沿用译文，其余请求附带相似词条的参考译文
         """
+        if wire_format not in WIRE_FORMATS:
+            raise ValueError(f"不支持的请求格式: {wire_format}")
+        if response_format not in RESPONSE_FORMATS:
+            raise ValueError(f"不支持的响应格式: {response_format}")
+        if response_format != "text" and wire_format != "json":
+            raise ValueError("结构化输出只能与 json 请求格式同时使用")
         temp_files = []  # 记录所有临时文件
-        self.total_prompt_tokens = 0
-        self.total_completion_tokens = 0
-        self.total_tokens = 0
+        self.stream = stream
+        started = time.time()
+        self.stats = RunStats()
+        self.repair_queue = []
+        self.budgets = [budget for budget in (budgets or []) if budget]
+        self.stop_reason = None
+        self.budget_journal = None
+        self.hedge = hedge
+        self.tuner = tuner
+        self.trim_prompt = trim_prompt
+        self.context_cache = context_cache or ContextCache()
+        self.wire_format = wire_format
+        self.response_format = response_format
+        self.memory = memory
+        if tuner:
+            tuner.begin()
+            token_target, concurrency = tuner.token_target, tuner.concurrency
+        for budget in self.budgets:
+            budget.start()
         
         try:
             # 使用传入的临时目录或默认目录
@@ -151,86 +323,194 @@ class Translator:
             
             all_translated_nodes = {}
             
-            # 分批处理节点
-            node_items = list(nodes_info.items())
-            total_batches = (len(node_items) + batch_size - 1) // batch_size
+            # 增量翻译：沿用已有译文，只翻译差异部分
+            delta_nodes, reused_nodes = nodes_info, {}
+            if previous is not None:
+                delta_nodes, reused_nodes = self._incremental_delta(nodes_info, previous, previous_source,
+                                                                    update_progress)
             
-            for batch_idx in range(total_batches):
-                start_idx = batch_idx * batch_size
-                end_idx = min((batch_idx + 1) * batch_size, len(node_items))
-                current_batch = dict(node_items[start_idx:end_idx])
-                
-                # 更新进度
-                if update_progress:
-                    progress = int((batch_idx / total_batches) * 100)
-                    node_names = list(current_batch.keys())
-                    update_progress(progress, f"[翻译] 第 {batch_idx + 1}/{total_batches} 批: {', '.join(node_names)}")
-                
-                try:
-                    # 1. 翻译当前批次
-                    batch_translated = self._translate_batch(current_batch, update_progress, progress)
-                    
-                    # 2. 验证和修正翻译结果
-                    if update_progress:
-                        update_progress(progress, "[验证] 正在验证翻译结果...")
-                        
-                    batch_corrected = self._validate_and_correct_batch(
-                        current_batch,
-                        batch_translated,
-                        update_progress,
-                        progress
-                    )
-                    
-                    # 3. 保存已修正的批次
-                    batch_file = os.path.join(
-                        work_dir, 
-                        f"batch_{batch_idx + 1}_translated.json"
-                    )
-                    FileUtils.save_json(batch_corrected, batch_file)
-                    temp_files.append(batch_file)  # 记录临时文件
-                    
-                    # 4. 更新总结果
-                    all_translated_nodes.update(batch_corrected)
-                    
-                    if update_progress:
-                        update_progress(progress, f"[完成] 批次 {batch_idx + 1} 的处理已完成")
-                    
-                except Exception as e:
-                    if update_progress:
-                        update_progress(progress, f"[错误] 批次 {batch_idx + 1} 处理失败: {str(e)}")
-                    raise
+            # 已有翻译仓库中能找到的译文直接沿用
+            index_nodes = {}
+            if index is not None:
+                delta_nodes, index_nodes = self._prefill_from_index(delta_nodes, index, update_progress)
+            
+            # 本地规则翻译能完全覆盖的字段，其余部分交给模型
+            request_nodes, local_nodes = delta_nodes, {}
+            if pretranslate:
+                request_nodes, local_nodes = self._pretranslate(delta_nodes, update_progress)
+            
+            # 沿用的译文记入翻译记忆，只差写法或编号的原文直接使用记忆中的译文
+            memory_nodes = {}
+            if self.memory is not None:
+                for known_nodes in (reused_nodes, index_nodes, local_nodes):
+                    title_pairs, field_pairs = self._translation_pairs(nodes_info, known_nodes)
+                    self.memory.add_many(title_pairs, TITLE)
+                    self.memory.add_many(field_pairs, FIELD)
+                request_nodes, memory_nodes = self._autofill_from_memory(request_nodes, update_progress)
+            
+            # 按估算 tokens 规划批次
+            planner = BatchPlanner(
+                token_target=token_target,
+                max_output_tokens=int(self.max_completion_tokens * 0.75),
+                max_nodes=batch_size
+            )
+            batches = planner.plan(request_nodes)
+            total_batches = len(batches)
+            
+            if update_progress:
+                update_progress(0, f"[准备] {len(request_nodes)} 个节点规划为 {total_batches} 个批次 (tokens 目标: {token_target})")
+            
+            # 按并发数调度批次，结果按批次顺序合并
+            batch_results = self._run_batches(batches, work_dir, temp_files, update_progress, concurrency,
+                                              planner)
+            pending_nodes = set()
+            for current_batch, batch_corrected in batch_results:
+                if batch_corrected is None:
+                    # 因预算停止而未完成的批次，拆分节点的任一部分未完成即视为未完成
+                    pending_nodes.update(current_batch.keys())
+                    continue
+                # 拆分节点的各部分在此合并
+                BatchPlanner.merge_translated(all_translated_nodes, batch_corrected)
+            BatchPlanner.merge_translated(all_translated_nodes, local_nodes)
+            BatchPlanner.merge_translated(all_translated_nodes, reused_nodes)
+            BatchPlanner.merge_translated(all_translated_nodes, index_nodes)
+            BatchPlanner.merge_translated(all_translated_nodes, memory_nodes)
+            
+            # 统一补译缺失字段
+            self._repair_missing_fields(nodes_info, all_translated_nodes, token_target, update_progress)
+            
+            # 按原始顺序重排拆分后合并的节点
+            all_translated_nodes = BatchPlanner.restore_order(nodes_info, all_translated_nodes)
             
             # 保存最终结果
             plugin_name = os.path.basename(folder_path.rstrip(os.path.sep))
             final_file = os.path.join(work_dir, f"{plugin_name}.json")
             
+            # 因预算停止时只输出已完成的节点，未完成的节点记录到预算日志
+            output_nodes = nodes_info
+            if self.stop_reason:
+                output_nodes = {
+                    name: info for name, info in nodes_info.items() if name not in pending_nodes
+                }
+                self._write_budget_journal(plugin_name, nodes_info, output_nodes, update_progress)
+            
             # 最终验证
             if update_progress:
                 update_progress(95, "[验证] 进行最终验证...")
             final_corrected = self._final_validation(
-                nodes_info,
-                all_translated_nodes,
+                output_nodes,
+                {name: info for name, info in all_translated_nodes.items() if name in output_nodes},
                 update_progress
             )
             
             # 保存最终结果
             FileUtils.save_json(final_corrected, final_file)
             
+            # 保存运行统计，供调整批次大小参考
+            self.stats.wall_time = time.time() - started
+            stats_file = os.path.join(
+                self.dirs["logs"], 
+                f"translation_stats_{plugin_name}_{time.strftime('%Y%m%d_%H%M%S')}.json"
+            )
+            FileUtils.save_json(
+                {
+                    "model_id": self.model_id, 
+                    "token_target": token_target, 
+                    **self.stats.summary(),
+                    "providers": [p for pool in self.tiers for p in pool.summary()],
+                    "auto_tune": {**self.tuner.settings(), "adjustments": len(self.tuner.adjustments)} if self.tuner else None
+                },
+                stats_file
+            )
+            
             # 清理临时文件
             self._cleanup_temp_files(temp_files, update_progress)
             
             # 在完成时显示总计信息
             if update_progress:
-                # 计算费用（火山引擎费率：输入 0.0008元/千tokens，输出 0.0020元/千tokens）
-                prompt_cost = (self.total_prompt_tokens / 1000) * 0.0008
-                completion_cost = (self.total_completion_tokens / 1000) * 0.0020
+                # 按各请求实际使用服务的价格计算费用
+                prompt_cost = self.stats.prompt_cost
+                completion_cost = self.stats.completion_cost
                 total_cost = prompt_cost + completion_cost
+                currency = self.price.currency
                 
                 update_progress(100, f"[完成] 翻译和验证完成！")
                 update_progress(100, f"[统计] 总计使用 {self.total_tokens} tokens:")
-                update_progress(100, f"       - 输入: {self.total_prompt_tokens} tokens (¥{prompt_cost:.4f})")
-                update_progress(100, f"       - 输出: {self.total_completion_tokens} tokens (¥{completion_cost:.4f})")
-                update_progress(100, f"[费用] 预估总费用（请以实际为准）: ¥{total_cost:.4f}")
+                update_progress(100, f"       - 输入: {self.total_prompt_tokens} tokens ({currency}{prompt_cost:.4f})")
+                update_progress(100, f"       - 输出: {self.total_completion_tokens} tokens ({currency}{completion_cost:.4f})")
+                if nodes_info:
+                    node_count = len(nodes_info)
+                    update_progress(100, 
+                        f"[统计] 平均每节点 {self.total_tokens / node_count:.1f} tokens "
+                        f"(估算: 完整结构 {self.stats.estimated_legacy_tokens / node_count:.1f} → "
+                        f"去重词条 {self.stats.estimated_compact_tokens / node_count:.1f})"
+                    )
+                update_progress(100, f"[统计] 共 {self.stats.requests} 次请求，响应截断 {self.stats.truncations} 次，拆分重试 {self.stats.bisections} 次")
+                if self.stats.parse_errors or self.stats.parse_failures or self.stats.schema_violations:
+                    update_progress(100, 
+                        f"[解析] 请求格式 {self.wire_format}，响应格式 {self.response_format}："
+                        f"跳过格式错误的词条 {self.stats.parse_errors} 个，无法解析的响应 {self.stats.parse_failures} 次，"
+                        f"不符合 Schema 的词条 {self.stats.schema_violations} 个"
+                    )
+                if self.stats.requests and self.trim_prompt:
+                    update_progress(100, 
+                        f"[提示词] 平均每个请求的提示词说明 {self.stats.system_prompt_tokens / self.stats.requests:.0f} tokens "
+                        f"(完整术语表 {self.stats.full_system_prompt_tokens / self.stats.requests:.0f} tokens)"
+                    )
+                if self.stats.cached_tokens:
+                    update_progress(100, 
+                        f"[缓存] 输入中 {self.stats.cached_tokens}/{self.total_prompt_tokens} tokens 命中服务商上下文缓存 "
+                        f"({self.stats.cached_tokens / max(self.total_prompt_tokens, 1):.1%})"
+                    )
+                if self.stats.memory_autofilled or self.stats.memory_examples:
+                    update_progress(100, 
+                        f"[记忆] 沿用翻译记忆中的译文 {self.stats.memory_autofilled} 个，"
+                        f"请求中附带参考译文 {self.stats.memory_examples} 条"
+                    )
+                if self.stats.pretranslate_fields:
+                    update_progress(100, 
+                        f"[预翻译] 本地规则翻译 {self.stats.pretranslated_fields}/{self.stats.pretranslate_fields} 个字段 "
+                        f"(覆盖率 {self.stats.pretranslated_fields / self.stats.pretranslate_fields:.1%})，"
+                        f"节省约 {self.stats.pretranslate_saved_tokens} tokens"
+                    )
+                if self.stream:
+                    update_progress(100, f"[统计] 流式输出中断或截断后续传 {self.stats.stream_resumes} 次")
+                if self.stats.repair_fields:
+                    update_progress(100, 
+                        f"[统计] 补译 {self.stats.repaired_fields}/{self.stats.repair_fields} 个缺失字段，"
+                        f"用去 {self.stats.repair_requests} 次请求"
+                    )
+                if self.stats.truncations:
+                    suggested = self.stats.suggested_token_target(token_target, self.max_completion_tokens)
+                    update_progress(100, f"[建议] 出现响应截断，可将每批 tokens 目标调低至 {suggested}")
+                if self.stop_reason:
+                    update_progress(100, 
+                        f"[预算] {self.stop_reason}，已输出 {len(final_corrected)}/{len(nodes_info)} 个节点的部分结果"
+                    )
+                if sum(len(pool.providers) for pool in self.tiers) > 1:
+                    for provider_stats in [p for pool in self.tiers for p in pool.summary()]:
+                        latency = provider_stats["latency"]
+                        update_progress(100, 
+                            f"[服务] {provider_stats['provider']}: 请求 {provider_stats['requests']} 次，"
+                            f"失败 {provider_stats['failures']} 次，限流 {provider_stats['rate_limited']} 次"
+                            + (f"，平均耗时 {latency:.2f}s" if latency is not None else "")
+                            + (f"，已熔断: {provider_stats['fatal_reason']}" if provider_stats["fatal_reason"] else "")
+                        )
+                if len(self.tiers) > 1:
+                    self._report_tiers(update_progress, currency)
+                if self.tuner:
+                    settings = self.tuner.settings()
+                    update_progress(100, 
+                        f"[调优] 当前参数: 每批 tokens 目标 {settings['token_target']}，并发数 {settings['concurrency']}"
+                    )
+                if self.stats.hedges:
+                    update_progress(100, 
+                        f"[对冲] 发出 {self.stats.hedges} 个对冲请求，其中 {self.stats.hedge_wins} 个先于原请求完成，"
+                        f"额外使用 {self.stats.hedge_extra_tokens} tokens"
+                    )
+                if self.stats.rate_limit_wait:
+                    update_progress(100, f"[统计] 限流等待共 {self.stats.rate_limit_wait:.1f} 秒")
+                update_progress(100, f"[费用] 预估总费用（请以实际为准）: {currency}{total_cost:.4f}")
             
             return final_corrected
             
@@ -254,43 +534,720 @@ class Translator:
                     update_progress(-1, f"[错误] 翻译过程出错: {error_msg}")
             raise
 
-    def _validate_and_correct_batch(self, original_batch: Dict, translated_batch: Dict, 
-                                  update_progress=None, progress: int = 0) -> Dict:
-        """验证和修正单个批次的翻译结果"""
-        corrected_batch = {}
+    def _incremental_delta(self, nodes_info: Dict, previous: Dict, previous_source: Dict = None,
+                           update_progress=None) -> tuple:
+        """计算与已有翻译文件的字段级差异
         
-        for node_name, node_info in original_batch.items():
-            if node_name not in translated_batch:
-                if update_progress:
-                    update_progress(progress, f"[修正] 节点 {node_name} 未翻译，使用原始数据")
-                corrected_batch[node_name] = node_info
-                continue
+        Args:
+            nodes_info: 节点信息字典
+            previous: 已有的翻译文件
+            previous_source: 已有译文对应的英文原文
+            update_progress: 进度更新回调函数
             
-            translated_info = translated_batch[node_name]
-            corrected_node = {
-                "title": translated_info.get("title", node_info.get("title", "")),
-                "inputs": {},
-                "widgets": {},
-                "outputs": {}
-            }
+        Returns:
+            tuple: (需要翻译的部分, 沿用的译文)
+        """
+        delta_nodes, reused_nodes, summary = NodeDiffer.translation_delta(
+            nodes_info, previous, previous_source, self.validator
+        )
+        self.stats.incremental = summary
+        if update_progress:
+            total = sum(len(node_info.get(section, {})) for node_info in nodes_info.values() for section in SECTIONS)
+            update_progress(0, 
+                f"[增量] 沿用已有译文 {summary['reused_fields']}/{total} 个字段；"
+                f"需要翻译: 新增节点 {summary['new_nodes']} 个，变化的标题 {summary['changed_titles']} 个，"
+                f"新增字段 {summary['new_fields']} 个，原文变化的字段 {summary['changed_fields']} 个，"
+                f"译文为空或仍为英文的字段 {summary['stale_fields']} 个；删除的字段 {summary['removed_fields']} 个"
+            )
+        return delta_nodes, reused_nodes
+
+    def _prefill_from_index(self, nodes_info: Dict, index: TranslationIndex, update_progress=None) -> tuple:
+        """从已有翻译仓库的索引中沿用译文
+        
+        同名（或规范化后同名）节点的标题和字段译文为人工校对结果，优先沿用；
+        其余输入和部件使用仓库中相同键名最常用的译文。只沿用当前节点中存在的字段，
+        仍为英文的译文（未翻译的条目）不沿用
+        
+        Args:
+            nodes_info: 节点信息字典
+            index: 已有翻译仓库的索引
+            update_progress: 进度更新回调函数
             
-            # 验证和修正每个部分
-            for section in ["inputs", "widgets", "outputs"]:
-                orig_section = node_info.get(section, {})
-                trans_section = translated_info.get(section, {})
-                
-                # 确保所有原始键都存在
-                for key in orig_section:
-                    if key in trans_section:
-                        corrected_node[section][key] = trans_section[key]
+        Returns:
+            tuple: (仍需翻译的部分, 沿用的译文)
+        """
+        request_nodes, index_nodes = {}, {}
+        fields = node_fields = key_fields = titles = 0
+        
+        for node_name, node_info in nodes_info.items():
+            existing = index.lookup_node(node_name) or {}
+            part = {"title": node_info.get("title", ""), "inputs": {}, "widgets": {}, "outputs": {}}
+            done = {"inputs": {}, "widgets": {}, "outputs": {}}
+            if part["title"] and self._is_usable_translation(part["title"], existing.get("title")):
+                done["title"] = existing["title"]
+                part["title"] = ""
+                titles += 1
+            
+            for section in SECTIONS:
+                existing_section = existing.get(section)
+                if not isinstance(existing_section, dict):
+                    existing_section = {}
+                for key, value in node_info.get(section, {}).items():
+                    fields += 1
+                    source = BatchRequestBuilder.source_text(key, value)
+                    translation = existing_section.get(key)
+                    if self._is_usable_translation(source, translation):
+                        node_fields += 1
+                    elif section == "outputs":
+                        # 输出的键名是位置编号（output_0），只能沿用同名节点的译文
+                        part[section][key] = value
+                        continue
+                    else:
+                        translation = index.lookup_field(section, source)
+                        if not self._is_usable_translation(source, translation):
+                            part[section][key] = value
+                            continue
+                        key_fields += 1
+                    done[section][key] = translation
+            
+            if done.get("title") or any(done[section] for section in SECTIONS):
+                index_nodes[node_name] = done
+            if part["title"] or any(part[section] for section in SECTIONS):
+                request_nodes[node_name] = part
+        
+        self.stats.increment("index_titles", titles)
+        self.stats.increment("index_fields", node_fields + key_fields)
+        if update_progress and (fields or titles):
+            update_progress(0, 
+                f"[索引] 沿用已有翻译仓库的译文: 标题 {titles} 个，字段 {node_fields + key_fields}/{fields} 个"
+                f"（同名节点 {node_fields} 个，相同键名 {key_fields} 个），"
+                f"{len(nodes_info) - len(request_nodes)} 个节点无需请求"
+            )
+        return request_nodes, index_nodes
+
+    def _is_usable_translation(self, source: str, translation) -> bool:
+        """已有译文是否可以沿用（非空且不是未翻译的英文原文）"""
+        return BatchRequestBuilder.is_valid_value(translation) and not self.validator.is_untranslated(source, translation)
+
+    @staticmethod
+    def _translation_pairs(nodes_info: Dict, translated_nodes: Dict) -> tuple:
+        """从翻译结果（可以只是节点的一部分）中分别取出标题和字段的 (原文, 译文) 对
+        
+        Returns:
+            tuple: (标题的 (原文, 译文) 列表, 字段的 (原文, 译文) 列表)
+        """
+        title_pairs, field_pairs = [], []
+        for node_name, translated in translated_nodes.items():
+            node_info = nodes_info.get(node_name, {})
+            if node_info.get("title") and translated.get("title"):
+                title_pairs.append((node_info["title"], translated["title"]))
+            for section in SECTIONS:
+                source_section = node_info.get(section, {})
+                for key, translation in translated.get(section, {}).items():
+                    if key in source_section:
+                        field_pairs.append((BatchRequestBuilder.source_text(key, source_section[key]), translation))
+        return title_pairs, field_pairs
+
+    def _autofill_from_memory(self, nodes_info: Dict, update_progress=None) -> tuple:
+        """只差大小写、分隔符、单复数或末尾编号的标题和字段直接沿用翻译记忆中的译文
+        
+        Args:
+            nodes_info: 仍需翻译的节点
+            update_progress: 进度更新回调函数
+            
+        Returns:
+            tuple: (仍需翻译的部分, 沿用的译文)
+        """
+        request_nodes, memory_nodes = {}, {}
+        filled = 0
+        for node_name, node_info in nodes_info.items():
+            part = {"title": node_info.get("title", ""), "inputs": {}, "widgets": {}, "outputs": {}}
+            done = {"inputs": {}, "widgets": {}, "outputs": {}}
+            if part["title"]:
+                translation = self.memory.autofill(part["title"], TITLE)
+                if translation:
+                    done["title"] = translation
+                    part["title"] = ""
+                    filled += 1
+            for section in SECTIONS:
+                for key, value in node_info.get(section, {}).items():
+                    translation = self.memory.autofill(BatchRequestBuilder.source_text(key, value), FIELD)
+                    if translation:
+                        done[section][key] = translation
+                        filled += 1
                     else:
+                        part[section][key] = value
+            if done.get("title") or any(done[section] for section in SECTIONS):
+                memory_nodes[node_name] = done
+            if part["title"] or any(part[section] for section in SECTIONS):
+                request_nodes[node_name] = part
+        
+        self.stats.increment("memory_autofilled", filled)
+        if update_progress and filled:
+            update_progress(0, 
+                f"[记忆] 沿用翻译记忆中只差写法或编号的译文 {filled} 个，"
+                f"{len(nodes_info) - len(request_nodes)} 个节点无需请求（记忆中共 {len(self.memory)} 条译文）"
+            )
+        return request_nodes, memory_nodes
+
+    def _pretranslate(self, nodes_info: Dict, update_progress=None) -> tuple:
+        """用本地规则翻译能由术语表完全覆盖的字段键名，并统计覆盖率和节省的 tokens
+        
+        Args:
+            nodes_info: 节点信息字典
+            update_progress: 进度更新回调函数
+            
+        Returns:
+            tuple: (需要模型翻译的节点, 本地翻译结果)
+        """
+        request_nodes, local_nodes = RuleTranslator.default().split_nodes(nodes_info)
+        fields = sum(len(node_info.get(section, {})) for node_info in nodes_info.values() for section in SECTIONS)
+        resolved = 0
+        local_terms = set()
+        for node_name, done in local_nodes.items():
+            for section in SECTIONS:
+                resolved += len(done[section])
+                for key in done[section]:
+                    local_terms.add(BatchRequestBuilder.source_text(key, nodes_info[node_name][section][key]))
+        
+        # 仍会出现在请求中的原文（如与某个标题相同）不计入节省
+        requested_terms = set()
+        for node_info in request_nodes.values():
+            requested_terms.update(BatchPlanner.node_terms(node_info))
+        saved_tokens = sum(sum(BatchPlanner.term_cost(term)) for term in local_terms - requested_terms)
+        
+        self.stats.increment("pretranslate_fields", fields)
+        self.stats.increment("pretranslated_fields", resolved)
+        self.stats.increment("pretranslate_saved_tokens", saved_tokens)
+        if update_progress and fields:
+            update_progress(0, 
+                f"[预翻译] 本地规则翻译 {resolved}/{fields} 个字段 (覆盖率 {resolved / fields:.1%})，"
+                f"节省约 {saved_tokens} tokens，{len(nodes_info) - len(request_nodes)} 个节点无需请求"
+            )
+        return request_nodes, local_nodes
+
+    def export_batch_job(self, plugins: List[tuple], job_path: str, token_target: int = 1500,
+                         batch_size: int = None, update_progress=None, pretranslate: bool = True) -> BatchJob:
+        """将多个插件的全部批次导出为一个离线批量推理请求文件
+        
+        批次规划与在线翻译相同，每个批次一行（OpenAI 兼容的批量推理格式），
+        同时保存清单文件，结果文件由 ingest_batch_job 处理
+        
+        Args:
+            plugins: [(插件名, 节点信息)]
+            job_path: 请求文件路径（JSONL）
+            token_target: 每批请求内容与响应的估算 tokens 上限
+            batch_size: 每批最多节点数，为空表示只按 tokens 目标分批
+            update_progress: 进度更新回调函数
+            pretranslate: 是否先用本地规则翻译能由术语表完全覆盖的字段键名，结果保存在清单中
+            
+        Returns:
+            BatchJob: 批量任务
+        """
+        self.stats = RunStats()
+        job = BatchJob(job_path, self.model_id, token_target)
+        planner = BatchPlanner(
+            token_target=token_target,
+            max_output_tokens=int(self.max_completion_tokens * 0.75),
+            max_nodes=batch_size
+        )
+        
+        lines = []
+        estimated_input = estimated_output = 0
+        for plugin_name, nodes_info in plugins:
+            request_nodes, local_nodes = nodes_info, {}
+            if pretranslate:
+                request_nodes, local_nodes = self._pretranslate(nodes_info)
+            job.add_plugin(plugin_name, nodes_info, local_nodes)
+            for batch_idx, batch in enumerate(planner.plan(request_nodes)):
+                line, estimate = self._batch_job_line(job, f"{plugin_name}::{batch_idx}", plugin_name, batch)
+                lines.append(line)
+                estimated_input += estimate["input"]
+                estimated_output += estimate["output"]
+        
+        BatchJob.write_lines(job_path, lines)
+        job.save()
+        
+        if update_progress:
+            node_count = sum(len(nodes_info) for _, nodes_info in plugins)
+            prompt_cost, completion_cost = self.price.for_batch().cost(estimated_input, estimated_output)
+            update_progress(100, 
+                f"[批量] {len(plugins)} 个插件共 {node_count} 个节点，导出 {len(lines)} 个请求到: {job_path}"
+            )
+            if self.stats.pretranslate_fields:
+                update_progress(100, 
+                    f"[预翻译] 本地规则翻译 {self.stats.pretranslated_fields}/{self.stats.pretranslate_fields} 个字段，"
+                    f"节省约 {self.stats.pretranslate_saved_tokens} tokens"
+                )
+            update_progress(100, 
+                f"[批量] 预估 {estimated_input + estimated_output} tokens "
+                f"(输入: {estimated_input}, 输出: {estimated_output})，"
+                f"按批量价格约 {self.price.currency}{prompt_cost + completion_cost:.4f}"
+            )
+        return job
+
+    def _batch_job_line(self, job: BatchJob, custom_id: str, plugin_name: str, batch: Dict) -> tuple:
+        """生成一个批次的批量请求行，返回 (请求行, 估算 tokens)"""
+        builder = BatchRequestBuilder(batch)
+        user_message = self._with_examples(builder.build_user_message(), *builder.split_terms())
+        messages = self._build_messages(user_message, builder.terms)
+        body = {
+            "model": self.model_id,
+            **self._request_params(messages, build_response_format(self.response_format, len(builder.terms)))
+        }
+        return job.add_request(custom_id, plugin_name, batch, body), \
+            builder.estimate_tokens(self._instructions_for(builder.terms))
+
+    def ingest_batch_job(self, job_path: str, result_paths: List[str], output_dir: str,
+                         retry_path: str = None, update_progress=None) -> Dict[str, Dict]:
+        """读取离线批量推理的结果文件，校验并输出每个插件的翻译结果
+        
+        每个插件的批次结果合并后经过与在线翻译相同的批次校验、顺序还原和最终验证；
+        截断或格式错误的回复保留能解析的部分。失败或缺失的字段暂用原文占位，
+        指定 retry_path 时将这些字段重新规划为一个重试请求文件，
+        重试的结果与原结果文件一起传入即可合并
+        
+        Args:
+            job_path: 导出时的请求文件路径，用于定位清单
+            result_paths: 结果文件路径，可包含多轮重试的结果
+            output_dir: 输出目录，每个插件保存为 <插件名>.json
+            retry_path: 重试请求文件路径，为空时不导出
+            update_progress: 进度更新回调函数
+            
+        Returns:
+            Dict[str, Dict]: 插件名到最终翻译结果的映射
+        """
+        started = time.time()
+        self.stats = RunStats()
+        self.repair_queue = []
+        job = BatchJob.load(job_path)
+        results = BatchJob.read_results(result_paths)
+        price = self.price.for_batch()
+        os.makedirs(output_dir, exist_ok=True)
+        
+        outputs = {}
+        gaps = {}
+        failed = missing = 0
+        for plugin_index, (plugin_name, nodes_info) in enumerate(job.plugins.items()):
+            progress = int(plugin_index / max(len(job.plugins), 1) * 90)
+            merged = {}
+            BatchPlanner.merge_translated(merged, job.local.get(plugin_name, {}))
+            for custom_id, batch in job.plugin_requests(plugin_name):
+                result = results.get(custom_id)
+                if result is None:
+                    missing += 1
+                    continue
+                self.stats.increment("requests")
+                if result["error"]:
+                    failed += 1
+                    if update_progress:
+                        update_progress(progress, f"[批量] 请求 {custom_id} 失败: {result['error']}")
+                    continue
+                
+                usage = result["usage"] or {}
+                self._add_usage(usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0),
+                                usage.get("total_tokens"), price, cached_tokens=self._cached_tokens(usage))
+                
+                builder = BatchRequestBuilder(batch)
+                if result["finish_reason"] == "length" or self._is_json_truncated(result["content"]):
+                    self.stats.record_truncation(len(batch), len(builder.terms), 
+                                                 builder.estimate_tokens()["output"])
+                translations = BatchJob.extract_translations(result["content"])
+                BatchPlanner.merge_translated(merged, builder.apply_translations(translations))
+            
+            # 与在线翻译相同的校验流程，缺失字段登记到补译队列
+            corrected = self._validate_and_correct_batch(nodes_info, merged)
+            gaps[plugin_name], self.repair_queue = self.repair_queue, []
+            ordered = BatchPlanner.restore_order(nodes_info, corrected)
+            final_nodes = self._final_validation(nodes_info, ordered, update_progress)
+            FileUtils.save_json(final_nodes, os.path.join(output_dir, f"{plugin_name}.json"))
+            outputs[plugin_name] = final_nodes
+            
+            if update_progress:
+                update_progress(progress, 
+                    f"[批量] {plugin_name}: {len(final_nodes)} 个节点，缺失 {len(gaps[plugin_name])} 个字段"
+                )
+        
+        request_count = len(job.requests)
+        gap_count = sum(len(plugin_gaps) for plugin_gaps in gaps.values())
+        self.stats.increment("repair_fields", gap_count)
+        retry_requests = 0
+        if retry_path and gap_count:
+            retry_requests = self._export_batch_retry(job, gaps, retry_path)
+        
+        self.stats.wall_time = time.time() - started
+        FileUtils.save_json(
+            {
+                "model_id": job.model_id,
+                "token_target": job.token_target,
+                "batch_job": job_path,
+                "results": result_paths,
+                "failed_requests": failed,
+                "missing_results": missing,
+                "retry_requests": retry_requests,
+                **self.stats.summary()
+            },
+            os.path.join(self.dirs["logs"], f"translation_stats_batch_job_{time.strftime('%Y%m%d_%H%M%S')}.json")
+        )
+        
+        if update_progress:
+            currency = price.currency
+            update_progress(100, 
+                f"[批量] 共 {request_count} 个请求，读取结果 {request_count - missing} 个，"
+                f"失败 {failed} 个，截断 {self.stats.truncations} 个"
+            )
+            update_progress(100, 
+                f"[统计] 总计使用 {self.total_tokens} tokens (输入: {self.total_prompt_tokens}, "
+                f"输出: {self.total_completion_tokens})，按批量价格 {currency}"
+                f"{self.stats.prompt_cost + self.stats.completion_cost:.4f}"
+            )
+            if gap_count:
+                update_progress(100, 
+                    f"[批量] {gap_count} 个字段缺失，暂用原文占位"
+                    + (f"，已导出 {retry_requests} 个重试请求到: {retry_path}" if retry_requests else "")
+                )
+            update_progress(100, f"[完成] {len(outputs)} 个插件的翻译结果已保存到: {output_dir}")
+        return outputs
+
+    def _export_batch_retry(self, job: BatchJob, gaps: Dict[str, List[Dict]], retry_path: str) -> int:
+        """将缺失字段按插件重新规划为重试请求，追加到清单并写入重试请求文件，返回请求数
+        
+        出现截断时按一半的 tokens 目标规划，避免重试再次被截断
+        """
+        token_target = job.token_target
+        if self.stats.truncations:
+            token_target = max(300, token_target // 2)
+        planner = BatchPlanner(
+            token_target=token_target,
+            max_output_tokens=int(self.max_completion_tokens * 0.75)
+        )
+        
+        job.rounds += 1
+        lines = []
+        for plugin_name, plugin_gaps in gaps.items():
+            nodes_info = job.plugins[plugin_name]
+            subset = {}
+            for gap in plugin_gaps:
+                node = subset.setdefault(
+                    gap["node_name"], {"title": "", "inputs": {}, "widgets": {}, "outputs": {}}
+                )
+                if gap["section"] == "title":
+                    node["title"] = gap["source"]
+                else:
+                    node[gap["section"]][gap["key"]] = nodes_info[gap["node_name"]][gap["section"]][gap["key"]]
+            
+            for batch_idx, batch in enumerate(planner.plan(subset)):
+                custom_id = f"{plugin_name}::r{job.rounds}-{batch_idx}"
+                lines.append(self._batch_job_line(job, custom_id, plugin_name, batch)[0])
+        
+        BatchJob.write_lines(retry_path, lines)
+        job.save()
+        return len(lines)
+
+    def _run_batches(self, batches: List[Dict], work_dir: str, temp_files: List[str],
+                     update_progress=None, concurrency: int = 1,
+                     planner: BatchPlanner = None) -> List[tuple]:
+        """调度所有批次的翻译、验证和保存
+        
+        同时进行的批次不超过 concurrency 个；任一批次失败时取消尚未开始的批次并抛出异常。
+        调度每个批次前检查预算，将被超出时不再调度新批次，进行中的批次照常完成，
+        未完成批次的结果为 None。
+        启用自动调优时，并发数随调优结果变化，tokens 目标变化后用 planner 重新规划尚未开始的批次
+        
+        Args:
+            batches: 规划好的批次列表
+            work_dir: 工作目录
+            temp_files: 临时文件列表，批次文件会追加到其中
+            update_progress: 进度更新回调函数
+            concurrency: 同时进行的批次请求数
+            planner: 批次规划器，自动调优改变 tokens 目标时用于重新规划
+            
+        Returns:
+            List[tuple]: 按批次顺序排列的 (批次, 修正后结果)，未完成的批次结果为 None
+        """
+        scheduled = []  # [[批次, 结果]]
+        pending = list(batches)
+        skipped = []
+        completed = [0]
+        
+        def total_batches() -> int:
+            return len(scheduled) + len(pending) + len(skipped)
+        
+        def run_batch(batch_idx: int, current_batch: Dict) -> Dict:
+            progress = int((completed[0] / total_batches()) * 100) if total_batches() else 0
+            
+            # 更新进度
+            if update_progress:
+                node_names = list(current_batch.keys())
+                update_progress(progress, f"[翻译] 第 {batch_idx + 1}/{total_batches()} 批: {', '.join(node_names)}")
+            
+            try:
+                started = time.time()
+                truncations = self.stats.truncations
+                
+                # 1. 翻译当前批次（响应被截断时自动拆分重试，未通过校验的节点交给更强的模型）
+                batch_translated = self._translate_with_cascade(current_batch, update_progress, progress)
+                
+                # 2. 验证和修正翻译结果
+                if update_progress:
+                    update_progress(progress, "[验证] 正在验证翻译结果...")
+                    
+                check = self.validator.check_batch(current_batch, batch_translated)
+                if self.memory is not None:
+                    self.memory.add_many(check.learned_titles.items(), TITLE)
+                    self.memory.add_many(check.learned.items(), FIELD)
+                batch_corrected = self._validate_and_correct_batch(
+                    current_batch,
+                    batch_translated,
+                    update_progress,
+                    progress,
+                    check
+                )
+                latency = time.time() - started
+                self.stats.record_batch_latency(latency)
+                
+                if self.tuner:
+                    self._tune(current_batch, check, latency,
+                               self.stats.truncations > truncations, update_progress, progress)
+                
+                # 3. 保存已修正的批次
+                batch_file = os.path.join(
+                    work_dir, 
+                    f"batch_{batch_idx + 1}_translated.json"
+                )
+                FileUtils.save_json(batch_corrected, batch_file)
+                temp_files.append(batch_file)  # 记录临时文件
+                
+                if update_progress:
+                    update_progress(progress, f"[完成] 批次 {batch_idx + 1} 的处理已完成")
+                
+                return batch_corrected
+                
+            except BudgetExceededError as e:
+                if update_progress:
+                    update_progress(progress, f"[预算] 批次 {batch_idx + 1} 未完成: {str(e)}")
+                raise
+            except Exception as e:
+                if update_progress:
+                    update_progress(progress, f"[错误] 批次 {batch_idx + 1} 处理失败: {str(e)}")
+                raise
+        
+        planned_target = planner.token_target if planner else None
+        max_workers = max(1, concurrency, self.tuner.max_concurrency if self.tuner else 1)
+        in_flight = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while pending or in_flight:
+                limit = self.tuner.concurrency if self.tuner else max(1, concurrency)
+                
+                # 自动调优改变了 tokens 目标，重新规划尚未开始的批次
+                if self.tuner and planner and pending and self.tuner.token_target != planned_target:
+                    planned_target = planner.token_target = self.tuner.token_target
+                    pending = planner.plan(self._merge_pending(pending))
+                
+                while pending and len(in_flight) < limit:
+                    current_batch = pending[0]
+                    builder = BatchRequestBuilder(current_batch)
+                    estimate = builder.estimate_tokens(self._instructions_for(builder.terms), self.wire_format)
+                    if self._check_budget(estimate["input"], estimate["output"]):
                         if update_progress:
-                            update_progress(progress, f"[修正] 节点 {node_name} 的 {section} 中缺少键 {key}")
-                        corrected_node[section][key] = key
+                            update_progress(
+                                int((completed[0] / total_batches()) * 100),
+                                f"[预算] {self.stop_reason}，停止调度剩余 {len(pending)} 个批次，"
+                                f"等待进行中的 {len(in_flight)} 个批次完成"
+                            )
+                        skipped.extend(pending)
+                        pending = []
+                        break
+                    pending.pop(0)
+                    scheduled.append([current_batch, None])
+                    batch_idx = len(scheduled) - 1
+                    in_flight[executor.submit(run_batch, batch_idx, current_batch)] = batch_idx
+                
+                if not in_flight:
+                    break
+                
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch_idx = in_flight.pop(future)
+                    try:
+                        scheduled[batch_idx][1] = future.result()
+                    except BudgetExceededError:
+                        # 批次的后续请求（拆分重试等）会超出预算，该批次记为未完成
+                        skipped.extend(pending)
+                        pending = []
+                        continue
+                    except Exception:
+                        # 取消尚未开始的批次，等待进行中的批次结束后抛出
+                        for other in in_flight:
+                            other.cancel()
+                        raise
+                    completed[0] += 1
+        
+        return [tuple(item) for item in scheduled] + [(batch, None) for batch in skipped]
+
+    @staticmethod
+    def _merge_pending(batches: List[Dict]) -> Dict:
+        """将尚未开始的批次合并为节点字典，同一节点被拆分的各部分合并为一个节点"""
+        nodes = {}
+        for batch in batches:
+            for node_name, part in batch.items():
+                if node_name not in nodes:
+                    nodes[node_name] = {"title": "", "inputs": {}, "widgets": {}, "outputs": {}}
+                merged = nodes[node_name]
+                if part.get("title"):
+                    merged["title"] = part["title"]
+                for section in ["inputs", "widgets", "outputs"]:
+                    merged[section].update(part.get(section, {}))
+        return nodes
+
+    def _tune(self, current_batch: Dict, check: BatchCheck, latency: float, truncated: bool,
+              update_progress=None, progress: int = 0):
+        """将批次结果（复用批次校验的结果）提供给自动调优，参数变化时报告"""
+        missing = check.missing()
+        fields = check.fields
+        validated = len(current_batch) - len({issue["node_name"] for issue in missing})
+        
+        # 限流等待、被限流和失败的请求（包括客户端自动重试的请求）都视为拥塞信号
+        with self._tune_lock:
+            signal = (self.stats.rate_limit_wait + ClientManager.throttled_responses +
+                      sum(p.rate_limited + p.failures for pool in self.tiers for p in pool.providers))
+            congested = self._congestion_mark is not None and signal > self._congestion_mark
+            self._congestion_mark = signal
+        
+        builder = BatchRequestBuilder(current_batch)
+        estimate = builder.estimate_tokens(self._instructions_for(builder.terms), self.wire_format)
+        change = self.tuner.observe(
+            validated,
+            latency,
+            estimate["input"] + estimate["output"],
+            truncated=truncated,
+            failure_rate=len(missing) / fields if fields else 0.0,
+            congested=congested
+        )
+        if change and update_progress:
+            update_progress(progress, f"[调优] {change}")
+
+    def _validate_and_correct_batch(self, original_batch: Dict, translated_batch: Dict, 
+                                  update_progress=None, progress: int = 0, check: BatchCheck = None) -> Dict:
+        """验证和修正单个批次的翻译结果
+        
+        缺失或无效的字段先用原文占位，并登记到补译队列，在所有批次完成后统一补译；
+        被翻译成中文的键名还原为原始英文键名。check 为已完成的校验结果，为空时重新校验
+        """
+        check = check or self.validator.check_batch(original_batch, translated_batch)
+        if check.key_repairs:
+            self.stats.increment("key_repairs", check.key_repairs)
+        
+        if update_progress:
+            for node_name in original_batch:
+                if node_name not in translated_batch:
+                    update_progress(progress, f"[修正] 节点 {node_name} 未翻译，暂用原始数据并加入补译队列")
+        
+        for issue in check.issues:
+            if issue["kind"] != "missing":
+                self.stats.increment("untranslated_fields")
+                continue
+            if update_progress and issue["node_name"] in translated_batch and issue["section"] != "title":
+                update_progress(progress, 
+                    f"[修正] 节点 {issue['node_name']} 的 {issue['section']} 中缺少键 {issue['key']}，加入补译队列"
+                )
+            self._queue_repair(issue["node_name"], issue["section"], issue["key"], issue["source"])
+        
+        return check.corrected
+
+    def _queue_repair(self, node_name: str, section: str, key: str, source: str):
+        """登记一个需要补译的字段，section 为 "title" 时表示节点标题"""
+        if source:
+            with self._repair_lock:
+                self.repair_queue.append({
+                    "node_name": node_name,
+                    "section": section,
+                    "key": key,
+                    "source": source
+                })
+
+    def _repair_missing_fields(self, nodes_info: Dict, translated_nodes: Dict, token_target: int,
+                               update_progress=None) -> int:
+        """对整个运行中缺失的字段统一补译，并合并回翻译结果
+        
+        补译请求只包含缺失字段及其所属节点标题，请求数量与缺失规模成正比
+        
+        Args:
+            nodes_info: 原始节点信息
+            translated_nodes: 已合并的翻译结果，补译结果直接写入
+            token_target: 每个补译请求的估算 tokens 上限
+            update_progress: 进度更新回调函数
             
-            corrected_batch[node_name] = corrected_node
+        Returns:
+            int: 成功补译的字段数
+        """
+        gaps = []
+        for gap in self.repair_queue:
+            if gap["node_name"] in nodes_info:
+                gap["node_title"] = nodes_info[gap["node_name"]].get("title", "")
+                gaps.append(gap)
+        self.repair_queue = []
+        if not gaps:
+            return 0
         
-        return corrected_batch
+        # 按估算 tokens 将缺失字段分成若干个小请求
+        chunks = [[]]
+        chunk_tokens = 0
+        for gap in gaps:
+            gap_tokens = sum(BatchPlanner.term_cost(gap["source"])) + BatchPlanner.term_cost(gap["node_title"])[0]
+            if chunks[-1] and chunk_tokens + gap_tokens > token_target:
+                chunks.append([])
+                chunk_tokens = 0
+            chunks[-1].append(gap)
+            chunk_tokens += gap_tokens
+        
+        if update_progress:
+            update_progress(92, f"[补译] 共 {len(gaps)} 个缺失字段，分 {len(chunks)} 次请求补译")
+        
+        repaired_count = 0
+        for chunk in chunks:
+            builder = RepairRequestBuilder(chunk)
+            self.stats.increment("repair_requests")
+            try:
+                translations = self._request_translations(
+                    self._with_examples(
+                        builder.build_user_message(),
+                        [g["source"] for g in chunk if g["section"] == "title"],
+                        [g["source"] for g in chunk if g["section"] != "title"]
+                    ),
+                    update_progress, 92,
+                    estimated_output=sum(TokenEstimator.estimate_translation(g["source"]) for g in chunk),
+                    glossary_texts=[g["source"] for g in chunk] + [g["node_title"] for g in chunk],
+                    term_count=len(chunk)
+                )
+            except BudgetExceededError as e:
+                if update_progress:
+                    update_progress(92, f"[预算] {str(e)}，停止补译，其余字段保留原文")
+                break
+            except IncompleteResponseError as e:
+                # 补译请求本身很小，不再拆分，保留已收到的部分
+                translations = e.partial
+            except Exception as e:
+                if update_progress:
+                    update_progress(92, f"[警告] 补译请求失败，保留原文: {str(e)}")
+                continue
+            
+            for gap, value in builder.apply_translations(translations):
+                node = translated_nodes.setdefault(
+                    gap["node_name"], 
+                    {"title": gap["node_title"], "inputs": {}, "widgets": {}, "outputs": {}}
+                )
+                if gap["section"] == "title":
+                    node["title"] = value
+                else:
+                    node.setdefault(gap["section"], {})[gap["key"]] = value
+                repaired_count += 1
+        
+        self.stats.increment("repair_fields", len(gaps))
+        self.stats.increment("repaired_fields", repaired_count)
+        if update_progress:
+            update_progress(93, f"[补译] 成功补译 {repaired_count}/{len(gaps)} 个字段")
+        return repaired_count
 
     def _final_validation(self, original_nodes: Dict, translated_nodes: Dict, 
                          update_progress=None) -> Dict:
@@ -319,34 +1276,301 @@ class Translator:
         
         return final_nodes
 
-    def _translate_batch(self, current_batch: Dict, update_progress=None, progress=0) -> Dict:
+    def _translate_batch(self, current_batch: Dict, update_progress=None, progress=0, tier: int = 0) -> Dict:
         """翻译单个批次
         
         Args:
             current_batch: 当前批次的数据
             update_progress: 进度更新回调函数
             progress: 当前进度
+            tier: 使用的模型梯队
             
         Returns:
             Dict: 翻译后的节点信息
         """
-        translated_text = ""
+        # 提取批次内去重后的词条，生成紧凑的请求内容
+        builder = BatchRequestBuilder(current_batch)
+        instructions = self._instructions_for(builder.terms)
+        estimate = builder.estimate_tokens(instructions, self.wire_format)
+        self.stats.add_estimate(
+            estimate["legacy_input"] + estimate["legacy_output"],
+            estimate["input"] + estimate["output"],
+            estimate["input"],
+            estimate["output"]
+        )
+        
+        if update_progress:
+            update_progress(progress, 
+                f"[统计] 当前批次 {len(current_batch)} 个节点去重后共 {len(builder.terms)} 个词条，"
+                f"预估 {estimate['legacy_input'] + estimate['legacy_output']} → "
+                f"{estimate['input'] + estimate['output']} tokens，"
+                f"提示词说明 {TokenEstimator.estimate(instructions)} tokens"
+            )
+        
+        # 流式输出时，节点的全部词条收到后立即提交并报告进度
+        pending_ids = builder.node_term_ids()
+        completed_nodes = []
+        
+        def on_entry(term_id: str, value):
+            if not BatchRequestBuilder.is_valid_value(value):
+                return
+            for node_name, ids in pending_ids.items():
+                if term_id in ids:
+                    ids.discard(term_id)
+                    if not ids:
+                        completed_nodes.append(node_name)
+                        if update_progress:
+                            update_progress(progress, 
+                                f"[流式] 节点 {node_name} 已完成 ({len(completed_nodes)}/{len(pending_ids)})"
+                            )
+        
+        try:
+            translations = self._request_translations(
+                self._with_examples(builder.build_user_message(self.wire_format), *builder.split_terms()),
+                update_progress, progress, on_entry,
+                estimated_output=estimate["output"],
+                tier=tier,
+                glossary_texts=builder.terms,
+                wire_format=self.wire_format,
+                term_count=len(builder.terms)
+            )
+        except IncompleteResponseError as e:
+            if isinstance(e, TruncatedResponseError):
+                self.stats.record_truncation(len(current_batch), len(builder.terms), estimate["output"])
+            if not e.partial:
+                raise
+            
+            # 保留已收到的部分，只重新请求剩余词条
+            received = builder.apply_translations(e.partial)
+            remaining = builder.remaining_batch(e.partial)
+            self.stats.increment("stream_resumes")
+            if update_progress:
+                update_progress(progress, 
+                    f"[流式] {str(e)}，已收到 {len(e.partial)}/{len(builder.terms)} 个词条，"
+                    f"重新请求剩余部分: {', '.join(remaining.keys())}"
+                )
+            
+            merged = {}
+            BatchPlanner.merge_translated(merged, received)
+            if remaining:
+                BatchPlanner.merge_translated(
+                    merged, 
+                    self._translate_batch_with_bisect(remaining, update_progress, progress, tier)
+                )
+            return merged
+        
+        # 将编号译文映射回每个节点的每一处出现位置
+        return builder.apply_translations(translations)
+
+    def _request_translations(self, user_message: str, update_progress=None, progress=0,
+                              on_entry=None, estimated_output: int = 0, tier: int = 0,
+                              glossary_texts: List[str] = None, wire_format: str = "json",
+                              term_count: int = None) -> Dict:
+        """发送一次翻译请求并解析返回的编号译文
+        
+        发送前检查预算，会超出上限时抛出 BudgetExceededError；
+        启用对冲时，请求超过近期耗时百分位仍未完成则再发出一个相同的请求，先成功的结果生效
+        
+        Args:
+            user_message: 用户消息
+            update_progress: 进度更新回调函数
+            progress: 当前进度
+            on_entry: 流式输出时每收到一个完整词条调用的回调函数 (编号, 译文)
+            estimated_output: 估算的输出 tokens，用于预算检查
+            tier: 使用的模型梯队
+            glossary_texts: 用于选择术语的原文，为空时附带完整术语表
+            wire_format: 响应的格式，json 或 lines
+            term_count: 请求的词条数量（编号为 0..n-1），指定时按 Schema 校验响应，
+                        并按运行的响应格式请求结构化输出
+            
+        Returns:
+            Dict: 编号到译文的映射，不符合 Schema 的词条被丢弃，交由批次校验登记补译
+        """
+        response_format = None
+        if term_count is not None and wire_format == "json":
+            response_format = build_response_format(self.response_format, term_count)
         
-        messages = [
-            {"role": "system", "content": self.system_prompt},
-            {"role": "user", "content": f"请翻译以下节点信息:\n{json.dumps(current_batch, indent=2, ensure_ascii=False)}"}
+        translations = self._send_with_hedge(user_message, update_progress, progress, on_entry,
+                                             estimated_output, tier, glossary_texts, wire_format, response_format)
+        if term_count is None:
+            return translations
+        
+        # 一次遍历校验全部词条：缺失、多余、非字符串或为空
+        valid, errors = SchemaValidator.for_terms(term_count).validate(translations)
+        if errors:
+            self.stats.increment("schema_violations", len(errors))
+            if update_progress:
+                update_progress(progress, 
+                    f"[校验] 响应中 {len(errors)} 个词条不符合格式: {'，'.join(errors[:5])}"
+                    + ("…" if len(errors) > 5 else "")
+                )
+        return valid
+
+    def _send_with_hedge(self, user_message: str, update_progress=None, progress=0, on_entry=None,
+                         estimated_output: int = 0, tier: int = 0, glossary_texts: List[str] = None,
+                         wire_format: str = "json", response_format: Dict = None) -> Dict:
+        """检查预算后发送请求，启用对冲时按耗时百分位发出对冲请求，参数同 _request_translations"""
+        messages = self._build_messages(user_message, glossary_texts)
+        self.stats.increment("system_prompt_tokens", TokenEstimator.estimate(self._instructions_for(glossary_texts)))
+        self.stats.increment("full_system_prompt_tokens", TokenEstimator.estimate(self.system_prompt))
+        
+        estimated_input = sum(TokenEstimator.estimate(m["content"]) for m in messages)
+        if self._check_budget(estimated_input, estimated_output):
+            raise BudgetExceededError(self.stop_reason)
+        
+        delay = self.hedge.delay() if self.hedge else None
+        if delay is None:
+            return self._send_request(messages, estimated_input, update_progress, progress, on_entry,
+                                      tier=tier, wire_format=wire_format, response_format=response_format)
+        
+        # 所有请求共用已使用的服务集合，对冲请求优先发往其他服务
+        used_providers = set()
+        attempts = {}
+        
+        def attempt(index: int, cancel) -> Dict:
+            attempts[index] = {"cancel": cancel, "providers": used_providers, "tokens": 0}
+            return self._send_request(
+                messages, estimated_input, update_progress, progress,
+                # 只有原始请求报告流式进度，避免重复提示
+                on_entry if index == 0 else None,
+                attempts[index],
+                tier,
+                wire_format,
+                response_format
+            )
+        
+        def on_hedge(index: int):
+            self.stats.increment("hedges")
+            if update_progress:
+                update_progress(progress, f"[对冲] 请求超过 {delay:.1f} 秒未完成，发出第 {index} 个对冲请求")
+        
+        def on_discard(index: int):
+            self.stats.increment("hedge_extra_tokens", attempts[index]["tokens"])
+        
+        winner, translations = hedged_call(attempt, delay, self.hedge.max_hedges, on_hedge, on_discard)
+        if winner:
+            self.stats.increment("hedge_wins")
+        return translations
+
+    def _instructions_for(self, texts: List[str] = None) -> str:
+        """请求中的提示词说明（固定规则 + 术语表），裁剪时只包含原文中出现的术语，用于估算 tokens"""
+        if not self.trim_prompt or texts is None:
+            return self.system_prompt
+        return self.glossary.system_prompt(texts)
+
+    def _build_messages(self, user_message: str, texts: List[str] = None) -> List[Dict]:
+        """生成请求消息
+        
+        系统消息只包含固定规则，在整个运行中逐字节相同，作为可被服务商缓存的前缀；
+        随批次变化的术语表放在用户消息开头。不裁剪术语表时系统消息为完整提示词，同样固定不变
+        
+        Args:
+            user_message: 用户消息
+            texts: 用于选择术语的原文，为空时使用完整提示词
+            
+        Returns:
+            List[Dict]: 请求消息
+        """
+        if not self.trim_prompt or texts is None:
+            return [
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": user_message}
+            ]
+        
+        section = self.glossary.section(texts)
+        return [
+            {"role": "system", "content": TRANSLATOR_CORE_PROMPT},
+            {"role": "user", "content": f"{section}\n\n{user_message}" if section else user_message}
         ]
+
+    def _with_examples(self, user_message: str, titles: List[str], fields: List[str]) -> str:
+        """在用户消息前附加翻译记忆中与原文相似的同类已有译文，作为参考示例
+        
+        标题只参考标题的译文、字段只参考字段的译文；标题最多占一半的示例数（没有字段时可以全部使用）
         
-        completion = self.client.chat.completions.create(
-            model=self.model_id,
-            messages=messages,
-            temperature=0.3,
-            max_tokens=2048,
-            response_format={"type": "text"},
-            top_p=0.95,
-            presence_penalty=0,
-            timeout=30  # deepseek 可能需要更长的响应时间
+        Args:
+            user_message: 用户消息
+            titles: 请求中的标题原文
+            fields: 请求中的字段原文
+            
+        Returns:
+            str: 附加参考示例后的用户消息
+        """
+        if self.memory is None or not self.memory.examples:
+            return user_message
+        title_limit = self.memory.examples // 2 if fields else self.memory.examples
+        title_examples = self.memory.examples_for(titles, TITLE, title_limit)
+        field_examples = self.memory.examples_for(fields, FIELD, self.memory.examples - len(title_examples))
+        if not title_examples and not field_examples:
+            return user_message
+        self.stats.increment("memory_examples", len(title_examples) + len(field_examples))
+        section = TranslationMemory.build_examples_section(field_examples, title_examples)
+        return f"{section}\n\n{user_message}"
+
+    def _create_completion(self, p: Provider, messages: List[Dict], response_format: Dict = None, **options):
+        """通过上下文缓存调整请求后发送到指定服务"""
+        client, messages, extra_body = self.context_cache.prepare(p, messages)
+        if extra_body:
+            options["extra_body"] = {**options.get("extra_body", {}), **extra_body}
+        return client.chat.completions.create(
+            model=p.model_id, **self._request_params(messages, response_format), **options
+        )
+
+    def _request_params(self, messages: List[Dict], response_format: Dict = None) -> Dict:
+        """翻译请求的参数（不含模型），在线请求和离线批量任务共用"""
+        return {
+            "messages": messages,
+            "temperature": 0.3,
+            "max_tokens": self.max_completion_tokens,
+            "response_format": response_format or {"type": "text"},
+            "top_p": 0.95,
+            "presence_penalty": 0
+        }
+
+    def _send_request(self, messages: List[Dict], estimated_input: int, update_progress=None, progress=0,
+                      on_entry=None, attempt: Dict = None, tier: int = 0, wire_format: str = "json",
+                      response_format: Dict = None) -> Dict:
+        """通过模型梯队的服务池发送一个请求并解析返回的编号译文
+        
+        Args:
+            messages: 请求消息
+            estimated_input: 估算的输入 tokens，用于限流
+            update_progress: 进度更新回调函数
+            progress: 当前进度
+            on_entry: 流式输出时每收到一个完整词条调用的回调函数 (编号, 译文)
+            attempt: 对冲请求的状态 {"cancel": 取消标志, "providers": 已使用的服务, "tokens": 本请求用量}
+            tier: 使用的模型梯队
+            wire_format: 响应的格式，json 或 lines
+            response_format: 请求的 response_format，为空时为普通文本
+            
+        Returns:
+            Dict: 编号到译文的映射
+        """
+        self.stats.increment("requests")
+        self.stats.add_tier(tier, requests=1)
+        if self.stream:
+            return self._request_translations_stream(messages, update_progress, progress, on_entry,
+                                                     estimated_input, attempt, tier, wire_format, response_format)
+        
+        cancel = attempt["cancel"] if attempt else None
+        
+        def create(p: Provider):
+            if attempt:
+                attempt["providers"].add(p)
+            return self._create_completion(p, messages, response_format=response_format)
+        
+        # 由服务池选择服务并获取限流配额，失败时自动切换
+        started = time.time()
+        completion, provider, waited = self.tiers[tier].call(
+            create,
+            estimated_input,
+            avoid=set(attempt["providers"]) if attempt else (),
+            cancelled=cancel
         )
+        if waited:
+            self.stats.increment("rate_limit_wait", waited)
+        if self.hedge:
+            self.hedge.record(time.time() - started - waited)
         
         # deepseek 模型可能会返回 reasoning_content
         if hasattr(completion.choices[0].message, 'reasoning_content'):
@@ -358,297 +1582,481 @@ class Translator:
             prompt_tokens = completion.usage.prompt_tokens
             completion_tokens = completion.usage.completion_tokens
             batch_tokens = completion.usage.total_tokens
+            cached_tokens = self._cached_tokens(completion.usage)
             
-            self.total_prompt_tokens += prompt_tokens
-            self.total_completion_tokens += completion_tokens
-            self.total_tokens += batch_tokens
+            self._add_usage(prompt_tokens, completion_tokens, batch_tokens, provider.price, tier, cached_tokens)
+            if attempt:
+                attempt["tokens"] += batch_tokens
             
             if update_progress:
                 update_progress(progress, 
                     f"[统计] 当前批次使用 {batch_tokens} tokens "
-                    f"(输入: {prompt_tokens}, 输出: {completion_tokens}), "
+                    f"(输入: {prompt_tokens}, 其中缓存命中: {cached_tokens}, 输出: {completion_tokens}), "
                     f"累计: {self.total_tokens} tokens"
                 )
         
+        # 对冲请求中另一个请求已先完成，丢弃本次结果
+        if cancel is not None and cancel.is_set():
+            raise RequestCancelledError("对冲请求已被取消")
+        
         translated_text = completion.choices[0].message.content
         
-        # 检查响应内容
-        if not translated_text or len(translated_text) < 10:
+        # 检查响应内容（紧凑格式下单个词条的响应也很短，只排除空响应）
+        if not translated_text or not translated_text.strip():
             raise Exception("API 响应内容异常")
         
-        # 提取 JSON 内容
-        json_start = translated_text.find('{')
-        json_end = translated_text.rfind('}') + 1
+        finish_reason = completion.choices[0].finish_reason
+        if wire_format == "lines":
+            return self._parse_lines_response(translated_text, finish_reason)
+        
+        # 检查响应是否被截断，已完整输出的词条保留下来，只补译缺少的编号
+        if finish_reason == "length" or self._is_json_truncated(translated_text):
+            parser = IncrementalJSONParser()
+            partial = dict(parser.feed(translated_text))
+            self.stats.increment("parse_errors", parser.errors)
+            raise TruncatedResponseError(f"响应被截断 (finish_reason: {finish_reason})", partial)
+        
+        return self._parse_json_response(translated_text)
+
+    def _parse_json_response(self, text: str) -> Dict:
+        """解析 JSON 格式的完整响应（普通文本或结构化输出）
+        
+        整体解析失败时改用增量解析器逐个解析键值对，格式错误的词条被跳过，
+        由 Schema 校验和批次校验登记补译；一个词条都解析不出时才视为无法解析的响应
+        
+        Args:
+            text: 响应内容，JSON 对象前后可能有说明文字或代码块标记
+            
+        Returns:
+            Dict: 编号到译文的映射
+        """
+        json_start = text.find('{')
+        json_end = text.rfind('}') + 1
         if json_start >= 0 and json_end > json_start:
-            json_content = translated_text[json_start:json_end]
-            batch_translated = json.loads(json_content)
+            try:
+                translations = json.loads(text[json_start:json_end])
+                if isinstance(translations, dict):
+                    return translations
+            except json.JSONDecodeError:
+                pass
             
-            return batch_translated
+            parser = IncrementalJSONParser()
+            translations = dict(parser.feed(text[json_start:json_end]))
+            self.stats.increment("parse_errors", parser.errors)
+            if translations:
+                return translations
         
+        self.stats.increment("parse_failures")
         raise Exception("API 响应格式不正确")
 
-    def _validate_batch_files(self, source_file: str, translated_file: str) -> tuple[bool, Dict, str]:
-        """通过三步校对修正流程处理翻译结果，并生成详细日志"""
+    def _parse_lines_response(self, text: str, finish_reason: str) -> Dict:
+        """解析逐行格式的完整响应
+        
+        格式错误的行被跳过，对应词条交给补译；缺少结束标记或被截断时抛出 TruncatedResponseError，
+        其中保存已解析的词条，只需重新请求剩余部分
+        
+        Args:
+            text: 响应内容
+            finish_reason: 结束原因
+            
+        Returns:
+            Dict: 编号到译文的映射
+        """
+        parser = LineParser()
+        translations = dict(parser.feed(text))
+        if finish_reason != "length":
+            translations.update(parser.finish())
+        self.stats.increment("parse_errors", parser.errors)
+        
+        if finish_reason == "length" or not parser.finished:
+            raise TruncatedResponseError(f"响应被截断 (finish_reason: {finish_reason})", translations)
+        if not translations:
+            self.stats.increment("parse_failures")
+            raise Exception("API 响应格式不正确")
+        return translations
+
+    def _request_translations_stream(self, messages: List[Dict], update_progress=None, progress=0,
+                                     on_entry=None, estimated_input: int = 0, attempt: Dict = None,
+                                     tier: int = 0, wire_format: str = "json",
+                                     response_format: Dict = None) -> Dict:
+        """以流式输出发送翻译请求，边接收边解析
+        
+        连接中断或响应被截断时抛出 IncompleteResponseError，其中保存已收到的词条；
+        作为对冲请求被取消时关闭连接，停止生成
+        
+        Args:
+            messages: 请求消息
+            update_progress: 进度更新回调函数
+            progress: 当前进度
+            on_entry: 每收到一个完整词条调用的回调函数 (编号, 译文)
+            estimated_input: 估算的输入 tokens，用于限流
+            attempt: 对冲请求的状态
+            tier: 使用的模型梯队
+            wire_format: 响应的格式，json 或 lines
+            response_format: 请求的 response_format，为空时为普通文本
+            
+        Returns:
+            Dict: 编号到译文的映射
+        """
+        translations = {}
+        parser = LineParser() if wire_format == "lines" else IncrementalJSONParser()
+        received_text = []
+        finish_reason = None
+        usage = None
+        provider = None
+        cancel = attempt["cancel"] if attempt else None
+        cancelled = False
+        pool = self.tiers[tier]
+        
+        def create(p: Provider):
+            if attempt:
+                attempt["providers"].add(p)
+            return self._create_completion(
+                p,
+                messages,
+                response_format=response_format,
+                stream=True,
+                extra_body={"stream_options": {"include_usage": True}}
+            )
+        
         try:
-            # 读取文件
-            with open(source_file, 'r', encoding='utf-8') as f:
-                original_batch = json.load(f)
-            with open(translated_file, 'r', encoding='utf-8') as f:
-                translated_batch = json.load(f)
-            
-            batch_num = os.path.basename(translated_file).split('_')[1]
-            log_entries = []
-            log_entries.append(f"批次 {batch_num} 校验修正日志")
-            log_entries.append("=" * 50)
-            
-            # 第一步：建立标准映射关系
-            from .translation_config import TranslationConfig
-            standard_translations = {
-                **TranslationConfig.COMMON_TRANSLATIONS,
-                **TranslationConfig.BODY_PART_TRANSLATIONS
-            }
+            started = time.time()
+            stream, provider, waited = pool.call(
+                create,
+                estimated_input,
+                avoid=set(attempt["providers"]) if attempt else (),
+                cancelled=cancel
+            )
+            if waited:
+                self.stats.increment("rate_limit_wait", waited)
             
-            # 第二步：修正所有节点
-            corrected_batch = {}
-            log_entries.append("\n节点修正")
-            log_entries.append("-" * 30)
-            
-            for node_name, node_data in original_batch.items():
-                log_entries.append(f"\n节点: {node_name}")
-                corrected_node = {
-                    "title": translated_batch[node_name]["title"] if node_name in translated_batch else node_data["title"],
-                    "inputs": {},
-                    "outputs": {},
-                    "widgets": {}
-                }
+            for chunk in stream:
+                if cancel is not None and cancel.is_set():
+                    # 对冲请求中另一个请求已先完成，关闭连接停止生成
+                    stream.close()
+                    cancelled = True
+                    break
                 
-                # 处理每个部分
-                for section in ["inputs", "outputs", "widgets"]:
-                    if section in node_data:
-                        log_entries.append(f"\n{section}:")
-                        
-                        # 获取原始数据和翻译后的数据
-                        orig_section = node_data[section]
-                        trans_section = translated_batch.get(node_name, {}).get(section, {})
-                        
-                        # 使用原始文件中的键
-                        for orig_key in orig_section.keys():
-                            # 1. 如果是特殊类型值，保持不变
-                            if orig_key.upper() in TranslationConfig.PRESERVED_TYPES:
-                                corrected_node[section][orig_key] = orig_key.upper()
-                                log_entries.append(f"保留特殊类型: {orig_key}")
-                                continue
-                            
-                            # 2. 如果在标准映射中存在对应的翻译
-                            if orig_key.lower() in standard_translations:
-                                corrected_node[section][orig_key] = standard_translations[orig_key.lower()]
-                                log_entries.append(f"使用标准映射: {orig_key} -> {standard_translations[orig_key.lower()]}")
-                                continue
-                            
-                            # 3. 如果在翻译后的数据中有对应的中文值
-                            if orig_key in trans_section:
-                                trans_value = trans_section[orig_key]
-                                # 如果值是中文，使用它
-                                if any('\u4e00' <= char <= '\u9fff' for char in str(trans_value)):
-                                    corrected_node[section][orig_key] = trans_value
-                                    log_entries.append(f"使用翻译值: {orig_key} -> {trans_value}")
-                                    continue
-                        
-                            # 4. 如果都没有找到合适的翻译，保持原值
-                            corrected_node[section][orig_key] = orig_key
-                            log_entries.append(f"保持原值: {orig_key}")
+                # 开启 include_usage 后最后一个数据块只包含 usage
+                if getattr(chunk, "usage", None):
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
                 
-                corrected_batch[node_name] = corrected_node
-            
-            # 保存修正后的结果
-            corrected_file = os.path.join(self.dirs["temp"], f"batch_{batch_num}_corrected.json")
-            FileUtils.save_json(corrected_batch, corrected_file)
-            
-            # 保存详细日志
-            log_file = os.path.join(self.dirs["logs"], 
-                                  f"batch_{batch_num}_correction_log_{time.strftime('%Y%m%d_%H%M%S')}.txt")
-            with open(log_file, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(log_entries))
-            
-            return True, corrected_batch, '\n'.join(log_entries)
-            
+                choice = chunk.choices[0]
+                content = choice.delta.content if choice.delta else None
+                if content:
+                    received_text.append(content)
+                    for term_id, value in parser.feed(content):
+                        translations[term_id] = value
+                        if on_entry:
+                            on_entry(term_id, value)
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+                    
+        except RequestCancelledError:
+            raise
         except Exception as e:
-            return False, translated_batch, f"修正过程出错: {str(e)}"
+            price = None
+            if provider:
+                # 连接建立后中途断开，计入该服务的失败
+                pool.record_failure(provider, e, completed=True)
+                price = provider.price
+            tokens = self._add_stream_usage(usage, messages, "".join(received_text), update_progress, progress,
+                                            price, tier)
+            if attempt:
+                attempt["tokens"] += tokens
+            if translations:
+                raise IncompleteResponseError(f"流式连接中断: {str(e)}", translations)
+            raise
+        
+        tokens = self._add_stream_usage(usage, messages, "".join(received_text), update_progress, progress,
+                                        provider.price, tier)
+        if attempt:
+            attempt["tokens"] += tokens
+        if cancelled:
+            raise RequestCancelledError("对冲请求已被取消")
+        if self.hedge:
+            self.hedge.record(time.time() - started - waited)
+        
+        # 正常结束时解析逐行格式最后一行没有换行符的内容
+        if finish_reason == "stop":
+            for term_id, value in parser.finish():
+                translations[term_id] = value
+                if on_entry:
+                    on_entry(term_id, value)
+        self.stats.increment("parse_errors", parser.errors)
+        
+        if finish_reason == "length" or not parser.finished:
+            raise TruncatedResponseError(f"响应被截断 (finish_reason: {finish_reason})", translations)
+        
+        if not translations:
+            self.stats.increment("parse_failures")
+            raise Exception("API 响应格式不正确")
+        
+        return translations
 
-    def _is_valid_translation(self, english_key: str, chinese_text: str) -> bool:
-        """检查中文文本是否是英文键的合理翻译
+    def _add_stream_usage(self, usage, messages: List[Dict], received_text: str,
+                          update_progress=None, progress=0, price: PriceTable = None, tier: int = 0) -> int:
+        """累计流式请求的 tokens 使用量，服务商未返回 usage 时按文本估算，返回本次请求的 tokens"""
+        if usage:
+            prompt_tokens = usage.prompt_tokens
+            completion_tokens = usage.completion_tokens
+            cached_tokens = self._cached_tokens(usage)
+            source = ""
+        else:
+            prompt_tokens = sum(TokenEstimator.estimate(m["content"]) for m in messages)
+            completion_tokens = TokenEstimator.estimate(received_text)
+            cached_tokens = 0
+            source = "估算"
+        
+        self._add_usage(prompt_tokens, completion_tokens, price=price, tier=tier, cached_tokens=cached_tokens)
+        if update_progress:
+            update_progress(progress, 
+                f"[统计] 当前批次使用 {prompt_tokens + completion_tokens} tokens{source} "
+                f"(输入: {prompt_tokens}, 其中缓存命中: {cached_tokens}, 输出: {completion_tokens}), "
+                f"累计: {self.total_tokens} tokens"
+            )
+        return prompt_tokens + completion_tokens
+
+    @staticmethod
+    def _cached_tokens(usage) -> int:
+        """usage 中命中上下文缓存的输入 tokens（prompt_tokens_details.cached_tokens），服务商未返回时为 0"""
+        details = usage.get("prompt_tokens_details") if isinstance(usage, dict) else \
+            getattr(usage, "prompt_tokens_details", None)
+        if isinstance(details, dict):
+            return details.get("cached_tokens") or 0
+        return getattr(details, "cached_tokens", None) or 0
+
+    def _add_usage(self, prompt_tokens: int, completion_tokens: int, total_tokens: int = None,
+                   price: PriceTable = None, tier: int = 0, cached_tokens: int = 0):
+        """按实际使用服务的价格累计 tokens 使用量和费用到运行统计、模型梯队统计和所有预算"""
+        prompt_cost, completion_cost = (price or self.price).cost(
+            prompt_tokens or 0, completion_tokens or 0, cached_tokens or 0
+        )
+        self.stats.add_usage(prompt_tokens, completion_tokens, total_tokens)
+        self.stats.increment("cached_tokens", cached_tokens or 0)
+        self.stats.add_cost(prompt_cost, completion_cost)
+        self.stats.add_tier(
+            tier,
+            prompt_tokens=prompt_tokens or 0,
+            completion_tokens=completion_tokens or 0,
+            cost=prompt_cost + completion_cost
+        )
+        for budget in self.budgets:
+            budget.add_usage(prompt_tokens, completion_tokens, prompt_cost + completion_cost)
+
+    def _check_budget(self, prompt_tokens: int = 0, completion_tokens: int = 0):
+        """检查下一个请求是否会超出任一预算，超出时记录并返回停止原因"""
+        for budget in self.budgets:
+            reason = budget.check(prompt_tokens, completion_tokens)
+            if reason:
+                if not self.stop_reason:
+                    self.stop_reason = reason
+                return self.stop_reason
+        return None
+
+    def _write_budget_journal(self, plugin_name: str, nodes_info: Dict, done_nodes: Dict,
+                              update_progress=None):
+        """记录因预算停止时已完成和未完成的节点，未完成的节点可直接作为下次翻译的输入"""
+        self.budget_journal = {
+            "plugin": plugin_name,
+            "reason": self.stop_reason,
+            "budgets": [budget.summary() for budget in self.budgets],
+            "stats": self.stats.summary(),
+            "done_nodes": list(done_nodes.keys()),
+            "pending_nodes": {
+                name: info for name, info in nodes_info.items() if name not in done_nodes
+            }
+        }
+        journal_file = os.path.join(
+            self.dirs["logs"], 
+            f"budget_journal_{plugin_name}_{time.strftime('%Y%m%d_%H%M%S')}.json"
+        )
+        FileUtils.save_json(self.budget_journal, journal_file)
+        if update_progress:
+            update_progress(94, 
+                f"[预算] {len(self.budget_journal['pending_nodes'])} 个未完成节点已记录到: {journal_file}"
+            )
+
+    @staticmethod
+    def _is_json_truncated(text: str) -> bool:
+        """检查响应中的 JSON 对象是否不完整（括号未闭合或字符串未结束）"""
+        json_start = text.find('{')
+        if json_start < 0:
+            return False
+        
+        depth = 0
+        in_string = False
+        escaped = False
+        for char in text[json_start:]:
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == '\\':
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char in '{[':
+                depth += 1
+            elif char in '}]':
+                depth -= 1
+                if depth == 0:
+                    return False
+        return True
+
+    def _translate_with_cascade(self, current_batch: Dict, update_progress=None, progress=0) -> Dict:
+        """按模型梯队翻译批次
+        
+        先用第一梯队翻译整个批次，未通过校验的节点（缺失、字段缺失或未翻译）交给下一梯队重新翻译，
+        请求出错（如 JSON 格式错误）时整个批次交给下一梯队；只有一个梯队时等同于直接翻译
         
         Args:
-            english_key: 英文键名
-            chinese_text: 中文文本
+            current_batch: 当前批次的数据
+            update_progress: 进度更新回调函数
+            progress: 当前进度
             
         Returns:
-            bool: 是否是合理的翻译
+            Dict: 翻译后的节点信息，后面梯队的结果覆盖前面梯队未通过校验的节点
         """
-        # 定义常见翻译对照
-        translations = {
-            'image': {'图像', '图片'},
-            'mask': {'遮罩', '掩码', '蒙版'},
-            'model': {'模型'},
-            'processor': {'处理器'},
-            'device': {'设备'},
-            'bbox': {'边界框', '边框'},
-            'samples': {'样本'},
-            'operation': {'操作'},
-            'guide': {'引导图'},
-            'radius': {'半径'},
-            'epsilon': {'epsilon', 'eps'},
-            'threshold': {'阈值'},
-            'contrast': {'对比度'},
-            'brightness': {'亮度'},
-            'saturation': {'饱和度'},
-            'hue': {'色调'},
-            'gamma': {'伽马'}
-        }
+        translated = {}
+        remaining = current_batch
+        last_tier = len(self.tiers) - 1
+        for tier in range(len(self.tiers)):
+            self.stats.add_tier(tier, batches=1, nodes=len(remaining))
+            try:
+                result = self._translate_batch_with_bisect(remaining, update_progress, progress, tier)
+            except BudgetExceededError:
+                raise
+            except Exception as e:
+                if tier == last_tier:
+                    raise
+                if update_progress:
+                    update_progress(progress, 
+                        f"[升级] {self.tiers[tier].providers[0].label} 翻译失败: {str(e)}，"
+                        f"{len(remaining)} 个节点交给 {self.tiers[tier + 1].providers[0].label}"
+                    )
+                self.stats.add_tier(tier, escalated_nodes=len(remaining))
+                continue
+            
+            BatchPlanner.merge_translated(translated, result)
+            if tier == last_tier:
+                break
+            
+            failed = self._failed_nodes(remaining, result)
+            if not failed:
+                break
+            self.stats.add_tier(tier, escalated_nodes=len(failed))
+            if update_progress:
+                update_progress(progress, 
+                    f"[升级] {len(failed)} 个节点未通过校验，交给 {self.tiers[tier + 1].providers[0].label}: "
+                    f"{', '.join(failed)}"
+                )
+            remaining = {name: remaining[name] for name in failed}
         
-        return chinese_text in translations.get(english_key, set())
+        return translated
+
+    def _failed_nodes(self, original_batch: Dict, translated_batch: Dict) -> List[str]:
+        """找出未通过校验的节点：节点或字段缺失、译文为空或未翻译"""
+        return self.validator.check_batch(original_batch, translated_batch).failed_nodes
 
-    def _final_validate_and_correct(self, original_file: str, final_translated_file: str) -> tuple[bool, Dict, str]:
-        """最终校验和修正，通过建立中英文映射关系来修正键名"""
+    def _report_tiers(self, update_progress, currency: str):
+        """报告各模型梯队的批次、请求和费用，以及与全部使用最强模型相比节省的费用"""
+        tiers = self.stats.tier_summary()
+        for tier, pool in enumerate(self.tiers):
+            tier_stats = tiers.get(tier)
+            if not tier_stats:
+                continue
+            update_progress(100, 
+                f"[梯队] 第 {tier + 1} 梯队 {pool.providers[0].label}: {tier_stats['nodes']} 个节点，"
+                f"{tier_stats['requests']} 次请求，{tier_stats['prompt_tokens'] + tier_stats['completion_tokens']} tokens "
+                f"({currency}{tier_stats['cost']:.4f})"
+                + (f"，{tier_stats['escalated_nodes']} 个节点升级" if tier_stats["escalated_nodes"] else "")
+            )
+        
+        # 假设第一梯队的全部请求改用最强模型，按相同 tokens 计算费用
+        first = tiers.get(0)
+        if first:
+            strongest = self.tiers[-1].providers[0].price
+            baseline = sum(strongest.cost(first["prompt_tokens"], first["completion_tokens"]))
+            actual = sum(t["cost"] for t in tiers.values())
+            update_progress(100, 
+                f"[梯队] 全部使用最强模型预计 {currency}{baseline:.4f}，实际 {currency}{actual:.4f}，"
+                f"节省 {currency}{baseline - actual:.4f}"
+            )
+
+    def _translate_batch_with_bisect(self, current_batch: Dict, update_progress=None, progress=0,
+                                     tier: int = 0) -> Dict:
+        """翻译单个批次，响应被截断时将批次对半拆分后分别重新翻译
+        
+        Args:
+            current_batch: 当前批次的数据
+            update_progress: 进度更新回调函数
+            progress: 当前进度
+            tier: 使用的模型梯队
+            
+        Returns:
+            Dict: 翻译后的节点信息，拆分翻译的结果已合并
+        """
         try:
-            # 读取文件
-            with open(original_file, 'r', encoding='utf-8') as f:
-                original_data = json.load(f)
-            with open(final_translated_file, 'r', encoding='utf-8') as f:
-                translated_data = json.load(f)
-            
-            log_entries = []
-            log_entries.append("\n=== 最终校验修正日志 ===")
-            log_entries.append(f"时间: {time.strftime('%Y-%m-%d %H:%M:%S')}")
-            log_entries.append("=" * 50)
-            
-            # 第一步：建立中英文双向映射
-            en_to_cn = {}  # 英文到中文的映射
-            cn_to_en = {}  # 中文到英文的映射
-            log_entries.append("\n第一步：建立中英文映射关系")
-            
-            # 1.1 首先从原始文件中获取所有英文键
-            for node_name, node_data in original_data.items():
-                for section in ["inputs", "outputs", "widgets"]:
-                    if section in node_data:
-                        for key, value in node_data[section].items():
-                            # 如果原始文件中键和值相同，这个键就是标准英文键
-                            if key == value:
-                                # 在翻译后的文件中查找对应的中文值
-                                if (node_name in translated_data and 
-                                    section in translated_data[node_name]):
-                                    trans_section = translated_data[node_name][section]
-                                    # 如果找到了这个键对应的中文值
-                                    if key in trans_section:
-                                        trans_value = trans_section[key]
-                                        if any('\u4e00' <= char <= '\u9fff' for char in str(trans_value)):
-                                            en_to_cn[key] = trans_value
-                                            cn_to_en[trans_value] = key
-                                            log_entries.append(f"从原始文件映射: {key} <-> {trans_value}")
-            
-            # 1.2 从翻译后的文件中收集其他映射关系
-            for node_name, node_data in translated_data.items():
-                for section in ["inputs", "outputs", "widgets"]:
-                    if section in node_data:
-                        for key, value in node_data[section].items():
-                            # 如果值是中文且键是英文
-                            if (any('\u4e00' <= char <= '\u9fff' for char in str(value)) and
-                                not any('\u4e00' <= char <= '\u9fff' for char in str(key))):
-                                en_to_cn[key] = value
-                                cn_to_en[value] = key
-                                log_entries.append(f"从翻译文件映射: {key} <-> {value}")
-                            # 如果键是中文且值是英文
-                            elif (any('\u4e00' <= char <= '\u9fff' for char in str(key)) and
-                                  not any('\u4e00' <= char <= '\u9fff' for char in str(value))):
-                                cn_to_en[key] = value
-                                en_to_cn[value] = key
-                                log_entries.append(f"从翻译文件映射: {value} <-> {key}")
-            
-            # 第二步：修正所有节点
-            final_corrected = {}
-            corrections_made = False
-            log_entries.append("\n第二步：应用修正")
-            
-            for node_name, node_data in translated_data.items():
-                corrected_node = {
-                    "title": node_data["title"],
-                    "inputs": {},
-                    "outputs": {},
-                    "widgets": {}
-                }
-                
-                # 获取原始节点数据
-                orig_node = original_data.get(node_name, {})
-                
-                # 处理每个部分
-                for section in ["inputs", "outputs", "widgets"]:
-                    if section in node_data:
-                        # 获取原始部分的键
-                        orig_keys = orig_node.get(section, {}).keys()
-                        
-                        for key, value in node_data[section].items():
-                            # 如果键是中文，需要修正
-                            if any('\u4e00' <= char <= '\u9fff' for char in str(key)):
-                                if key in cn_to_en:
-                                    eng_key = cn_to_en[key]
-                                    # 验证这个英文键是否在原始数据中
-                                    if eng_key in orig_keys:
-                                        corrected_node[section][eng_key] = value
-                                        corrections_made = True
-                                        log_entries.append(f"修正键: {key} -> {eng_key}")
-                                    else:
-                                        # 如果不在原始数据中，尝试查找原始键
-                                        for orig_key in orig_keys:
-                                            if orig_key.lower() == eng_key.lower():
-                                                corrected_node[section][orig_key] = value
-                                                corrections_made = True
-                                                log_entries.append(f"修正键(使用原始大小写): {key} -> {orig_key}")
-                                                break
-                                else:
-                                    # 在原始数据中查找对应的英文键
-                                    found = False
-                                    for orig_key in orig_keys:
-                                        if orig_key in en_to_cn and en_to_cn[orig_key] == key:
-                                            corrected_node[section][orig_key] = value
-                                            corrections_made = True
-                                            log_entries.append(f"修正键(从原始数据): {key} -> {orig_key}")
-                                            found = True
-                                            break
-                                    if not found:
-                                        log_entries.append(f"警告: 未找到键 '{key}' 的英文映射")
-                                        # 保持原样
-                                        corrected_node[section][key] = value
-                            else:
-                                corrected_node[section][key] = value
-                
-                final_corrected[node_name] = corrected_node
-            
-            # 保存映射关系
-            mapping_file = os.path.join(self.dirs["temp"], "translation_mapping.json")
-            with open(mapping_file, 'w', encoding='utf-8') as f:
-                json.dump({
-                    "en_to_cn": en_to_cn,
-                    "cn_to_en": cn_to_en
-                }, f, indent=4, ensure_ascii=False)
-            
-            # 保存详细日志
-            log_file = os.path.join(self.dirs["logs"], 
-                                  f"final_correction_log_{time.strftime('%Y%m%d_%H%M%S')}.txt")
-            log_content = '\n'.join(log_entries)
-            with open(log_file, 'w', encoding='utf-8') as f:
-                f.write(log_content)
-            
-            # 如果进行了修正，保存结果
-            if corrections_made:
-                output_file = os.path.join(self.dirs["temp"], "final_corrected.json")
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    json.dump(final_corrected, f, indent=4, ensure_ascii=False)
-            
-            return not corrections_made, final_corrected, log_content
+            return self._translate_batch(current_batch, update_progress, progress, tier)
+        except TruncatedResponseError as e:
+            halves = self._split_batch(current_batch)
+            if not halves:
+                raise Exception(f"单个词条的翻译结果仍被截断: {str(e)}")
             
-        except Exception as e:
-            error_msg = f"最终校验修正失败: {str(e)}"
-            return False, translated_data, error_msg 
+            self.stats.increment("bisections")
+            if update_progress:
+                update_progress(progress, 
+                    f"[拆分] {str(e)}，批次拆分为两部分重新翻译: "
+                    f"{', '.join(halves[0].keys())} | {', '.join(halves[1].keys())}"
+                )
+            
+            merged = {}
+            for half in halves:
+                BatchPlanner.merge_translated(
+                    merged, 
+                    self._translate_batch_with_bisect(half, update_progress, progress, tier)
+                )
+            return merged
+
+    @staticmethod
+    def _split_batch(current_batch: Dict) -> List[Dict]:
+        """将批次对半拆分，只有一个节点时按字段拆分
+        
+        Returns:
+            List[Dict]: 两个子批次，无法继续拆分时返回空列表
+        """
+        node_items = list(current_batch.items())
+        if len(node_items) > 1:
+            middle = len(node_items) // 2
+            return [dict(node_items[:middle]), dict(node_items[middle:])]
+        
+        node_name, node_info = node_items[0]
+        items = [("title", None, node_info["title"])] if node_info.get("title") else []
+        items += [
+            (section, key, value)
+            for section in ["inputs", "widgets", "outputs"]
+            for key, value in node_info.get(section, {}).items()
+        ]
+        # 标题与字段合计只有一个词条时无法拆分
+        if len(items) < 2:
+            return []
+        
+        middle = len(items) // 2
+        halves = [
+            {"title": "", "inputs": {}, "widgets": {}, "outputs": {}},
+            {"title": "", "inputs": {}, "widgets": {}, "outputs": {}}
+        ]
+        for index, (section, key, value) in enumerate(items):
+            half = halves[0 if index < middle else 1]
+            if section == "title":
+                half["title"] = value
+            else:
+                half[section][key] = value
+        return [{node_name: halves[0]}, {node_name: halves[1]}]
 
     def _cleanup_temp_files(self, temp_files: List[str], update_progress=None):
         """清理临时文件
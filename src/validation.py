@@ -0,0 +1,222 @@
+"""翻译结果校验模块"""
+
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from .request_builder import BatchRequestBuilder, SECTIONS
+from .token_utils import CJK_PATTERN
+from .translation_config import TranslationConfig
+
+# 常见英文键名的可接受译文，这些译文即使与标准翻译不同也视为已翻译
+KNOWN_TRANSLATIONS = {
+    'image': {'图像', '图片'},
+    'mask': {'遮罩', '掩码', '蒙版'},
+    'model': {'模型'},
+    'processor': {'处理器'},
+    'device': {'设备'},
+    'bbox': {'边界框', '边框'},
+    'samples': {'样本'},
+    'operation': {'操作'},
+    'guide': {'引导图'},
+    'radius': {'半径'},
+    'epsilon': {'epsilon', 'eps'},
+    'threshold': {'阈值'},
+    'contrast': {'对比度'},
+    'brightness': {'亮度'},
+    'saturation': {'饱和度'},
+    'hue': {'色调'},
+    'gamma': {'伽马'}
+}
+
+
+@lru_cache(maxsize=65536)
+def has_cjk(text: str) -> bool:
+    """文本中是否包含中文，按字符串缓存结果"""
+    return CJK_PATTERN.search(text) is not None
+
+
+class BatchCheck:
+    """一个批次的校验结果
+
+    Attributes:
+        corrected: 修正后的节点，缺失或无效的字段用原文占位
+        issues: 问题字段 {"node_name", "section", "key", "source", "kind"}，
+                kind 为 missing（节点或字段缺失、译文为空）或 untranslated（译文仍为英文）
+        failed_nodes: 存在问题字段的节点
+        key_repairs: 被翻译成中文的键名还原为原始英文键名的次数
+        fields: 校验的字段总数（包括非空的标题）
+        learned: 通过校验的字段原文 -> 译文
+        learned_titles: 通过校验的标题原文 -> 译文
+    """
+
+    def __init__(self):
+        self.fields = 0
+        self.corrected: Dict = {}
+        self.issues: List[Dict] = []
+        self.failed_nodes: List[str] = []
+        self.key_repairs = 0
+        self.learned: Dict[str, str] = {}
+        self.learned_titles: Dict[str, str] = {}
+
+    def missing(self) -> List[Dict]:
+        """缺失或为空、需要补译的字段"""
+        return [issue for issue in self.issues if issue["kind"] == "missing"]
+
+
+class ValidationEngine:
+    """在内存中直接校验节点对象的校验引擎
+
+    每个批次只遍历一次，同时完成缺失检查、未翻译检查、中文键名检测和中英文键名还原；
+    中文检测使用预编译的正则，未翻译的判断按 (原文, 译文) 缓存，重复出现的字符串不再重新判断
+    """
+
+    def __init__(self):
+        self._untranslated: Dict[tuple, bool] = {}
+        self._lock = threading.Lock()
+        self.en_to_cn: Dict[str, str] = {}    # 已通过校验的原文 -> 译文
+        self.cn_to_en: Dict[str, set] = {}    # 译文 -> 原文，用于还原被翻译成中文的键名
+
+    def is_untranslated(self, source: str, value: str) -> bool:
+        """译文中没有中文且不属于应保留原文的情况（类型名、技术参数、缩写等）"""
+        key = (source, value)
+        result = self._untranslated.get(key)
+        if result is None:
+            result = self._untranslated[key] = self._check_untranslated(source, value)
+        return result
+
+    @staticmethod
+    def _check_untranslated(source: str, value: str) -> bool:
+        if has_cjk(value):
+            return False
+        if source.isupper() or source.upper() in TranslationConfig.PRESERVED_TYPES:
+            return False
+        if TranslationConfig.should_preserve_key(source) or value in KNOWN_TRANSLATIONS.get(source, ()):
+            return False
+        if source.lower() in TranslationConfig.COMMON_TRANSLATIONS:
+            return TranslationConfig.COMMON_TRANSLATIONS[source.lower()] != value
+        # 很短的键名通常是缩写（如 cfg、vae），允许保留原文
+        return sum(char.isalpha() for char in source) > 4
+
+    def check_batch(self, original_batch: Dict, translated_batch: Dict) -> BatchCheck:
+        """校验并修正一个批次
+
+        Args:
+            original_batch: 原始节点信息
+            translated_batch: 翻译结果，键名可能被模型翻译成中文
+
+        Returns:
+            BatchCheck: 修正后的节点和问题字段
+        """
+        check = BatchCheck()
+        learned = check.learned
+
+        for node_name, node_info in original_batch.items():
+            translated_info = translated_batch.get(node_name)
+            if not isinstance(translated_info, dict):
+                check.corrected[node_name] = node_info
+                check.failed_nodes.append(node_name)
+                if node_info.get("title"):
+                    check.fields += 1
+                    check.issues.append(self._issue(node_name, "title", None, node_info["title"], "missing"))
+                for section in SECTIONS:
+                    for key, value in node_info.get(section, {}).items():
+                        source = BatchRequestBuilder.source_text(key, value)
+                        check.fields += 1
+                        check.issues.append(self._issue(node_name, section, key, source, "missing"))
+                continue
+
+            failed = False
+            title = node_info.get("title", "")
+            corrected_node = {"title": translated_info.get("title", title), "inputs": {}, "widgets": {}, "outputs": {}}
+            if title:
+                check.fields += 1
+                kind = self._classify(title, translated_info.get("title"))
+                if kind:
+                    failed = True
+                    check.issues.append(self._issue(node_name, "title", None, title, kind))
+                    if kind == "missing":
+                        corrected_node["title"] = title
+                else:
+                    check.learned_titles[title] = corrected_node["title"]
+
+            for section in SECTIONS:
+                orig_section = node_info.get(section, {})
+                trans_section = translated_info.get(section) or {}
+                if any(key not in orig_section for key in trans_section):
+                    trans_section = self._repair_keys(orig_section, trans_section, check)
+
+                check.fields += len(orig_section)
+                for key, value in orig_section.items():
+                    source = BatchRequestBuilder.source_text(key, value)
+                    translation = trans_section.get(key)
+                    kind = self._classify(source, translation)
+                    if kind == "missing":
+                        corrected_node[section][key] = key
+                    else:
+                        corrected_node[section][key] = translation
+                        if kind is None:
+                            learned[source] = translation
+                    if kind:
+                        failed = True
+                        check.issues.append(self._issue(node_name, section, key, source, kind))
+
+            check.corrected[node_name] = corrected_node
+            if failed:
+                check.failed_nodes.append(node_name)
+
+        with self._lock:
+            # 只有字段译文用于还原被翻译成中文的键名
+            for source, translation in learned.items():
+                if self.en_to_cn.get(source) != translation:
+                    self.en_to_cn[source] = translation
+                    self.cn_to_en.setdefault(translation, set()).add(source)
+        return check
+
+    def _classify(self, source: str, translation) -> Optional[str]:
+        """字段的问题类型，通过校验时返回 None"""
+        if not BatchRequestBuilder.is_valid_value(translation):
+            return "missing"
+        if self.is_untranslated(source, translation):
+            return "untranslated"
+        return None
+
+    def _repair_keys(self, orig_section: Dict, trans_section: Dict, check: BatchCheck) -> Dict:
+        """将被翻译成中文的键名还原为原始英文键名
+
+        依次尝试：键值互换（{"图像": "image"}）、已知译文（其他字段中 image 译为 图像），
+        最后按顺序对应剩余的原始键和中文键
+        """
+        repaired = {key: value for key, value in trans_section.items() if key in orig_section}
+        extra = [(key, value) for key, value in trans_section.items() if key not in orig_section and has_cjk(key)]
+        if not extra:
+            return repaired
+
+        unmatched = [key for key in orig_section if key not in repaired]
+        unmatched_set = set(unmatched)
+
+        leftover = []
+        for cn_key, value in extra:
+            if isinstance(value, str) and value in unmatched_set and not has_cjk(value):
+                english = value
+            else:
+                with self._lock:
+                    candidates = self.cn_to_en.get(cn_key, ())
+                    english = next((en for en in candidates if en in unmatched_set), None)
+            if english in unmatched_set:
+                # 中文键名本身就是译文
+                repaired[english] = cn_key
+                unmatched_set.discard(english)
+                check.key_repairs += 1
+            else:
+                leftover.append((cn_key, value))
+
+        remaining = [key for key in unmatched if key in unmatched_set]
+        for (cn_key, value), english in zip(leftover, remaining):
+            repaired[english] = value if isinstance(value, str) and has_cjk(value) else cn_key
+            check.key_repairs += 1
+        return repaired
+
+    @staticmethod
+    def _issue(node_name: str, section: str, key: Optional[str], source: str, kind: str) -> Dict:
+        return {"node_name": node_name, "section": section, "key": key, "source": source, "kind": kind}
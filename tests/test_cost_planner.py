@@ -0,0 +1,39 @@
+"""翻译预估的测试"""
+
+from src.cost_planner import CostPlanner
+from src.rule_translator import RuleTranslator
+
+
+def _nodes(count):
+    return {
+        f"Node{i}": {
+            "title": "",
+            "inputs": {f"image_{i}": "IMAGE", f"mask_{i}": "MASK", f"custom_flux_{i}": "FLOAT"},
+            "widgets": {f"strength_{i}": "FLOAT", f"seed_{i}": "INT"},
+            "outputs": {}
+        }
+        for i in range(count)
+    }
+
+
+def test_pretranslate_reduces_planned_requests():
+    """开启预翻译时只规划需要模型翻译的字段"""
+    nodes = _nodes(60)
+    rules = RuleTranslator.default()
+    assert rules.translate("image_1") and rules.translate("strength_1") and rules.translate("seed_1")
+    assert rules.translate("custom_flux_1") is None
+
+    full = CostPlanner("system", token_target=400).plan_plugin("demo", nodes)
+    stripped = CostPlanner("system", token_target=400, pretranslate=True).plan_plugin("demo", nodes)
+
+    assert stripped["nodes"] == full["nodes"] == 60
+    assert stripped["requests"] < full["requests"]
+    assert stripped["prompt_tokens"] < full["prompt_tokens"]
+
+
+def test_pretranslate_skips_fully_translated_nodes():
+    """字段全部由规则翻译且没有标题的节点不计入请求"""
+    nodes = {"Node": {"title": "", "inputs": {"image": "IMAGE"}, "widgets": {}, "outputs": {}}}
+
+    assert CostPlanner("system").plan_plugin("demo", nodes)["requests"] == 1
+    assert CostPlanner("system", pretranslate=True).plan_plugin("demo", nodes)["requests"] == 0
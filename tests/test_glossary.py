@@ -0,0 +1,16 @@
+"""术语表匹配的测试"""
+
+from src.glossary import Glossary
+
+
+def test_multi_word_term_not_pluralized():
+    """多词术语不生成整词加 s 的复数形式，单词术语仍匹配复数"""
+    glossary = Glossary([
+        {"group": "参数", "terms": ["start_at"], "rule": "start_at -> 开始位置"},
+        {"group": "类型", "terms": ["image"], "rule": "image -> 图像"},
+    ])
+
+    assert glossary.select(["start_at"]) == [0]
+    assert glossary.select(["startAt"]) == [0]
+    assert glossary.select(["start ats"]) == []
+    assert glossary.select(["images"]) == [1]
@@ -0,0 +1,31 @@
+"""沿用已有翻译仓库译文的测试"""
+
+import json
+
+from src.translation_index import TranslationIndex
+from src.translator import Translator
+
+
+def test_untranslated_index_entries_not_prefilled(tmp_path):
+    """同名节点中仍为英文的标题和字段交给模型翻译，当前节点没有的字段不沿用"""
+    nodes_dir = tmp_path / "Nodes"
+    nodes_dir.mkdir()
+    existing = {
+        "MyNode": {
+            "title": "My Node",
+            "inputs": {"image": "图像", "custom_thing": "custom_thing", "removed_input": "已删除"},
+            "widgets": {},
+            "outputs": {}
+        }
+    }
+    (nodes_dir / "nodes.json").write_text(json.dumps(existing, ensure_ascii=False), encoding="utf-8")
+    index = TranslationIndex(str(tmp_path / "index.db"))
+    index.update(str(nodes_dir))
+
+    nodes = {"MyNode": {"title": "My Node", "inputs": {"image": "IMAGE", "custom_thing": "FLOAT"}, "widgets": {}, "outputs": {}}}
+    request_nodes, index_nodes = Translator(api_key="test", model_id="test")._prefill_from_index(nodes, index)
+    index.close()
+
+    assert index_nodes == {"MyNode": {"inputs": {"image": "图像"}, "widgets": {}, "outputs": {}}}
+    assert request_nodes["MyNode"]["title"] == "My Node"
+    assert request_nodes["MyNode"]["inputs"] == {"custom_thing": "FLOAT"}
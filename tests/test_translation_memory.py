@@ -0,0 +1,26 @@
+"""模糊翻译记忆的测试"""
+
+from src.translation_memory import FIELD, TITLE, TranslationMemory
+
+
+def test_field_translation_not_used_for_title():
+    """规范化后相同的字段和标题互不沿用"""
+    memory = TranslationMemory()
+    memory.add("image_blend", "图像混合", FIELD)
+
+    assert memory.autofill("Image Blend", TITLE) is None
+    assert memory.autofill("image_blend_2", FIELD) == "图像混合_2"
+    assert memory.examples_for(["Image Blends"], TITLE) == []
+
+
+def test_title_and_field_with_same_text_kept_apart():
+    """同一英文作为标题和字段时各自保存译文"""
+    memory = TranslationMemory()
+    memory.add("Image Blend", "混合图像", TITLE)
+    memory.add("image_blend", "图像混合", FIELD)
+
+    assert memory.autofill("Image Blend", TITLE) == "混合图像"
+    assert memory.autofill("Image Blend", FIELD) == "图像混合"
+    assert memory.autofill("Image Blend V2", TITLE) == "混合图像 V2"
+    assert memory.examples_for(["Image Blender"], TITLE, limit=1) == [("Image Blend", "混合图像")]
+    assert len(memory) == 2